@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# Fixed benchmark queries. Keep these stable: a baseline is only comparable
+# with results produced from the same query set, so add new entries rather
+# than editing existing ones.
+
+# find_matches(prefix, suffix, length): short and long prefixes, with and
+# without a suffix and a length
+MATCH_QUERIES = [
+    ('a', None, None),
+    ('co', None, None),
+    ('play', None, None),
+    ('international', None, None),
+    ('re', 'ing', None),
+    ('play', 'time', None),
+    ('under', 'ness', None),
+    ('st', None, 6),
+    ('over', 'ed', 8),
+]
+
+# ranked_matches(prefix, suffix, filters): one entry per filter type
+FILTER_QUERIES = [
+    ('length', 'st', {'length': 6}),
+    ('vowels', 'st', {'vowels': 3}),
+    ('consonants', 'st', {'consonants': 4}),
+    ('pos', 'st', {'pos': 'noun'}),
+    ('double_letters', 'st', {'double_letters': True}),
+    ('no_repeats', 'st', {'no_repeats': True}),
+    ('alternating', 'st', {'alternating': True}),
+    ('alphabetical', 'st', {'alphabetical': True}),
+    ('contains', 'st', {'contains': 'e'}),
+    ('letter_at', 'st', {'letter_at': [[4, 'r']]}),
+    ('pattern', 'st', {'pattern': '???i??'}),
+]
+
+# Utility predicates timed over the whole word list: name -> extra arguments
+PREDICATES = {
+    'has_double_letters': (),
+    'has_repeated_letters': (),
+    'is_word_in_pos_category': ('noun',),
+    'count_vowels': (),
+    'count_consonants': (),
+    'prefix_overlap': ('perhaps',),
+    'suffix_overlap': ('hopper',),
+    'is_alternating_pattern': (),
+    'is_alphabetical_order': (),
+}
+
+# find_solutions(starting_word, rules, max_solutions): loose and tight rule
+# triples covering every rule type; None means --all
+SOLVER_QUERIES = [
+    ('perhaps', ['noun', '6-letters', 'double-letters'], 5),
+    ('perhaps', ['noun', '6-letters', 'double-letters'], 50),
+    ('word', ['noun', 'verb', 'adjective'], 200),
+    ('time', ['5-letters', 'alternating', 'double-letters'], 100),
+    ('start', ['adverb', '4-consonants', 'noun'], 20),
+    ('hello', ['adjective', 'alternating', 'alphabetical'], None),
+    ('play', ['verb', '3-vowels', 'no-repeats'], None),
+    ('stone', ['e-at-2', 'contains-z', '????s'], 200),
+]
+
+# Cold-start command lines, run as fresh processes from the repository root
+# with the query cache off: label -> script arguments
+STARTUP_QUERIES = {
+    'fluxer/st': ['fluxer.py', 'st', '-n', '--no-cache'],
+    'fluxer/play..time': ['fluxer.py', 'play', 'time', '-n', '--no-cache'],
+    'fluxer/st/pos': ['fluxer.py', 'st', '-p', 'noun', '-n', '--no-cache'],
+    'solver/perhaps/6-letters,double-letters,no-repeats': [
+        'fluxer_solver.py', 'perhaps', '--rules', '6-letters,double-letters,no-repeats', '--no-cache'],
+    'solver/perhaps/noun,6-letters,double-letters': [
+        'fluxer_solver.py', 'perhaps', '--rules', 'noun,6-letters,double-letters', '--no-cache'],
+}
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fluxer
+import fluxer_solver
+import queries
+
+# Bump when the query set or the way samples are taken changes
+SUITE_VERSION = 3
+
+DEFAULT_THRESHOLD = 0.10
+
+# Slowdowns smaller than this (seconds) are treated as timer noise
+DEFAULT_MIN_DELTA = 0.001
+
+def percentile(samples: List[float], q: float) -> float:
+    """Linearly interpolated percentile (q in 0..100) of a non-empty sample list"""
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Summarize sample times (seconds) into the statistics reported per benchmark"""
+    return {
+        'samples': len(samples),
+        'min': min(samples),
+        'median': percentile(samples, 50),
+        'p90': percentile(samples, 90),
+        'p99': percentile(samples, 99),
+        'max': max(samples),
+        'mean': sum(samples) / len(samples),
+    }
+
+def time_call(func: Callable[[], Any], repeat: int, warmup: int = 1) -> List[float]:
+    """Time repeat calls of func after warmup untimed calls; solver output is discarded.
+
+    As with timeit, garbage collection is off while sampling so collector
+    pauses from earlier benchmarks do not land in later samples.
+    """
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            func()
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                func()
+                samples.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return samples
+
+def predicate_pass(name: str, extra: Tuple) -> Callable[[], Any]:
+    """One benchmark sample for a predicate: call it on every corpus word"""
+    predicate = getattr(fluxer, name)
+    def run():
+        for word in fluxer.words:
+            predicate(word, *extra)
+    return run
+
+def cold_start(argv: List[str]) -> Callable[[], Any]:
+    """One benchmark sample for a command line: run it in a fresh interpreter"""
+    def run():
+        subprocess.run([sys.executable, *argv], cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return run
+
+def benchmark_specs() -> List[Tuple[str, str, Callable[[], Any], int]]:
+    """Return (name, group, callable, default sample count) for the fixed query set"""
+    specs = [
+        ('load/ensure_words_corpus', 'load', lambda: fluxer.ensure_words_corpus(reload=True), 5),
+        ('load/text_corpus_columns', 'load', lambda: fluxer.text_corpus_columns(fluxer.words, fluxer.get_word_pos()), 5),
+        ('load/rule_index', 'load', lambda: type(fluxer.get_rule_index())(fluxer.words, fluxer.corpus_columns()), 5),
+    ]
+    for prefix, suffix, length in queries.MATCH_QUERIES:
+        name = f"find_matches/{prefix}" + (f"..{suffix}" if suffix else "") + (f"/len{length}" if length else "")
+        specs.append((name, 'find_matches',
+                      lambda p=prefix, s=suffix, n=length: fluxer.find_matches(p, s, n), 20))
+    for label, prefix, filters in queries.FILTER_QUERIES:
+        specs.append((f"ranked_matches/{prefix}/{label}", 'filters',
+                      lambda p=prefix, f=filters: fluxer.ranked_matches(p, None, f), 20))
+    for name, extra in queries.PREDICATES.items():
+        specs.append((f"predicate/{name}", 'predicates', predicate_pass(name, extra), 10))
+    for label, argv in queries.STARTUP_QUERIES.items():
+        specs.append((f"startup/{label}", 'startup', cold_start(argv), 5))
+    for start, rules, max_solutions in queries.SOLVER_QUERIES:
+        mode = 'all' if max_solutions is None else f"s{max_solutions}"
+        specs.append((f"find_solutions/{start}/{','.join(rules)}/{mode}", 'find_solutions',
+                      lambda w=start, r=rules, m=max_solutions: fluxer_solver.find_solutions(w, r, fluxer, m), 3))
+    return specs
+
+def run_suite(repeat: Optional[int] = None, only: Optional[str] = None, log=print) -> Dict[str, Any]:
+    """Run every benchmark (or those whose name contains only) and return the JSON report"""
+    fluxer.ensure_words_corpus()
+    results = {}
+    for name, group, func, default_repeat in benchmark_specs():
+        if only and only not in name:
+            continue
+        samples = time_call(func, repeat or default_repeat)
+        results[name] = {'group': group, **summarize(samples)}
+        log(f"{name:<60} median {results[name]['median'] * 1000:10.2f} ms  p90 {results[name]['p90'] * 1000:10.2f} ms")
+    return {
+        'suite_version': SUITE_VERSION,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'words': len(fluxer.words),
+        'corpus_digest': fluxer.corpus_digest(),
+        'results': results,
+    }
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            min_delta: float = DEFAULT_MIN_DELTA) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Compare medians against a baseline report.
+
+    Returns one row per benchmark present in both reports, and the names
+    whose median grew by more than threshold (a fraction, e.g. 0.10 = 10%)
+    and by more than min_delta seconds.
+    """
+    rows, regressions = [], []
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None or base['median'] <= 0:
+            continue
+        ratio = result['median'] / base['median']
+        rows.append({'name': name, 'baseline': base['median'], 'median': result['median'], 'ratio': ratio})
+        if ratio > 1 + threshold and result['median'] - base['median'] > min_delta:
+            regressions.append(name)
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark find_matches, the filter predicates and find_solutions on a fixed query set",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python benchmarks/run_benchmarks.py --output baseline.json
+  python benchmarks/run_benchmarks.py --baseline baseline.json --threshold 0.15
+  python benchmarks/run_benchmarks.py --only find_matches --repeat 50
+        """
+    )
+    parser.add_argument("--output", "-o", type=str, help="Write the JSON report to this file (default: stdout)")
+    parser.add_argument("--baseline", "-b", type=str, help="Compare medians against a saved JSON report")
+    parser.add_argument("--threshold", "-t", type=float, default=DEFAULT_THRESHOLD,
+                       help=f"Allowed median slowdown against the baseline, as a fraction (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA * 1000,
+                       help=f"Ignore slowdowns smaller than this many milliseconds (default: {DEFAULT_MIN_DELTA * 1000:g})")
+    parser.add_argument("--repeat", "-r", type=int, help="Samples per benchmark (default: per-benchmark, 3 to 20)")
+    parser.add_argument("--only", type=str, help="Only run benchmarks whose name contains this string")
+    args = parser.parse_args()
+
+    # Corpus paths are relative to the repository root
+    os.chdir(ROOT)
+    log = lambda msg: print(msg, file=sys.stderr)
+    report = run_suite(args.repeat, args.only, log)
+
+    data = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(data + '\n')
+    else:
+        print(data)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('suite_version') != SUITE_VERSION:
+            log(f"Warning: baseline is from suite version {baseline.get('suite_version')}, not {SUITE_VERSION}")
+        if baseline.get('corpus_digest') != report['corpus_digest']:
+            log("Warning: baseline was taken on a different corpus")
+        rows, regressions = compare(report, baseline, args.threshold, args.min_delta / 1000)
+        log(f"\n{'benchmark':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+        for row in rows:
+            flag = '  REGRESSION' if row['name'] in regressions else ''
+            log(f"{row['name']:<60} {row['baseline'] * 1000:10.2f}ms {row['median'] * 1000:10.2f}ms "
+                f"{(row['ratio'] - 1) * 100:+7.1f}%{flag}")
+        if regressions:
+            log(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        log(f"\nNo regressions beyond {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 
+import argparse
+import concurrent.futures
+import json
 import nltk
+import os
 import sys
+import time
 from collections import defaultdict
 
 def ensure_nltk_data():
@@ -13,45 +18,129 @@ def ensure_nltk_data():
         nltk.download('averaged_perceptron_tagger')
         nltk.download('punkt')
 
-def get_pos_tags(word):
-    """Get all possible POS tags for a word"""
-    # NLTK's tagger works best with sentences, so we create a simple context
-    # We'll try the word in different contexts to get all possible tags
-    
-    contexts = [
-        f"I {word}.",           # Verb context
-        f"The {word}.",         # Noun context  
-        f"It is {word}.",       # Adjective context
-        f"He walks {word}.",    # Adverb context
-        f"{word} book.",        # Adjective context
-        f"I see the {word}.",   # Noun context
-        f"I {word} it.",        # Verb context
-    ]
-    
-    all_tags = set()
-    
-    for context in contexts:
+# Sentence contexts each word is tagged in; NLTK's tagger works best with
+# sentences, so we try the word in different contexts to get all possible tags
+CONTEXTS = [
+    "I {word}.",            # Verb context
+    "The {word}.",          # Noun context
+    "It is {word}.",        # Adjective context
+    "He walks {word}.",     # Adverb context
+    "{word} book.",         # Adjective context
+    "I see the {word}.",    # Noun context
+    "I {word} it.",         # Verb context
+]
+
+# Bump when the cache layout or the way tags are derived from the tagger changes
+TAG_CACHE_VERSION = 1
+
+DEFAULT_TAG_CACHE = 'pos_tags_cache.json'
+
+# Words handed to a worker process at a time
+CHUNK_SIZE = 500
+
+def tagger_version():
+    """Identify the tagger and contexts a cached tag set was produced with"""
+    return f"{TAG_CACHE_VERSION}/nltk-{nltk.__version__}/averaged_perceptron_tagger/{'|'.join(CONTEXTS)}"
+
+def word_sentences(word):
+    """Return the tokenized sentences a word is tagged in, the word on its own last"""
+    sentences = []
+    for context in CONTEXTS:
         try:
-            tokens = nltk.word_tokenize(context)
-            tagged = nltk.pos_tag(tokens)
-            
-            # Find our word in the tagged tokens
-            for token, tag in tagged:
-                if token.lower() == word.lower():
-                    all_tags.add(tag)
-        except Exception as e:
+            sentences.append(nltk.word_tokenize(context.format(word=word)))
+        except Exception:
             # Skip contexts that don't work well
             continue
-    
-    # Also try the word by itself
+    sentences.append([word])
+    return sentences
+
+def tag_sentences(sentences):
+    """Tag sentences in one bulk call, falling back to one at a time if any fails"""
     try:
-        tagged = nltk.pos_tag([word])
-        if tagged:
-            all_tags.add(tagged[0][1])
-    except:
-        pass
-    
-    return all_tags
+        return nltk.pos_tag_sents(sentences)
+    except Exception:
+        tagged = []
+        for sentence in sentences:
+            try:
+                tagged.append(nltk.pos_tag(sentence))
+            except Exception:
+                tagged.append([])
+        return tagged
+
+def tag_words(words):
+    """Get all possible POS tags for each word, as {word: sorted Penn tags}"""
+    sentences = []
+    owners = []
+    for word in words:
+        word_contexts = word_sentences(word)
+        sentences.extend(word_contexts)
+        owners.extend((word, i == len(word_contexts) - 1) for i in range(len(word_contexts)))
+
+    all_tags = {word: set() for word in words}
+    for (word, alone), tagged in zip(owners, tag_sentences(sentences)):
+        if alone:
+            # The word by itself: take its tag whatever the tokenizer did
+            if tagged:
+                all_tags[word].add(tagged[0][1])
+            continue
+        # Find our word in the tagged tokens
+        for token, tag in tagged:
+            if token.lower() == word.lower():
+                all_tags[word].add(tag)
+    return {word: sorted(tags) for word, tags in all_tags.items()}
+
+def get_pos_tags(word):
+    """Get all possible POS tags for a word"""
+    return set(tag_words([word])[word])
+
+def load_tag_cache(path):
+    """Return the cached {word: Penn tags} for the current tagger, or {} if there is none"""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable tag cache {path}: {e}")
+        return {}
+    if not isinstance(data, dict) or data.get('tagger') != tagger_version():
+        print(f"Tag cache {path} is from a different tagger version; re-tagging every word")
+        return {}
+    return data.get('tags', {})
+
+def save_tag_cache(path, tags):
+    """Write the tag cache atomically"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'tagger': tagger_version(), 'tags': tags}, f, separators=(',', ':'), sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not write tag cache {path}: {e}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+def tag_all(words, workers=None, chunk_size=CHUNK_SIZE):
+    """Tag words across a process pool, yielding {word: Penn tags} per finished chunk"""
+    chunks = [words[i:i + chunk_size] for i in range(0, len(words), chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield tag_words(chunk)
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(tag_words, chunk) for chunk in chunks]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
 
 def map_penn_to_simple(tag):
     """Map Penn Treebank tags to simple POS categories"""
@@ -66,8 +155,12 @@ def map_penn_to_simple(tag):
     else:
         return 'other'
 
-def process_word_list(filename):
-    """Process the word list and create POS-specific files"""
+def process_word_list(filename, workers=None, cache_path=DEFAULT_TAG_CACHE):
+    """Process the word list and create POS-specific files.
+
+    Tags are cached per word in cache_path (None disables the cache), so a
+    rerun after editing the word list only tags the new words.
+    """
     print(f"Processing {filename}...")
     
     # Read words
@@ -80,19 +173,38 @@ def process_word_list(filename):
     
     print(f"Found {len(words)} words to process.")
     
+    cache = load_tag_cache(cache_path) if cache_path else {}
+    word_tags = {word: cache[word] for word in words if word in cache}
+    pending = [word for word in words if word not in word_tags]
+    if word_tags:
+        print(f"Reusing cached tags for {len(word_tags)} words; {len(pending)} to tag.")
+
+    started = time.perf_counter()
+    done = 0
+    try:
+        for tags in tag_all(pending, workers):
+            word_tags.update(tags)
+            done += len(tags)
+            elapsed = time.perf_counter() - started
+            rate = done / elapsed if elapsed > 0 else 0.0
+            eta = format_duration((len(pending) - done) / rate) if rate else '?'
+            print(f"Tagged {done}/{len(pending)} words ({rate:.0f} words/s, ETA {eta})", end='\r', flush=True)
+    finally:
+        if pending:
+            print()
+        if cache_path and done:
+            # Keep what was tagged, even if interrupted, for the next run
+            cache.update(word_tags)
+            save_tag_cache(cache_path, cache)
+    if pending:
+        print(f"Tagged {len(pending)} words in {format_duration(time.perf_counter() - started)}.")
+
     # Initialize POS dictionaries
     pos_words = defaultdict(set)
-    
-    # Process each word
-    for i, word in enumerate(words):
-        if i % 1000 == 0:
-            print(f"Processing word {i+1}/{len(words)}: {word}")
-        
-        # Get all possible POS tags for this word
-        penn_tags = get_pos_tags(word)
-        
+
+    for word in words:
         # Map to simple categories and add to appropriate sets
-        for penn_tag in penn_tags:
+        for penn_tag in word_tags[word]:
             simple_pos = map_penn_to_simple(penn_tag)
             if simple_pos != 'other':
                 pos_words[simple_pos].add(word)
@@ -141,6 +253,14 @@ def process_word_list(filename):
         print("No multi-POS words found.")
 
 def main():
+    parser = argparse.ArgumentParser(description="Create the part-of-speech word lists from popular.txt")
+    parser.add_argument("--workers", "-j", type=int, default=None,
+                       help="Tagging processes to run (default: one per CPU)")
+    parser.add_argument("--cache", type=str, default=DEFAULT_TAG_CACHE,
+                       help=f"Per-word tag cache file (default: {DEFAULT_TAG_CACHE})")
+    parser.add_argument("--no-cache", action="store_true", help="Tag every word without reading or writing the cache")
+    args = parser.parse_args()
+
     print("Fluxer Part-of-Speech Tagging Tool")
     print("==================================")
     
@@ -148,7 +268,7 @@ def main():
     ensure_nltk_data()
     
     # Process the word list
-    process_word_list('popular.txt')
+    process_word_list('popular.txt', args.workers, None if args.no_cache else args.cache)
     
     print("\nDone! POS-specific word lists have been created.")
 
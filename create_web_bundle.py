@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import struct
+import sys
+
+import fluxer
+import fluxer_corpus
+
+# Web lexicon bundle: the corpus the CLI loads, packed into one binary file
+# that web/lexicon.js reads with typed arrays, so the web app needs neither
+# the text word lists nor any parsing beyond one TextDecoder call.
+#
+# Layout (little-endian; every section starts on a 4-byte boundary so it can
+# be viewed in place as a typed array):
+#   header        magic, format version, POS-present mask, source hash,
+#                 word count, word table length, ID width in bytes (2 or 4)
+#   word table    the words in lowercase order, front-coded: per word, the
+#                 number of leading characters shared with the previous word
+#                 (as one byte), the remaining characters in UTF-8, a newline
+#   pos flags     1 byte per word (fluxer_corpus.POS_FLAGS bits)
+#   vowels        1 byte per word
+#   consonants    1 byte per word
+#   attributes    1 byte per word (fluxer_corpus.ATTR_* bits)
+#   suffix order  word IDs sorted by reversed spelling
+#
+# Word IDs here are positions in the bundle's word table. Together with the
+# table's own order, the suffix order is the affix index: the words starting
+# (or ending) with a string are one contiguous run, found by binary search.
+# Lengths are left out since the loader has the words themselves.
+
+MAGIC = b'FLXW'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHH32sIIHH')
+
+COLUMNS = ('pos', 'vowels', 'consonants', 'attributes')
+
+# Shared prefixes are capped so the count decodes as a single ASCII character
+MAX_SHARED = 127
+
+DEFAULT_OUTPUT = os.path.join('web', 'lexicon.bin')
+
+def align(data, boundary=4):
+    """Pad data with zero bytes to a multiple of boundary"""
+    return data + bytes(-len(data) % boundary)
+
+def shared_prefix(a, b):
+    """Leading characters a and b share, counting only ASCII so it means the same in JS strings"""
+    n = 0
+    limit = min(len(a), len(b), MAX_SHARED)
+    while n < limit and a[n] == b[n] and a[n] < '\x80':
+        n += 1
+    return n
+
+def front_code(words):
+    """Front-code a word list into the bundle's word table"""
+    table = bytearray()
+    previous = ''
+    for w in words:
+        shared = shared_prefix(previous, w)
+        table.append(shared)
+        table += w[shared:].encode()
+        table.append(0x0a)
+        previous = w
+    return bytes(table)
+
+def build_bundle(words, digest, pos_present, columns):
+    """Pack a word list and its columns (see fluxer_corpus.COLUMNS) into bundle bytes"""
+    lowered = [w.lower() for w in words]
+    order = sorted(range(len(words)), key=lambda i: lowered[i])
+    position = {i: n for n, i in enumerate(order)}
+    suffix_order = sorted(range(len(words)), key=lambda i: lowered[i][::-1])
+    id_width = 2 if len(words) <= 0x10000 else 4
+    id_code = 'H' if id_width == 2 else 'I'
+
+    table = align(front_code([lowered[i] for i in order]))
+    column_data = align(b''.join(bytes(columns[name][i] for i in order) for name in COLUMNS))
+    suffixes = struct.pack(f'<{len(words)}{id_code}', *[position[i] for i in suffix_order])
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, pos_present, digest, len(words), len(table), id_width, 0)
+    return header + table + column_data + suffixes
+
+def bundle_digest(path):
+    """Return the source hash recorded in a bundle, or None if it is missing or unreadable"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, version, _, digest, _, _, _, _ = HEADER.unpack(header)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    return digest
+
+def write_bundle(path):
+    """Build the bundle from the compiled corpus and write it atomically; returns its size"""
+    compiled = fluxer.compile_corpus()
+    words = compiled.words()
+    columns = {name: compiled.column(name) for name in fluxer_corpus.COLUMNS}
+    data = build_bundle(words, compiled.digest, compiled.pos_present, columns)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(data)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the binary lexicon bundle the web app loads (web/lexicon.bin) from the word lists",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python create_web_bundle.py
+  python create_web_bundle.py --check
+        """
+    )
+    parser.add_argument("--output", "-o", type=str,
+                       help=f"Bundle path (default: {DEFAULT_OUTPUT} in the repository)")
+    parser.add_argument("--check", action="store_true",
+                       help="Only check that the bundle matches the current word lists (exit status 1 if not)")
+    args = parser.parse_args()
+
+    # Word list paths are relative to the repository root
+    output = os.path.abspath(args.output) if args.output else None
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    output = output or os.path.abspath(DEFAULT_OUTPUT)
+
+    if args.check:
+        if bundle_digest(output) != fluxer_corpus.source_hash(fluxer.corpus_sources()):
+            print(f"{output} is missing or out of date; run create_web_bundle.py")
+            sys.exit(1)
+        print(f"{output} is up to date")
+        return
+
+    try:
+        size = write_bundle(output)
+    except OSError as e:
+        print(f"Error: could not write {output}: {e}")
+        sys.exit(1)
+    text_size = sum(os.path.getsize(path) for path in fluxer.corpus_sources() if os.path.exists(path))
+    print(f"Wrote {output}: {size} bytes (the text word lists are {text_size} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -1,81 +1,549 @@
 #!/usr/bin/env python3
 
+import time
+
+# Taken before the other imports, for --profile-startup
+IMPORT_STARTED = time.perf_counter()
+
 import argparse
+import bisect
+import os
 import sys
-import time
+
+import fluxer_cache
+import fluxer_corpus
+import fluxer_graph
+import fluxer_index
+import fluxer_lexicon
+import fluxer_stats
+
+# Bump when a change alters query results, so cached results are not reused
+ENGINE_VERSION = 1
 
 words = []
-nouns = []
-verbs = []
-adjectives = []
-adverbs = []
+# The POS flags and the prefix and suffix lexicons are loaded on first use
+# (see get_word_pos and get_lexicons); None until then
+word_pos = None
+prefix_lexicon = None
+suffix_lexicon = None
 corpus = "popular.txt"
+pos_files = {
+    'noun': "nouns.txt",
+    'verb': "verbs.txt",
+    'adjective': "adjectives.txt",
+    'adverb': "adverbs.txt",
+}
+compiled_corpus = None
+rule_index = None
+overlap_graph = None
+word_ids = None
+# (mtime, size) of each source word list and their content hash when the
+# in-memory corpus last matched them, for reload_if_changed
+source_stamps = {}
+loaded_digest = None
+# True when the in-memory corpus has edits that are not in the text lists
+corpus_modified = False
+
+# A hot reload that changes more words than this does a full reload instead
+RELOAD_DIFF_LIMIT = 2000
+
+# Words added or removed since the lexicons (or the overlap graph) were built
+# that they keep as a delta; past this many they are rebuilt from the word
+# list instead
+LEXICON_DELTA_LIMIT = 1000
+
+# Helper: Map each word starting with a tail of key (or ending with a head of
+# key when reverse=True, looked up in the suffix lexicon) to the longest such
+# overlap. Longer affixes are looked up first, so a word keeps the first
+# overlap it is found with.
+def affix_overlaps(lexicon, key, reverse=False, length=None):
+    overlaps = {}
+    if reverse:
+        affixes = [key[:i] for i in range(len(key), 0, -1)]
+    else:
+        affixes = [key[i:] for i in range(len(key))] or ['']
+    for affix in affixes:
+        for i in lexicon.prefix_ids(affix[::-1] if reverse else affix):
+            w = words[i]
+            if w not in overlaps and (length is None or len(w) == length):
+                overlaps[w] = len(affix)
+    return overlaps
+
+# Find matching words and their total overlap (prefix overlap plus suffix
+# overlap when a suffix is given)
+def match_overlaps(prefix, suffix=None, length=None):
+    prefix = prefix.lower()
+    prefixes, suffixes = get_lexicons()
+    starts = affix_overlaps(prefixes, prefix, length=length)
+    if not suffix:
+        return starts
+    ends = affix_overlaps(suffixes, suffix.lower(), reverse=True, length=length)
+    if len(ends) < len(starts):
+        return {w: starts[w] + overlap for w, overlap in ends.items() if w in starts}
+    return {w: overlap + ends[w] for w, overlap in starts.items() if w in ends}
 
 def find_matches(prefix, suffix=None, length=None):
-    prefix = prefix.lower()
-    if suffix is not None:
-        suffix = suffix.lower()
-    word_set = set(w.lower() for w in words)
-    results = set()
-    prefix_suffixes = [prefix[i:] for i in range(len(prefix))]  # all suffixes of prefix except empty
-    prefix_suffixes.append(prefix)  # include full prefix
-    for w in word_set:
-        if length is not None and len(w) != length:
-            continue
-        # Check all suffixes of prefix (from full prefix down to last letter)
-        for pre in prefix_suffixes:
-            if w.startswith(pre):
-                if suffix:
-                    # Check all prefixes of suffix (from first letter up to full suffix)
-                    for i in range(1, len(suffix) + 1):
-                        if w.endswith(suffix[:i]):
-                            results.add(w)
-                            break
-                    break  # Only need the longest prefix match
-                else:
-                    results.add(w)
-                    break
-    return sorted(results)
+    return sorted(match_overlaps(prefix, suffix, length))
 
-def ensure_words_corpus():
-    global words, nouns, verbs, adjectives, adverbs
+# Load the text word lists, which are the source of truth for the compiled
+# corpus. A missing POS list comes back as None. The word list comes back
+# lowercased, sorted and without duplicates even if it was edited by hand,
+# since word IDs and find_word rely on that order.
+def read_text_corpus():
+    return read_word_list(), read_pos_lists()
 
-    # Load main word list
+def read_word_list():
     try:
         with open(corpus) as f:
-            words = [line.strip() for line in f]
+            return sorted({line.strip().lower() for line in f if line.strip()})
     except FileNotFoundError:
         print(f"Error: Word list {corpus} was not found.")
         sys.exit(1)
 
-    # Load POS-specific lists
-    try:
-        with open("nouns.txt") as f:
-            nouns = [line.strip().lower() for line in f if line.strip()]
-    except FileNotFoundError:
-        print("Warning: nouns.txt not found. Part-of-speech filtering will not work.")
-        nouns = []
+def read_pos_lists():
+    pos_lists = {}
+    for pos, path in pos_files.items():
+        try:
+            with open(path) as f:
+                pos_lists[pos] = [line.strip().lower() for line in f if line.strip()]
+        except FileNotFoundError:
+            pos_lists[pos] = None
+    return pos_lists
+
+# Helper: Per-word attribute columns stored in the compiled corpus
+def word_attributes(word):
+    flags = 0
+    if has_double_letters(word):
+        flags |= fluxer_corpus.ATTR_DOUBLE
+    if has_repeated_letters(word):
+        flags |= fluxer_corpus.ATTR_REPEATED
+    if is_alternating_pattern(word):
+        flags |= fluxer_corpus.ATTR_ALTERNATING
+    if is_alphabetical_order(word):
+        flags |= fluxer_corpus.ATTR_ALPHABETICAL
+    return min(len(word), 255), min(count_vowels(word), 255), min(count_consonants(word), 255), flags
+
+# Helper: The fluxer_vector module when NumPy is usable, else None. It is
+# imported on first use, since importing NumPy costs more than a short query.
+def vector_backend():
+    import fluxer_vector
+    return fluxer_vector if fluxer_vector.available() else None
+
+# Helper: The POS flags (fluxer_corpus.POS_FLAGS bits) of each word in a word
+# list, given the set of words of each POS
+def pos_flag_column(word_list, word_pos_sets):
+    column = bytearray(len(word_list))
+    for pos, pos_set in word_pos_sets.items():
+        flag = fluxer_corpus.POS_FLAGS[pos]
+        for i, w in enumerate(word_list):
+            if w.lower() in pos_set:
+                column[i] |= flag
+    return column
+
+# Compute the per-word columns (see fluxer_corpus.COLUMNS) for a word list and
+# its POS flags, with the vectorized backend when NumPy is available
+def text_corpus_columns(word_list, pos_column):
+    columns = {name: [] for name in fluxer_corpus.COLUMNS}
+    columns['pos'] = list(pos_column)
+    fluxer_vector = vector_backend()
+    if fluxer_vector is not None:
+        columns.update(fluxer_vector.attribute_columns(word_list, word_attributes))
+        return columns
+    for w in word_list:
+        length, vowels, consonants, flags = word_attributes(w.lower())
+        columns['length'].append(length)
+        columns['vowels'].append(vowels)
+        columns['consonants'].append(consonants)
+        columns['attributes'].append(flags)
+    return columns
+
+# The text word lists the corpus is built from
+def corpus_sources():
+    return [corpus] + list(pos_files.values())
+
+# Hash of the current word list contents, used to invalidate derived data
+def corpus_digest():
+    return fluxer_corpus.source_hash(corpus_sources()).hex()
+
+# Return the compiled corpus, rebuilding it from the text word lists when it is
+# missing, from another format version, or its source hash is stale. Raises
+# OSError if the compiled file cannot be written.
+def compile_corpus(force=False):
+    path = fluxer_corpus.compiled_path(corpus)
+    digest = fluxer_corpus.source_hash(corpus_sources())
+    if not force:
+        try:
+            compiled = fluxer_corpus.CompiledCorpus(path)
+            if compiled.digest == digest:
+                return compiled
+        except (OSError, ValueError):
+            pass
+
+    word_list, pos_lists = read_text_corpus()
+    text_pos_sets = {pos: set(lst) for pos, lst in pos_lists.items() if lst is not None}
+    pos_present = 0
+    for pos in text_pos_sets:
+        pos_present |= fluxer_corpus.POS_FLAGS[pos]
+    columns = text_corpus_columns(word_list, pos_flag_column(word_list, text_pos_sets))
+    fluxer_corpus.write_corpus(path, digest, word_list, pos_present, columns)
+    return fluxer_corpus.CompiledCorpus(path)
+
+# Return the overlap graph, rebuilding it when it is missing, from another
+# format version, or its word list hash is stale. Raises OSError if the graph
+# file cannot be written.
+def build_overlap_graph(force=False):
+    ensure_words_corpus()
+    path = fluxer_graph.graph_path(corpus)
+    digest = fluxer_corpus.source_hash([corpus])
+    if not force:
+        try:
+            graph = fluxer_graph.load_graph(path)
+            if graph.digest == digest and graph.count == len(words):
+                return graph
+        except (OSError, ValueError):
+            pass
+
+    fluxer_graph.write_graph(path, digest, words)
+    return fluxer_graph.load_graph(path)
+
+# Return the prefix and suffix lexicons, rebuilding the lexicon file when it is
+# missing, from another format version, or its word list hash is stale.
+# Raises OSError if the lexicon file cannot be written.
+def build_lexicons(force=False):
+    ensure_words_corpus()
+    path = fluxer_lexicon.lexicon_path(corpus)
+    digest = fluxer_corpus.source_hash([corpus])
+    if not force:
+        try:
+            file_digest, count, prefixes, suffixes = fluxer_lexicon.load_lexicons(path)
+            if file_digest == digest and count == len(words):
+                return prefixes, suffixes
+        except (OSError, ValueError):
+            pass
+
+    fluxer_lexicon.write_lexicons(path, digest, words)
+    _, _, prefixes, suffixes = fluxer_lexicon.load_lexicons(path)
+    return prefixes, suffixes
+
+# The prefix lexicon (over the words) and suffix lexicon (over their reversed
+# spellings), loaded (or built) on first use. They answer the "starts with"
+# and "ends with" lookups, and map words to word IDs.
+def get_lexicons():
+    global prefix_lexicon, suffix_lexicon
+    if prefix_lexicon is None:
+        with fluxer_stats.stage('load: lexicons'):
+            try:
+                # The lexicon file describes the text word list, so unsaved
+                # edits get in-memory lexicons
+                if corpus_modified:
+                    raise OSError("corpus has unsaved edits")
+                prefix_lexicon, suffix_lexicon = build_lexicons()
+            except OSError:
+                prefix_lexicon = fluxer_lexicon.Lexicon.build(words)
+                suffix_lexicon = fluxer_lexicon.Lexicon.build(words, reverse=True)
+    return prefix_lexicon, suffix_lexicon
+
+# Map of word to word ID (its position in words), built on first use. The
+# solver uses it in its inner loops, where a dict lookup beats a lexicon walk.
+def get_word_ids():
+    global word_ids
+    if word_ids is None:
+        word_ids = {w: i for i, w in enumerate(words)}
+    return word_ids
+
+# Overlap graph over word IDs, loaded (or built) on first use
+def get_overlap_graph():
+    global overlap_graph
+    if overlap_graph is None:
+        with fluxer_stats.stage('load: overlap graph'):
+            try:
+                # The graph file describes the text word list, so unsaved
+                # edits get an in-memory graph
+                if corpus_modified:
+                    raise OSError("corpus has unsaved edits")
+                overlap_graph = build_overlap_graph()
+            except OSError:
+                overlap_graph = fluxer_graph.OverlapGraph(*fluxer_graph.build_rows(words))
+    return overlap_graph
+
+# Load the corpus unless it is already loaded (reload=True forces a fresh load).
+# Only the word list is read here; the POS flags, lexicons and indexes are
+# loaded the first time a query needs them.
+def ensure_words_corpus(reload=False):
+    global words, word_pos, prefix_lexicon, suffix_lexicon, compiled_corpus, rule_index, overlap_graph, word_ids
+    global source_stamps, loaded_digest, corpus_modified
+
+    if words and not reload:
+        return
+
+    # Taken before reading, so an edit made during the load is seen as a change
+    source_stamps = source_file_stamps()
+
+    # Load from the compiled corpus, falling back to the text lists if it
+    # cannot be written (e.g. a read-only checkout)
+    with fluxer_stats.stage('load: corpus'):
+        try:
+            compiled_corpus = compile_corpus()
+            words = compiled_corpus.words()
+        except OSError:
+            compiled_corpus = None
+            words = read_word_list()
+
+    word_pos = None
+    prefix_lexicon = None
+    suffix_lexicon = None
+    rule_index = None
+    overlap_graph = None
+    word_ids = None
+    loaded_digest = compiled_corpus.digest.hex() if compiled_corpus is not None else corpus_digest()
+    corpus_modified = False
+
+# POS flags (fluxer_corpus.POS_FLAGS bits) by word ID, loaded on first use.
+# A bytearray, so edits update it in place. Words in the POS lists but not in
+# the word list have no ID, and are dropped as in the compiled corpus.
+def get_word_pos():
+    global word_pos
+    if word_pos is None:
+        ensure_words_corpus()
+        with fluxer_stats.stage('load: pos flags'):
+            if compiled_corpus is not None:
+                word_pos = bytearray(compiled_corpus.column('pos'))
+                missing = [pos for pos in pos_files if not compiled_corpus.has_pos(pos)]
+            else:
+                pos_lists = read_pos_lists()
+                missing = [pos for pos, pos_list in pos_lists.items() if pos_list is None]
+                word_pos = pos_flag_column(words, {pos: set(pos_list) for pos, pos_list in pos_lists.items()
+                                                   if pos_list is not None})
+            for pos in missing:
+                print(f"Warning: {pos_files[pos]} not found. Part-of-speech filtering will not work.")
+    return word_pos
+
+# Per-word columns for the loaded corpus, taken from the compiled corpus when available
+def corpus_columns():
+    if compiled_corpus is not None:
+        return {name: compiled_corpus.column(name) for name in fluxer_corpus.COLUMNS}
+    return text_corpus_columns(words, get_word_pos())
+
+# Rule filters over word IDs (positions in words), built on first use: NumPy
+# masks over the attribute columns when available, bitsets otherwise
+def get_rule_index():
+    global rule_index
+    if rule_index is None:
+        fluxer_vector = vector_backend()
+        index_class = fluxer_vector.VectorIndex if fluxer_vector is not None else fluxer_index.RuleIndex
+        with fluxer_stats.stage('load: rule index'):
+            rule_index = index_class(words, corpus_columns())
+    return rule_index
+
+# Helper: (mtime, size) of each source word list, None for a missing file
+def source_file_stamps():
+    stamps = {}
+    for path in corpus_sources():
+        try:
+            stat = os.stat(path)
+            stamps[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamps[path] = None
+    return stamps
+
+# Helper: The POS word lists by POS name, read off the POS flags
+def pos_word_lists():
+    pos_column = get_word_pos()
+    return {p: [w for w, flags in zip(words, pos_column) if flags & fluxer_corpus.POS_FLAGS[p]] for p in pos_files}
+
+# Helper: The ID of a word in the loaded word list, or None. Edits look words
+# up by binary search, so they do not need the lexicons loaded (the list is
+# sorted when read and kept sorted by edits).
+def find_word(word):
+    i = bisect.bisect_left(words, word)
+    return i if i < len(words) and words[i] == word else None
+
+# Helper: Normalize POS names, rejecting unknown ones
+def normalize_pos(pos):
+    pos = [p.strip().lower() for p in pos if p.strip()]
+    unknown = [p for p in pos if p not in pos_files]
+    if unknown:
+        raise ValueError(f"Unknown part of speech: {', '.join(unknown)} (expected one of: {', '.join(pos_files)})")
+    return pos
+
+# Helper: Drop derived data that cannot be updated in place. The compiled
+# corpus columns are rebuilt from the word list when next needed (and its
+# file goes stale through its source hash).
+def corpus_edited():
+    global compiled_corpus, corpus_modified
+    compiled_corpus = None
+    corpus_modified = True
+
+# Helper: Record an added or removed word in the loaded lexicons. They are
+# memory-mapped and immutable, so they get a sorted delta instead (see
+# fluxer_lexicon.EditedLexicon); past LEXICON_DELTA_LIMIT edits they are
+# dropped and rebuilt from the word list when next needed.
+def lexicons_edited(word, added):
+    global prefix_lexicon, suffix_lexicon
+    if prefix_lexicon is None:
+        return
+    if not isinstance(prefix_lexicon, fluxer_lexicon.EditedLexicon):
+        delta = fluxer_lexicon.LexiconDelta(prefix_lexicon)
+        prefix_lexicon = fluxer_lexicon.EditedLexicon(prefix_lexicon, delta)
+        suffix_lexicon = fluxer_lexicon.EditedLexicon(suffix_lexicon, delta, reverse=True)
+    delta = prefix_lexicon.delta
+    if added:
+        delta.add(word)
+    else:
+        delta.remove(word)
+    if len(delta) > LEXICON_DELTA_LIMIT:
+        prefix_lexicon = None
+        suffix_lexicon = None
+
+# Helper: Record an added or removed word in the loaded overlap graph, before
+# the word list changes. Rebuilding it takes seconds, so it is patched instead
+# (see fluxer_graph.EditedGraph); past LEXICON_DELTA_LIMIT edits it is dropped
+# and rebuilt from the word list when next needed.
+def graph_edited(word, added):
+    global overlap_graph
+    if overlap_graph is None:
+        return
+    if not isinstance(overlap_graph, fluxer_graph.EditedGraph):
+        overlap_graph = fluxer_graph.EditedGraph(overlap_graph, words, get_lexicons)
+    if added:
+        overlap_graph.add(word)
+    else:
+        overlap_graph.remove(word)
+    if len(overlap_graph.delta) > LEXICON_DELTA_LIMIT:
+        overlap_graph = None
+
+# Add a word (and optionally its parts of speech) to the loaded corpus,
+# updating the POS flags, lexicons, rule index and overlap graph in place. The word goes in
+# its sorted position. Returns False if the word is already present.
+def add_word(word, pos=()):
+    ensure_words_corpus()
+    word = word.strip().lower()
+    pos = normalize_pos(pos)
+    if not word:
+        raise ValueError("Word must not be empty")
+    if find_word(word) is not None:
+        return False
 
-    try:
-        with open("verbs.txt") as f:
-            verbs = [line.strip().lower() for line in f if line.strip()]
-    except FileNotFoundError:
-        print("Warning: verbs.txt not found. Part-of-speech filtering will not work.")
-        verbs = []
+    # Loaded before the list changes, so the flags line up with the old IDs
+    pos_column = get_word_pos()
+    graph_edited(word, added=True)
+    i = bisect.bisect_left(words, word)
+    words.insert(i, word)
+    if word_ids is not None:
+        for j in range(i, len(words)):
+            word_ids[words[j]] = j
+    pos_flags = 0
+    for p in pos:
+        pos_flags |= fluxer_corpus.POS_FLAGS[p]
+    pos_column.insert(i, pos_flags)
+    if rule_index is not None:
+        rule_index.insert(i, pos_flags, *word_attributes(word))
+    lexicons_edited(word, added=True)
+    corpus_edited()
+    return True
 
-    try:
-        with open("adjectives.txt") as f:
-            adjectives = [line.strip().lower() for line in f if line.strip()]
-    except FileNotFoundError:
-        print("Warning: adjectives.txt not found. Part-of-speech filtering will not work.")
-        adjectives = []
+# Remove a word from the loaded corpus and every derived index. Returns False
+# if the word is not present.
+def remove_word(word):
+    ensure_words_corpus()
+    word = word.strip().lower()
+    i = find_word(word)
+    if i is None:
+        return False
+
+    pos_column = get_word_pos()
+    graph_edited(word, added=False)
+    del words[i]
+    del pos_column[i]
+    if word_ids is not None:
+        del word_ids[word]
+        for j in range(i, len(words)):
+            word_ids[words[j]] = j
+    if rule_index is not None:
+        rule_index.delete(i)
+    lexicons_edited(word, added=False)
+    corpus_edited()
+    return True
+
+# Replace the parts of speech of a word in the loaded corpus. Returns False if
+# the word is not present.
+def set_pos(word, pos):
+    ensure_words_corpus()
+    word = word.strip().lower()
+    pos = normalize_pos(pos)
+    i = find_word(word)
+    if i is None:
+        return False
 
+    pos_flags = 0
+    for p in pos:
+        pos_flags |= fluxer_corpus.POS_FLAGS[p]
+    get_word_pos()[i] = pos_flags
+    if rule_index is not None:
+        rule_index.set_pos(i, pos_flags)
+    corpus_edited()
+    return True
+
+# Helper: Write a word list atomically, one word per line
+def write_word_list(path, word_list):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
     try:
-        with open("adverbs.txt") as f:
-            adverbs = [line.strip().lower() for line in f if line.strip()]
-    except FileNotFoundError:
-        print("Warning: adverbs.txt not found. Part-of-speech filtering will not work.")
-        adverbs = []
+        with open(tmp_path, 'w') as f:
+            f.writelines(f"{w}\n" for w in word_list)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# Write the loaded corpus back to the text word lists, so edits made through
+# add_word, remove_word and set_pos persist
+def save_text_corpus():
+    global source_stamps, loaded_digest, corpus_modified
+    write_word_list(corpus, words)
+    for p, pos_list in pos_word_lists().items():
+        write_word_list(pos_files[p], pos_list)
+    source_stamps = source_file_stamps()
+    loaded_digest = corpus_digest()
+    corpus_modified = False
+
+# Pick up edits to the text word lists made since they were loaded (by another
+# process, or by hand). The files are only hashed when their mtime or size
+# changed, and only the words that differ are applied, through remove_word,
+# add_word and set_pos; a very large diff falls back to a full reload.
+# Returns True if the corpus changed.
+def reload_if_changed():
+    global source_stamps, loaded_digest, corpus_modified
+    if not words:
+        return False
+    stamps = source_file_stamps()
+    if stamps == source_stamps:
+        return False
+    source_stamps = stamps
+    digest = corpus_digest()
+    if digest == loaded_digest:
+        return False
+
+    new_words, new_pos_lists = read_text_corpus()
+    new_pos_sets = {p: set(lst or ()) for p, lst in new_pos_lists.items()}
+    new_word_set = set(new_words)
+    removed = [w for w in words if w not in new_word_set]
+    added = [w for w in new_words if find_word(w) is None]
+    if len(removed) + len(added) > RELOAD_DIFF_LIMIT:
+        ensure_words_corpus(reload=True)
+        return True
+
+    for w in removed:
+        remove_word(w)
+    for w in added:
+        add_word(w, [p for p, pos_set in new_pos_sets.items() if w in pos_set])
+    pos_column = get_word_pos()
+    for w, flags in zip(new_words, pos_flag_column(new_words, new_pos_sets)):
+        i = find_word(w)
+        if i is not None and pos_column[i] != flags:
+            set_pos(w, [p for p, pos_set in new_pos_sets.items() if w in pos_set])
+    loaded_digest = digest
+    corpus_modified = False
+    return True
 
 def supports_color():
     return sys.stdout.isatty()
@@ -97,9 +565,70 @@ def clear_transient():
     sys.stdout.write("\r" + " " * 60 + "\r")
     sys.stdout.flush()
 
+# Collect the filter options that are set into a dict (keys match the argument names)
+def match_filters(args):
+    filters = {}
+    for key in ('length', 'vowels', 'consonants'):
+        if getattr(args, key) is not None:
+            filters[key] = getattr(args, key)
+    if args.pos is not None:
+        filters['pos'] = args.pos.lower()
+    for key in ('double_letters', 'no_repeats', 'alternating', 'alphabetical'):
+        if getattr(args, key):
+            filters[key] = True
+    for key in ('contains', 'starts', 'ends', 'pattern'):
+        if getattr(args, key):
+            filters[key] = getattr(args, key).lower()
+    if args.letter_at:
+        filters['letter_at'] = sorted(args.letter_at)
+    if args.distinct is not None:
+        filters['distinct'] = args.distinct
+    return filters
+
+# Parse a --at value like '3:e' into a [position, letter] pair (positions from 1)
+def letter_position(value):
+    position, _, letter = value.partition(':')
+    try:
+        position = int(position)
+    except ValueError:
+        position = 0
+    if position < 1 or len(letter) != 1:
+        raise argparse.ArgumentTypeError(f"expected POSITION:LETTER with POSITION from 1 (e.g. 3:e), got '{value}'")
+    return [position, letter.lower()]
+
+# Utility: Check if a word passes every filter in a filter dict
+def passes_filters(w, filters):
+    if 'length' in filters and len(w) != filters['length']:
+        return False
+    if 'vowels' in filters and count_vowels(w) != filters['vowels']:
+        return False
+    if 'consonants' in filters and count_consonants(w) != filters['consonants']:
+        return False
+    if 'pos' in filters and not is_word_in_pos_category(w, filters['pos']):
+        return False
+    if filters.get('double_letters') and not has_double_letters(w):
+        return False
+    if filters.get('no_repeats') and has_repeated_letters(w):
+        return False
+    if filters.get('alternating') and not is_alternating_pattern(w):
+        return False
+    if filters.get('alphabetical') and not is_alphabetical_order(w):
+        return False
+    if any(key in filters for key in fluxer_index.LETTER_FILTERS) and not passes_letter_filters(w, filters):
+        return False
+    return True
+
+# Find matching words that pass the filters, ranked by overlap, length and spelling
+def ranked_matches(prefix, suffix=None, filters=None):
+    filters = filters or {}
+    matches = match_overlaps(prefix, suffix, filters.get('length'))
+    ranked = [(w, overlap) for w, overlap in matches.items() if passes_filters(w, filters)]
+    ranked.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
+    return ranked
+
 def main():
     parser = argparse.ArgumentParser(description="Find words with overlapping prefix and optional suffix.")
-    parser.add_argument("prefix", type=str, help="Prefix string (e.g., ST)")
+    parser.add_argument("prefix", type=str, nargs="?", default=None, help="Prefix string (e.g., ST). Optional with --session")
     parser.add_argument("suffix", type=str, nargs="?", default=None, help="Suffix string (e.g., PLAY). Optional.")
     parser.add_argument("--length", "-l", type=int, default=None, help="Optional word length")
     parser.add_argument("--vowels", "-v", type=int, default=None, help="Exact number of vowels required")
@@ -109,43 +638,73 @@ def main():
     parser.add_argument("--no-repeats", "-r", action="store_true", help="Require no repeated letters in the word")
     parser.add_argument("--alternating", "-a", action="store_true", help="Require alternating vowel-consonant pattern")
     parser.add_argument("--alphabetical", "-o", action="store_true", help="Require letters to be in alphabetical order")
+    parser.add_argument("--contains", type=str, default=None, help="Require every one of these letters in the word")
+    parser.add_argument("--starts", type=str, default=None, help="Require the word to start with these letters")
+    parser.add_argument("--ends", type=str, default=None, help="Require the word to end with these letters")
+    parser.add_argument("--at", dest="letter_at", type=letter_position, action="append", default=None, metavar="N:X",
+                        help="Require letter X at position N, counting from 1 (repeatable, e.g. --at 2:a --at 5:e)")
+    parser.add_argument("--distinct", type=int, default=None, help="Exact number of distinct letters required")
+    parser.add_argument("--pattern", type=str, default=None,
+                        help="Wildcard pattern the whole word must match, '?' standing for any letter (e.g. ?a??e)")
     parser.add_argument("--no-paging", "-n", action="store_true", help="Disable paged output (show all results at once)")
     parser.add_argument("--limit", "-m", type=int, default=None, help="Limit number of matches to display")
+    parser.add_argument("--session", "-i", action="store_true",
+                        help="Start an interactive session that keeps the corpus loaded and refines the last result as filters change")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Query cache directory (default: $FLUXER_CACHE_DIR or ~/.cache/fluxer)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the query cache")
+    parser.add_argument("--stats", nargs="?", const="table", choices=("table", "json"), default=None,
+                        help="Print per-stage timings and counters to stderr, as a table (default) or JSON")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print where startup time went (imports, each load step, the query) to stderr")
     args = parser.parse_args()
-    ensure_words_corpus()
+    if args.prefix is None and not args.session:
+        parser.error("a prefix is required (unless --session is used)")
+    filters = match_filters(args)
+    if args.session:
+        import fluxer_session
+        session = fluxer_session.Session(sys.modules[__name__], args.prefix, args.suffix, filters, args.limit or 10)
+        try:
+            session.cmdloop()
+        except KeyboardInterrupt:
+            print()
+        return
+    stats = fluxer_stats.enable() if args.stats or args.profile_startup else None
+    if stats is not None:
+        stats.add_time('import', time.perf_counter() - IMPORT_STARTED)
+
+    # Repeat queries are answered from the on-disk cache without loading the corpus
+    cache = None if args.no_cache else fluxer_cache.QueryCache(args.cache_dir)
+    if cache is not None:
+        with fluxer_stats.stage('cache lookup'):
+            cache_key = cache.key('matches', ENGINE_VERSION, corpus_digest(), args.prefix.lower(),
+                                  args.suffix.lower() if args.suffix else None, filters)
+            filtered = cache.get(cache_key)
+    else:
+        filtered = None
 
-    print_transient("Finding matches...")
-    matches = find_matches(args.prefix, args.suffix, args.length)
-    clear_transient()
+    if filtered is None:
+        ensure_words_corpus()
 
-    print_transient("Filtering matches by criteria...")
-    filtered = []
-    for w in matches:
-        if args.vowels is not None and count_vowels(w) != args.vowels:
-            continue
-        if args.consonants is not None and count_consonants(w) != args.consonants:
-            continue
-        if args.pos is not None and not is_word_in_pos_category(w, args.pos.lower()):
-            continue
-        if args.double_letters and not has_double_letters(w):
-            continue
-        if args.no_repeats and has_repeated_letters(w):
-            continue
-        if args.alternating and not is_alternating_pattern(w):
-            continue
-        if args.alphabetical and not is_alphabetical_order(w):
-            continue
-        # Calculate and store total overlap
-        if args.suffix:
-            overlap = prefix_overlap(w, args.prefix) + suffix_overlap(w, args.suffix)
-        else:
-            overlap = prefix_overlap(w, args.prefix)
-        filtered.append((w, overlap))
-    clear_transient()
-
-    print_transient("Sorting responses by overlap, length, and alphabetically...")
-    filtered.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
-    clear_transient()
+        print_transient("Finding matches...")
+        with fluxer_stats.stage('matching'):
+            matches = match_overlaps(args.prefix, args.suffix, args.length)
+        fluxer_stats.count('overlaps', len(matches))
+        clear_transient()
+
+        print_transient("Filtering matches by criteria...")
+        # Total overlap comes straight from the lexicon lookups
+        with fluxer_stats.stage('filtering'):
+            filtered = [(w, matches[w]) for w in sorted(matches) if passes_filters(w, filters)]
+        fluxer_stats.count('candidates', len(matches))
+        clear_transient()
+
+        print_transient("Sorting responses by overlap, length, and alphabetically...")
+        with fluxer_stats.stage('sorting'):
+            filtered.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
+        clear_transient()
+
+        if cache is not None:
+            cache.put(cache_key, filtered)
 
     # Colorful header
     color = CYAN if supports_color() else ''
@@ -182,6 +741,11 @@ def main():
                 if user_input.strip().lower() == 'q':
                     break
 
+    if args.stats:
+        print(stats.format(args.stats), file=sys.stderr)
+    if args.profile_startup:
+        print(fluxer_stats.format_startup(stats, time.perf_counter() - IMPORT_STARTED), file=sys.stderr)
+
 # Utility: Check if a word contains double letters
 
 def has_double_letters(word):
@@ -202,21 +766,12 @@ def has_repeated_letters(word):
         seen_letters.add(letter)
     return False
 
-# Utility: Check if a word is in a specific POS category using pre-tagged lists
+# Utility: Check if a word is in a specific POS category using its POS flags
 
 def is_word_in_pos_category(word, pos):
-    word_lower = word.lower()
-    
-    if pos == 'noun':
-        return word_lower in nouns
-    elif pos == 'verb':
-        return word_lower in verbs
-    elif pos == 'adjective':
-        return word_lower in adjectives
-    elif pos == 'adverb':
-        return word_lower in adverbs
-    else:
-        return False
+    flag = fluxer_corpus.POS_FLAGS.get(pos)
+    i = get_lexicons()[0].get(word.lower()) if flag else None
+    return i is not None and bool(get_word_pos()[i] & flag)
 
 # Utility: Count vowels in a word
 
@@ -288,5 +843,34 @@ def is_alphabetical_order(word):
     word = word.lower()
     return word == ''.join(sorted(word))
 
+# Utility: Count the distinct letters in a word
+def count_distinct_letters(word):
+    return len(set(word.lower()))
+
+# Utility: Check if a word matches a wildcard pattern ('?' matches any one letter)
+def matches_pattern(word, pattern):
+    word = word.lower()
+    return len(word) == len(pattern) and all(p == '?' or p == c for c, p in zip(word, pattern))
+
+# Utility: Check a word against the letter filters of a filter dict (contains,
+# starts, ends, letter_at, distinct, pattern). The rule index answers these
+# from its letter postings; this is the per-word equivalent.
+def passes_letter_filters(word, filters):
+    word = word.lower()
+    if 'contains' in filters and not all(c in word for c in filters['contains']):
+        return False
+    if 'starts' in filters and not word.startswith(filters['starts']):
+        return False
+    if 'ends' in filters and not word.endswith(filters['ends']):
+        return False
+    for n, c in filters.get('letter_at', ()):
+        if not 1 <= n <= len(word) or word[n - 1] != c:
+            return False
+    if 'distinct' in filters and count_distinct_letters(word) != filters['distinct']:
+        return False
+    if 'pattern' in filters and not matches_pattern(word, filters['pattern']):
+        return False
+    return True
+
 if __name__ == "__main__":
     main()
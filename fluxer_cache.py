@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import os
+from typing import Any, Optional
+
+# Bump when the layout of cached entries changes
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def default_cache_dir() -> str:
+    """Return $FLUXER_CACHE_DIR, or a fluxer directory under the user's cache directory"""
+    if os.environ.get('FLUXER_CACHE_DIR'):
+        return os.environ['FLUXER_CACHE_DIR']
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'fluxer')
+
+class QueryCache:
+    """Persistent on-disk cache of query results with size-bounded LRU eviction.
+
+    Each entry is one JSON file named by the hash of its key. Callers build keys
+    from the normalized query, the corpus content hash and their engine version,
+    so editing any word list or changing the engine simply stops old entries from
+    being hit; they age out through eviction. Reads refresh an entry's mtime,
+    which is what eviction orders by.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def key(self, *parts: Any) -> str:
+        """Hash JSON-serializable key parts into a cache key"""
+        data = json.dumps([CACHE_VERSION, *parts], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Unreadable or corrupt entry: drop it and treat as a miss
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> bool:
+        """Store a value; returns False if it could not be written or exceeds the size cap"""
+        data = json.dumps(value, separators=(',', ':'))
+        if len(data) > self.max_bytes:
+            return False
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith('.json'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Remove every cached entry"""
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith('.json'):
+                        self._remove(entry.path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
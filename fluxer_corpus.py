@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+# Compiled corpus format: one versioned binary file holding the word list, the
+# part-of-speech tags and the per-word attributes. The text word lists remain
+# the source of truth; the compiled file records a hash of them and is rebuilt
+# whenever that hash goes stale.
+#
+# Layout (little-endian):
+#   header      magic, format version, POS-present mask, source hash,
+#               word count, word blob length
+#   word blob   UTF-8 words joined by newlines
+#   pos flags   1 byte per word (POS_FLAGS bits)
+#   lengths     1 byte per word
+#   vowels      1 byte per word
+#   consonants  1 byte per word
+#   attributes  1 byte per word (ATTR_* bits)
+
+MAGIC = b'FLXC'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<4sHH32sII')
+
+POS_NAMES = ('noun', 'verb', 'adjective', 'adverb')
+POS_FLAGS = {pos: 1 << i for i, pos in enumerate(POS_NAMES)}
+
+ATTR_DOUBLE = 1
+ATTR_REPEATED = 2
+ATTR_ALTERNATING = 4
+ATTR_ALPHABETICAL = 8
+
+COLUMNS = ('pos', 'length', 'vowels', 'consonants', 'attributes')
+
+def compiled_path(corpus_path):
+    """Return the compiled corpus path that sits next to a text word list"""
+    return os.path.splitext(corpus_path)[0] + '.flx'
+
+def source_hash(paths):
+    """Hash the contents of the source word lists (missing files hash distinctly)"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode() + b'\0')
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            digest.update(b'\xff')
+            continue
+        digest.update(struct.pack('<Q', len(data)))
+        digest.update(data)
+    return digest.digest()
+
+def write_corpus(path, digest, words, pos_present, columns):
+    """Write a compiled corpus atomically.
+
+    columns maps each name in COLUMNS to a sequence of byte values, one per word.
+    """
+    blob = '\n'.join(words).encode()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, pos_present, digest, len(words), len(blob)))
+            f.write(blob)
+            for name in COLUMNS:
+                f.write(bytes(columns[name]))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class CompiledCorpus:
+    """Memory-mapped view of a compiled corpus file.
+
+    Words are decoded on first access; the per-word columns are zero-copy
+    memoryviews into the mapping.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"{path} is truncated")
+        magic, version, self.pos_present, self.digest, self.count, blob_len = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} compiled corpus")
+        self._blob = (HEADER.size, HEADER.size + blob_len)
+        if len(self._mmap) != self._blob[1] + self.count * len(COLUMNS):
+            raise ValueError(f"{path} is truncated")
+        self._words = None
+
+    def words(self):
+        """Return the word list, decoding it on first use"""
+        if self._words is None:
+            start, end = self._blob
+            self._words = self._mmap[start:end].decode().split('\n') if self.count else []
+        return self._words
+
+    def column(self, name):
+        """Return one per-word byte column as a memoryview"""
+        start = self._blob[1] + COLUMNS.index(name) * self.count
+        return memoryview(self._mmap)[start:start + self.count]
+
+    def pos_words(self, pos):
+        """Return the words tagged with a part of speech"""
+        flag = POS_FLAGS[pos]
+        return [w.lower() for w, f in zip(self.words(), self.column('pos')) if f & flag]
+
+    def has_pos(self, pos):
+        return bool(self.pos_present & POS_FLAGS[pos])
+
+def main():
+    """Compile the word lists into the binary corpus used for fast startup"""
+    import fluxer
+    try:
+        compiled = fluxer.compile_corpus(force=True)
+    except OSError as e:
+        print(f"Error: could not write the compiled corpus: {e}")
+        sys.exit(1)
+    print(f"Compiled {compiled.count} words into {compiled.path}")
+
+if __name__ == "__main__":
+    main()
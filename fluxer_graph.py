@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+import bisect
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import defaultdict
+
+import fluxer_lexicon
+
+# Overlap graph format: the directed, weighted graph of "word B can follow
+# word A with overlap k" edges over the corpus word IDs (positions in the word
+# list), stored CSR-style. Rows hold only edges with overlap >= MIN_OVERLAP:
+# overlap-1 edges are about 95% of all edges (tens of millions), and are
+# implied by first letters instead (B follows A with overlap 1 exactly when B
+# starts with A's last letter and is not in A's row). Each row is ranked by
+# overlap, then length, then spelling, which is the order the solver expands
+# words in.
+#
+# Layout (little-endian):
+#   header      magic, format version, ID width in bytes, minimum overlap,
+#               word list hash, word count, edge count
+#   offsets     uint32 per word plus one: row i is edges offsets[i]..offsets[i+1]
+#   targets     word ID per edge (uint16, or uint32 for large corpora)
+#   weights     uint8 overlap per edge
+
+MAGIC = b'FLXG'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHBB32sII')
+
+MIN_OVERLAP = 2
+
+def graph_path(corpus_path):
+    """Return the overlap graph path that sits next to a text word list"""
+    return os.path.splitext(corpus_path)[0] + '.flg'
+
+def build_rows(words, min_overlap=MIN_OVERLAP):
+    """Compute the ranked overlap rows of a word list.
+
+    Returns (offsets, targets, weights) arrays. Row i lists every word j whose
+    longest overlap with word i (a tail of word i that starts word j) is at
+    least min_overlap.
+    """
+    lowered = [word.lower() for word in words]
+    ids = defaultdict(list)
+    for j, word in enumerate(lowered):
+        for k in range(min_overlap, len(word) + 1):
+            ids[word[:k]].append(j)
+
+    id_code = 'H' if len(words) <= 0xFFFF else 'I'
+    offsets = array('I', [0])
+    targets = array(id_code)
+    weights = array('B')
+    for word in lowered:
+        row = {}
+        # Longest tail first, so the first hit for a word is its overlap
+        for i in range(len(word) - min_overlap + 1):
+            overlap = len(word) - i
+            for j in ids.get(word[i:], ()):
+                if j not in row:
+                    row[j] = overlap
+        ranked = sorted(row.items(), key=lambda x: (-x[1], -len(words[x[0]]), words[x[0]]))
+        targets.extend(j for j, _ in ranked)
+        weights.extend(min(overlap, 255) for _, overlap in ranked)
+        offsets.append(len(targets))
+    return offsets, targets, weights
+
+def write_graph(path, digest, words, min_overlap=MIN_OVERLAP):
+    """Build the overlap graph for a word list and write it atomically"""
+    offsets, targets, weights = build_rows(words, min_overlap)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, targets.itemsize, min_overlap, digest, len(words), len(targets)))
+            offsets.tofile(f)
+            targets.tofile(f)
+            weights.tofile(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class OverlapGraph:
+    """Ranked overlap rows in CSR form, over word IDs.
+
+    load_graph() returns one backed by zero-copy memoryviews into a graph
+    file; build_rows() output can be wrapped directly when the file cannot be
+    written. Use successors() to walk a row restricted to a node mask, with
+    the implicit overlap-1 edges added.
+    """
+
+    def __init__(self, offsets, targets, weights, min_overlap=MIN_OVERLAP, digest=None, path=None):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.min_overlap = min_overlap
+        self.digest = digest
+        self.path = path
+        self.count = len(offsets) - 1
+        self.edges = len(targets)
+
+    def row(self, i):
+        """Return the (targets, weights) of word i's explicit edges, ranked"""
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.targets[start:end], self.weights[start:end]
+
+    def successors(self, i, mask, letter_buckets, last_letter):
+        """Return the (word ID, overlap) successors of word i allowed by mask, ranked.
+
+        mask is a bytearray with a nonzero byte for every allowed word ID.
+        letter_buckets maps a first letter to the allowed IDs starting with
+        it, ranked by length then spelling; the ones not in word i's row are
+        its overlap-1 successors. last_letter is word i's last letter.
+        """
+        targets, weights = self.row(i)
+        explicit = [(j, overlap) for j, overlap in zip(targets, weights) if mask[j]]
+        bucket = letter_buckets.get(last_letter)
+        if not bucket:
+            return explicit
+        seen = set(j for j, _ in explicit)
+        explicit.extend((j, 1) for j in bucket if j not in seen)
+        return explicit
+
+class EditedGraph(OverlapGraph):
+    """An OverlapGraph kept up to date with words added to and removed from its word list.
+
+    words is the edited word list itself, which the caller keeps sorted and
+    edits only after recording the edit here. lexicons returns the prefix and
+    suffix lexicons of it (see fluxer.get_lexicons). A removed word only
+    drops out of the rows it was in, so rows are read from the base graph
+    with the IDs remapped through a fluxer_lexicon.LexiconDelta. The rows an
+    added word changes are its own and those of the words ending in one of
+    its heads; they are recomputed from prefix lookups when next walked.
+    """
+
+    def __init__(self, base, words, lexicons):
+        self.base = base
+        self.words = words
+        self.lexicons = lexicons
+        self.delta = fluxer_lexicon.LexiconDelta(fluxer_lexicon.SortedWords(list(words)))
+        # Words whose rows are recomputed, and the rows computed so far as (word, overlap)
+        self.dirty = set()
+        self.rows = {}
+        self.min_overlap = base.min_overlap
+        self.digest = None
+        self.path = None
+
+    @property
+    def count(self):
+        return len(self.words)
+
+    def add(self, word):
+        """Record the addition of word, before it is inserted in words"""
+        suffixes = self.lexicons()[1]
+        changed = [word]
+        for k in range(self.min_overlap, len(word) + 1):
+            changed.extend(self.words[j] for j in suffixes.prefix_ids(word[:k][::-1]))
+        for changed_word in changed:
+            self.dirty.add(changed_word)
+            self.rows.pop(changed_word, None)
+        self.delta.add(word)
+
+    def remove(self, word):
+        """Record the removal of word, before it is deleted from words"""
+        self.delta.remove(word)
+
+    def compute_row(self, word):
+        """Rank the (word, overlap) edges of word over the edited list, as build_rows does"""
+        prefixes = self.lexicons()[0]
+        row = {}
+        for i in range(len(word) - self.min_overlap + 1):
+            overlap = len(word) - i
+            for j in prefixes.prefix_ids(word[i:]):
+                target = self.words[j]
+                if target not in row:
+                    row[target] = min(overlap, 255)
+        return sorted(row.items(), key=lambda x: (-x[1], -len(x[0]), x[0]))
+
+    def row(self, i):
+        words = self.words
+        word = words[i]
+        targets = []
+        weights = []
+        if word in self.dirty:
+            ranked = self.rows.get(word)
+            if ranked is None:
+                ranked = self.rows[word] = self.compute_row(word)
+            for target, overlap in ranked:
+                # Words removed since the row was computed are skipped
+                j = bisect.bisect_left(words, target)
+                if j < len(words) and words[j] == target:
+                    targets.append(j)
+                    weights.append(overlap)
+            return targets, weights
+        current_id = self.delta.current_id
+        base_targets, base_weights = self.base.row(self.delta.base.index(word))
+        for base_id, overlap in zip(base_targets, base_weights):
+            j = current_id(base_id)
+            if j is not None:
+                targets.append(j)
+                weights.append(overlap)
+        return targets, weights
+
+def load_graph(path):
+    """Map an overlap graph file, raising ValueError if it is not a valid one"""
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is truncated")
+    magic, version, id_bytes, min_overlap, digest, count, edges = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION or id_bytes not in (2, 4):
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} overlap graph")
+    offsets_end = HEADER.size + (count + 1) * 4
+    targets_end = offsets_end + edges * id_bytes
+    if len(data) != targets_end + edges:
+        raise ValueError(f"{path} is truncated")
+    view = memoryview(data)
+    return OverlapGraph(view[HEADER.size:offsets_end].cast('I'),
+                        view[offsets_end:targets_end].cast('H' if id_bytes == 2 else 'I'),
+                        view[targets_end:], min_overlap, digest, path)
+
+def main():
+    """Build the overlap graph used by the solver's graph engine"""
+    import fluxer
+    try:
+        graph = fluxer.build_overlap_graph(force=True)
+    except OSError as e:
+        print(f"Error: could not write the overlap graph: {e}")
+        sys.exit(1)
+    print(f"Wrote {graph.edges} edges (overlap >= {graph.min_overlap}) over {graph.count} words to {graph.path}")
+
+if __name__ == "__main__":
+    main()
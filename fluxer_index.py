@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import fluxer_corpus
+import fluxer_stats
+
+# Filter keys resolved through the LetterIndex rather than the attribute bitsets
+LETTER_FILTERS = ('contains', 'starts', 'ends', 'letter_at', 'distinct', 'pattern')
+
+# Bit positions set in each byte value, used to decode bitsets quickly
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+def ids_to_bitset(ids: Iterable[int], size: int) -> int:
+    """Pack word IDs into a bitset (a Python int with bit i set for word i)"""
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+def insert_bit(bits: int, i: int, value: bool) -> int:
+    """Insert a bit at position i, shifting the bits at i and above up by one"""
+    low = bits & ((1 << i) - 1)
+    return low | ((bits >> i) << (i + 1)) | (int(value) << i)
+
+def delete_bit(bits: int, i: int) -> int:
+    """Delete the bit at position i, shifting the bits above it down by one"""
+    low = bits & ((1 << i) - 1)
+    return low | ((bits >> (i + 1)) << i)
+
+def word_keys(pos: int, length: int, vowels: int, consonants: int, attributes: int) -> List[Tuple[str, Any]]:
+    """Return the (key, value) bitsets a word with these column values belongs to"""
+    keys = [('length', length), ('vowels', vowels), ('consonants', consonants)]
+    for pos_name, flag in fluxer_corpus.POS_FLAGS.items():
+        if pos & flag:
+            keys.append(('pos', pos_name))
+    if attributes & fluxer_corpus.ATTR_DOUBLE:
+        keys.append(('double_letters', True))
+    keys.append(('repeats', True) if attributes & fluxer_corpus.ATTR_REPEATED else ('no_repeats', True))
+    if attributes & fluxer_corpus.ATTR_ALTERNATING:
+        keys.append(('alternating', True))
+    if attributes & fluxer_corpus.ATTR_ALPHABETICAL:
+        keys.append(('alphabetical', True))
+    return keys
+
+def bitset_to_ids(bits: int) -> Iterator[int]:
+    """Yield the word IDs set in a bitset, in increasing order"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for byte_index, value in enumerate(data):
+        if value:
+            base = byte_index << 3
+            for bit in _BYTE_BITS[value]:
+                yield base + bit
+
+def letter_keys(word: str) -> List[Tuple[Any, ...]]:
+    """Return the letter posting keys a lowercased word belongs to"""
+    keys = [('length', len(word)), ('distinct', len(set(word)))]
+    keys.extend(('letter', c) for c in set(word))
+    keys.extend(('at', n, c) for n, c in enumerate(word))
+    keys.extend(('from_end', n, c) for n, c in enumerate(reversed(word)))
+    return keys
+
+def letter_filter_keys(filters: Dict[str, Any]) -> List[Tuple[Any, ...]]:
+    """Translate the letter-content filters of a filter dict into posting keys.
+
+    Every key must match, so a filter dict resolves to the AND of their
+    bitsets. Positions in 'letter_at' are 1-based, as in the rule syntax.
+    """
+    keys = []
+    for c in filters.get('contains', ''):
+        keys.append(('letter', c))
+    for n, c in enumerate(filters.get('starts', '')):
+        keys.append(('at', n, c))
+    for n, c in enumerate(reversed(filters.get('ends', ''))):
+        keys.append(('from_end', n, c))
+    for n, c in filters.get('letter_at', ()):
+        keys.append(('at', n - 1, c))
+    if 'distinct' in filters:
+        keys.append(('distinct', filters['distinct']))
+    if 'pattern' in filters:
+        pattern = filters['pattern']
+        keys.append(('length', len(pattern)))
+        keys.extend(('at', n, c) for n, c in enumerate(pattern) if c != '?')
+    return keys
+
+# Translation tables from a byte value to its bit b (0 or 1)
+_BIT_TABLES = [bytes(value >> b & 1 for value in range(256)) for b in range(8)]
+
+def pack_flags(flags: bytes) -> int:
+    """Pack 0/1 bytes into a bitset (bit i set when flags[i] is 1)"""
+    bits = 0
+    # Rows r, r + 8, r + 16, ... are bit r of successive bytes of the bitset
+    for r in range(8):
+        bits |= int.from_bytes(flags[r::8], 'little') << r
+    return bits
+
+def column_bitsets(column: bytes, zero: bool = False) -> Dict[int, int]:
+    """Return the bitset of rows holding each nonzero byte value of a column (or each value, with zero).
+
+    Each bit of the values is packed once into a bit plane; the rows holding
+    a value are then the AND of the planes (or their complements) of its bits.
+    """
+    values = set(column) if zero else set(column) - {0}
+    if not values:
+        return {}
+    rows = (1 << len(column)) - 1
+    planes = []
+    for b in range(max(set(column)).bit_length()):
+        plane = pack_flags(column.translate(_BIT_TABLES[b]))
+        planes.append((plane, rows ^ plane))
+    bitsets = {}
+    for value in values:
+        bits = rows
+        for b, (plane, complement) in enumerate(planes):
+            bits &= plane if value >> b & 1 else complement
+        bitsets[value] = bits
+    return bitsets
+
+class LetterIndex:
+    """Posting bitsets over word IDs by letter content and position.
+
+    There is one bitset per letter (words containing it), per (position,
+    letter) counted from either end, per length and per number of distinct
+    letters, so the letter filters (contains, starts, ends, letter_at,
+    distinct, pattern) resolve with bitwise ANDs instead of a scan. insert()
+    and delete() keep it in step with edits to the word list like RuleIndex.
+    """
+
+    def __init__(self, words: Sequence[str]):
+        self.size = len(words)
+        self.all = (1 << self.size) - 1
+        lowered = [word.lower() for word in words]
+        alphabet = sorted(set(''.join(lowered)))
+        width = max(map(len, lowered), default=0)
+        if len(alphabet) > 255 or width > 255:
+            buckets = defaultdict(list)
+            for i, word in enumerate(lowered):
+                for key in letter_keys(word):
+                    buckets[key].append(i)
+            self.bitsets = {key: ids_to_bitset(ids, self.size) for key, ids in buckets.items()}
+            return
+
+        # Every key is a byte value in some column: the length, the number of
+        # distinct letters, or the letter at a position from either end, with
+        # letters coded as 1..255 in fixed-width rows so each column is a slice
+        self.bitsets = {}
+        for kind, column in (('length', bytes(map(len, lowered))), ('distinct', bytes(map(len, map(set, lowered))))):
+            for value, bits in column_bitsets(column, zero=True).items():
+                self.bitsets[kind, value] = bits
+        codes = str.maketrans({c: chr(code) for code, c in enumerate(alphabet, 1)})
+        heads = ''.join(word.ljust(width, '\0') for word in lowered).translate(codes).encode('latin-1')
+        tails = ''.join(word[::-1].ljust(width, '\0') for word in lowered).translate(codes).encode('latin-1')
+        for n in range(width):
+            for kind, rows in (('at', heads), ('from_end', tails)):
+                for code, bits in column_bitsets(rows[n::width]).items():
+                    letter = alphabet[code - 1]
+                    self.bitsets[kind, n, letter] = bits
+                    if kind == 'at':
+                        self.bitsets['letter', letter] = self.bitsets.get(('letter', letter), 0) | bits
+
+    def insert(self, i: int, word: str):
+        """Account for word inserted at ID i (IDs from i up move up by one)"""
+        keys = set(letter_keys(word.lower()))
+        for key, bits in self.bitsets.items():
+            self.bitsets[key] = insert_bit(bits, i, key in keys)
+        for key in keys - self.bitsets.keys():
+            self.bitsets[key] = 1 << i
+        self.size += 1
+        self.all = (1 << self.size) - 1
+
+    def delete(self, i: int):
+        """Account for the word at ID i being removed (IDs above it move down by one)"""
+        for key, bits in self.bitsets.items():
+            self.bitsets[key] = delete_bit(bits, i)
+        self.size -= 1
+        self.all = (1 << self.size) - 1
+
+    def filter_bits(self, filters: Dict[str, Any]) -> int:
+        """Resolve the letter filters of a filter dict to the bitset of words passing them"""
+        bits = self.all
+        for key in letter_filter_keys(filters):
+            bits &= self.bitsets.get(key, 0)
+            if not bits:
+                break
+        return bits
+
+class RuleIndex:
+    """Precomputed bitsets over word IDs for every solver rule.
+
+    Word IDs are positions in the corpus word list. Each named rule (POS,
+    double letters, no repeats, alternating, alphabetical) and each length,
+    vowel-count and consonant-count value has one bitset, so a filter dict as
+    produced by fluxer_solver.parse_rule resolves with a few bitwise ANDs.
+    Letter filters are resolved through a LetterIndex, built on first use.
+    insert(), delete() and set_pos() keep the bitsets in step with edits to
+    the word list by shifting bits, without a rebuild.
+    """
+
+    def __init__(self, words: Sequence[str], columns: Dict[str, Sequence[int]]):
+        self.words = words
+        self.size = len(words)
+        self.all = (1 << self.size) - 1
+
+        buckets = defaultdict(list)
+        for i, values in enumerate(zip(*(columns[name] for name in fluxer_corpus.COLUMNS))):
+            for key in word_keys(*values):
+                buckets[key].append(i)
+        self.bitsets = {key: ids_to_bitset(ids, self.size) for key, ids in buckets.items()}
+        self.letters = None
+
+    def letter_index(self) -> LetterIndex:
+        """Return the letter posting index, building it on first use"""
+        if self.letters is None:
+            with fluxer_stats.stage('load: letter index'):
+                self.letters = LetterIndex(self.words)
+        return self.letters
+
+    def letter_bits(self, filters: Dict[str, Any]) -> int:
+        """Resolve the letter filters of a filter dict (all words if there are none)"""
+        if not any(key in filters for key in LETTER_FILTERS):
+            return self.all
+        return self.letter_index().filter_bits(filters)
+
+    def insert(self, i: int, pos: int, length: int, vowels: int, consonants: int, attributes: int):
+        """Account for a word inserted at ID i (IDs from i up move up by one).
+
+        The word itself must already be at self.words[i].
+        """
+        if self.letters is not None:
+            self.letters.insert(i, self.words[i])
+        keys = set(word_keys(pos, length, vowels, consonants, attributes))
+        for key, bits in self.bitsets.items():
+            self.bitsets[key] = insert_bit(bits, i, key in keys)
+        for key in keys - self.bitsets.keys():
+            self.bitsets[key] = 1 << i
+        self.size += 1
+        self.all = (1 << self.size) - 1
+
+    def delete(self, i: int):
+        """Account for the word at ID i being removed (IDs above it move down by one)"""
+        if self.letters is not None:
+            self.letters.delete(i)
+        for key, bits in self.bitsets.items():
+            self.bitsets[key] = delete_bit(bits, i)
+        self.size -= 1
+        self.all = (1 << self.size) - 1
+
+    def set_pos(self, i: int, pos: int):
+        """Replace the POS flags of the word at ID i"""
+        for pos_name, flag in fluxer_corpus.POS_FLAGS.items():
+            bits = self.bitsets.get(('pos', pos_name), 0)
+            self.bitsets['pos', pos_name] = bits | (1 << i) if pos & flag else bits & ~(1 << i)
+
+    def bitset(self, key: str, value: Any) -> int:
+        """Return the bitset for a single rule key and value (empty if no word matches)"""
+        return self.bitsets.get((key, value), 0)
+
+    def filter_bits(self, filters: Dict[str, Any]) -> int:
+        """Resolve a filter dict to the bitset of words passing every filter"""
+        bits = self.all
+        for key in ('length', 'vowels', 'consonants', 'pos'):
+            if key in filters:
+                bits &= self.bitset(key, filters[key])
+        for key in ('double_letters', 'no_repeats', 'alternating', 'alphabetical'):
+            if filters.get(key, False):
+                bits &= self.bitset(key, True)
+        if bits:
+            bits &= self.letter_bits(filters)
+        return bits
+
+    def words_for(self, filters: Dict[str, Any]) -> List[str]:
+        """Return the words passing every filter, in corpus order"""
+        words = self.words
+        return [words[i] for i in bitset_to_ids(self.filter_bits(filters))]
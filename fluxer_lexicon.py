@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+
+import bisect
+import heapq
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterator, Optional, Sequence, Tuple
+
+# Lexicon: a minimized word automaton (DAWG) over the corpus, frozen into flat
+# arrays so it costs a few bytes per edge rather than a dict per trie node, and
+# can be memory-mapped from a file that every process on a host shares.
+#
+# Keys are the UTF-8 bytes of the lowercased words. Nodes are numbered from
+# the root (node 0), and each node's outgoing edges are a contiguous slice,
+# sorted by label, of the per-edge arrays:
+#   labels    the edge bytes (searched with bytes.find)
+#   targets   the node each edge leads to
+#   before    the number of the node's words ranked before the edge's subtree:
+#             1 if the node itself ends a word, plus the words under the
+#             node's earlier edges
+# first[n]..first[n + 1] is node n's edge slice, final marks the nodes that end
+# a word and counts[n] is the number of words at or below node n.
+#
+# Summing before along a word's path gives its rank in sorted order, and the
+# words starting with a string are the ranks [rank, rank + counts[node]) of
+# the node the string leads to. Ranks map to word IDs (positions in the word
+# list) through ids, which is left out when they are the same.
+#
+# The automaton is immutable. Edits to the word list are kept as a small
+# sorted LexiconDelta, and EditedLexicon answers lookups through it, until
+# the lexicons are next rebuilt from the edited list.
+#
+# Lexicon file layout (little-endian), for the prefix lexicon over the words
+# and then the suffix lexicon over their reversed spellings:
+#   header      magic, format version, word list hash, word count
+#   per lexicon node count, edge count, 1 if the ids array is present
+#               first, counts (uint32 per node), targets, before (uint32
+#               per edge), ids (uint32 per word, if present), labels (1 byte
+#               per edge), final (1 byte per node), padding to 4 bytes
+
+MAGIC = b'FLXL'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sH2x32sI')
+SECTION = struct.Struct('<III')
+
+def lexicon_path(corpus_path):
+    """Return the lexicon file path that sits next to a text word list"""
+    return os.path.splitext(corpus_path)[0] + '.fld'
+
+class Lexicon:
+    """Minimized word automaton with word <-> ID mapping and prefix ranges.
+
+    Supports membership (word in lexicon), len(), ordered iteration, get()
+    and index() for word -> ID, word() for ID -> word, and prefix_ids() for
+    the IDs of every word starting with a string. Use build() to make one
+    from a word list; load_lexicons() maps them from a file. The automaton is
+    immutable: after the word list changes, rebuild it or look words up
+    through an EditedLexicon.
+    """
+
+    def __init__(self, first, counts, targets, before, labels: bytes, final, ids=None):
+        self.first = first
+        self.counts = counts
+        self.targets = targets
+        self.before = before
+        self.labels = labels
+        self.final = final
+        self.ids = ids
+        self.size = counts[0] if len(counts) else 0
+        self.ranks = None
+
+    @classmethod
+    def build(cls, words: Sequence[str], reverse: bool = False) -> 'Lexicon':
+        """Build the lexicon of a word list, with IDs as positions in it.
+
+        reverse=True keys it on the reversed spellings, so prefix_ids() finds
+        the words ending with a (reversed) string. A word listed twice keeps
+        its first ID.
+        """
+        keys = sorted(((w.lower()[::-1] if reverse else w.lower()).encode(), i) for i, w in enumerate(words))
+        unique = [(key, i) for n, (key, i) in enumerate(keys) if n == 0 or keys[n - 1][0] != key]
+        ids = array('I', [i for _, i in unique])
+        if all(i == rank for rank, i in enumerate(ids)):
+            ids = None
+        return cls(*freeze(build_nodes([key for key, _ in unique])), ids=ids)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        """Yield the words (as keyed, so reversed for a suffix lexicon) in sorted order"""
+        labels, targets, first, final = self.labels, self.targets, self.first, self.final
+        stack = [(0, b'')]
+        while stack:
+            node, key = stack.pop()
+            if final[node]:
+                yield key.decode()
+            for e in range(first[node + 1] - 1, first[node] - 1, -1):
+                stack.append((targets[e], key + labels[e:e + 1]))
+
+    def walk(self, key: str) -> Tuple[int, int]:
+        """Follow key from the root; returns (node, rank of the first word at or below it), or (-1, 0)"""
+        labels, targets, before, first = self.labels, self.targets, self.before, self.first
+        node = rank = 0
+        for c in key.encode():
+            e = labels.find(c, first[node], first[node + 1])
+            if e < 0:
+                return -1, 0
+            rank += before[e]
+            node = targets[e]
+        return node, rank
+
+    def get(self, word: str, default: Optional[int] = None) -> Optional[int]:
+        """Return the ID of word, or default if it is not in the lexicon"""
+        node, rank = self.walk(word)
+        if node < 0 or not self.final[node]:
+            return default
+        return rank if self.ids is None else self.ids[rank]
+
+    def index(self, word: str) -> int:
+        """Return the ID of word, raising ValueError if it is not in the lexicon"""
+        i = self.get(word)
+        if i is None:
+            raise ValueError(f"{word!r} is not in the lexicon")
+        return i
+
+    def word(self, i: int) -> str:
+        """Return the word (as keyed) with ID i, decoded from the automaton"""
+        if self.ids is None:
+            rank = i
+        else:
+            if self.ranks is None:
+                self.ranks = {word_id: rank for rank, word_id in enumerate(self.ids)}
+            rank = self.ranks.get(i, -1)
+        if not 0 <= rank < self.size:
+            raise IndexError(f"no word with ID {i}")
+        labels, targets, before, first, final = self.labels, self.targets, self.before, self.first, self.final
+        node = 0
+        key = bytearray()
+        while rank or not final[node]:
+            e = bisect.bisect_right(before, rank, first[node], first[node + 1]) - 1
+            rank -= before[e]
+            key.append(labels[e])
+            node = targets[e]
+        return key.decode()
+
+    def rank(self, key: str) -> int:
+        """Return the number of words (as keyed) that sort before key, whether or not key is one"""
+        labels, targets, before, first, counts = self.labels, self.targets, self.before, self.first, self.counts
+        node = rank = 0
+        for c in key.encode():
+            start, end = first[node], first[node + 1]
+            e = labels.find(c, start, end)
+            if e < 0:
+                # The words below node sort before key when their next byte is smaller
+                e = bisect.bisect_left(labels, c, start, end)
+                return rank + (before[e] if e < end else counts[node])
+            rank += before[e]
+            node = targets[e]
+        return rank
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Return the ranks [start, end) of the words starting with prefix"""
+        node, rank = self.walk(prefix)
+        if node < 0:
+            return 0, 0
+        return rank, rank + self.counts[node]
+
+    def prefix_ids(self, prefix: str) -> Sequence[int]:
+        """Return the IDs of the words starting with prefix, in sorted order"""
+        start, end = self.prefix_range(prefix)
+        return range(start, end) if self.ids is None else self.ids[start:end]
+
+    def sections(self):
+        """The uint32 arrays and the byte arrays, in file order"""
+        words = (self.first, self.counts, self.targets, self.before) + ((self.ids,) if self.ids is not None else ())
+        return words, (self.labels, self.final)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the automaton arrays in bytes"""
+        words, raw = self.sections()
+        return sum(len(a) * 4 for a in words) + sum(len(a) for a in raw)
+
+class SortedWords:
+    """A sorted word list with the lookups LexiconDelta needs from its base, by binary search"""
+
+    def __init__(self, words: Sequence[str]):
+        self.words = words
+
+    def get(self, word: str, default: Optional[int] = None) -> Optional[int]:
+        i = bisect.bisect_left(self.words, word)
+        return i if i < len(self.words) and self.words[i] == word else default
+
+    def index(self, word: str) -> int:
+        i = self.get(word)
+        if i is None:
+            raise ValueError(f"{word!r} is not in the word list")
+        return i
+
+    def rank(self, key: str) -> int:
+        return bisect.bisect_left(self.words, key)
+
+class LexiconDelta:
+    """Words added to and removed from the word list a pair of lexicons was built from.
+
+    base is the prefix lexicon of a sorted word list (or a SortedWords copy
+    of the list), so its IDs are positions in that list. The delta keeps the added words sorted, each
+    with the number of base words before it, and the base IDs of the removed
+    words, which is enough to map a base ID to its position in the edited
+    list (kept sorted too) without rebuilding the automaton.
+    """
+
+    def __init__(self, base: Lexicon):
+        self.base = base
+        self.added = []
+        self.added_at = []
+        self.removed = []
+        # Bumped on every edit, so views can tell their cached keys are stale
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed)
+
+    def add(self, word: str):
+        """Record the addition of a word that is not in the edited list"""
+        i = self.base.get(word)
+        if i is not None:
+            del self.removed[bisect.bisect_left(self.removed, i)]
+        else:
+            k = bisect.bisect_left(self.added, word)
+            self.added.insert(k, word)
+            self.added_at.insert(k, self.base.rank(word))
+        self.version += 1
+
+    def remove(self, word: str):
+        """Record the removal of a word that is in the edited list"""
+        k = bisect.bisect_left(self.added, word)
+        if k < len(self.added) and self.added[k] == word:
+            del self.added[k]
+            del self.added_at[k]
+        else:
+            bisect.insort(self.removed, self.base.index(word))
+        self.version += 1
+
+    def current_id(self, i: int) -> Optional[int]:
+        """Return the ID in the edited list of the base word with ID i, or None if it was removed"""
+        j = bisect.bisect_left(self.removed, i)
+        if j < len(self.removed) and self.removed[j] == i:
+            return None
+        return i - j + bisect.bisect_right(self.added_at, i)
+
+    def added_id(self, k: int) -> int:
+        """Return the ID in the edited list of the k-th added word"""
+        at = self.added_at[k]
+        return k + at - bisect.bisect_left(self.removed, at)
+
+class EditedLexicon:
+    """A Lexicon seen through a LexiconDelta, answering for the edited word list.
+
+    Supports the lookups Lexicon does (membership, len(), ordered iteration,
+    get(), index() and prefix_ids()), with IDs in the edited list. reverse
+    must match the base: the delta is shared by a prefix and a suffix view.
+    """
+
+    def __init__(self, base: Lexicon, delta: LexiconDelta, reverse: bool = False):
+        self.base = base
+        self.delta = delta
+        self.reverse = reverse
+        self.keys = []
+        self.version = -1
+
+    def added_keys(self):
+        """The added words as keyed, sorted, each with its index in delta.added"""
+        if self.version != self.delta.version:
+            self.keys = sorted(((w[::-1] if self.reverse else w), k) for k, w in enumerate(self.delta.added))
+            self.version = self.delta.version
+        return self.keys
+
+    def __len__(self) -> int:
+        return len(self.base) - len(self.delta.removed) + len(self.delta.added)
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        """Yield the words (as keyed) of the edited list in sorted order"""
+        removed = {self.base.word(i) for i in self.delta.removed}
+        kept = (key for key in self.base if key not in removed)
+        return heapq.merge(kept, [key for key, _ in self.added_keys()])
+
+    def get(self, word: str, default: Optional[int] = None) -> Optional[int]:
+        """Return the ID of word in the edited list, or default if it is not there"""
+        i = self.base.get(word)
+        if i is not None:
+            i = self.delta.current_id(i)
+            return default if i is None else i
+        keys = self.added_keys()
+        n = bisect.bisect_left(keys, (word,))
+        if n < len(keys) and keys[n][0] == word:
+            return self.delta.added_id(keys[n][1])
+        return default
+
+    def index(self, word: str) -> int:
+        """Return the ID of word, raising ValueError if it is not in the edited list"""
+        i = self.get(word)
+        if i is None:
+            raise ValueError(f"{word!r} is not in the lexicon")
+        return i
+
+    def prefix_ids(self, prefix: str) -> Sequence[int]:
+        """Return the IDs of the words starting with prefix (base words first, then added ones)"""
+        current_id = self.delta.current_id
+        ids = [j for j in map(current_id, self.base.prefix_ids(prefix)) if j is not None]
+        keys = self.added_keys()
+        n = bisect.bisect_left(keys, (prefix,))
+        while n < len(keys) and keys[n][0].startswith(prefix):
+            ids.append(self.delta.added_id(keys[n][1]))
+            n += 1
+        return ids
+
+def build_nodes(keys):
+    """Build the minimized automaton of sorted unique byte keys (Daciuk et al.'s incremental algorithm).
+
+    Returns the registered nodes, each [final, {label: child}, number,
+    count], children always registered (and numbered) before their parents;
+    the root is last.
+    """
+    registry = {}
+    nodes = []
+    root = [False, {}, -1, 0]
+    # Nodes along the previous key: path[d] is reached by its first d + 1 bytes
+    path = []
+    previous = b''
+
+    def register(node):
+        # Its children are registered by now, and were added in label order
+        signature = (node[0], tuple([(c, child[2]) for c, child in node[1].items()]))
+        existing = registry.get(signature)
+        if existing is not None:
+            return existing
+        node[2] = len(nodes)
+        node[3] = node[0] + sum([child[3] for child in node[1].values()])
+        registry[signature] = node
+        nodes.append(node)
+        return node
+
+    def minimize(depth):
+        # Register the nodes below depth on the previous key's path, deepest first
+        while len(path) > depth:
+            node = path.pop()
+            parent = path[-1] if path else root
+            parent[1][previous[len(path)]] = register(node)
+
+    for key in keys:
+        common = 0
+        limit = min(len(key), len(previous))
+        while common < limit and key[common] == previous[common]:
+            common += 1
+        minimize(common)
+        node = path[-1] if path else root
+        for c in key[common:]:
+            child = [False, {}, -1, 0]
+            node[1][c] = child
+            path.append(child)
+            node = child
+        node[0] = True
+        previous = key
+    minimize(0)
+    # The root is never shared, so it is numbered without a registry lookup
+    root[2] = len(nodes)
+    root[3] = root[0] + sum([child[3] for child in root[1].values()])
+    nodes.append(root)
+    return nodes
+
+def freeze(nodes):
+    """Pack registered nodes into the flat arrays, numbering the root (registered last) 0"""
+    count = len(nodes)
+    first = array('I', [0])
+    counts = array('I')
+    targets = array('I')
+    before = array('I')
+    labels = bytearray()
+    final = bytearray()
+    for node in reversed(nodes):
+        final.append(node[0])
+        counts.append(node[3])
+        rank = int(node[0])
+        for c, child in node[1].items():
+            labels.append(c)
+            targets.append(count - 1 - child[2])
+            before.append(rank)
+            rank += child[3]
+        first.append(len(targets))
+    return first, counts, targets, before, bytes(labels), final
+
+def write_lexicons(path, digest, words):
+    """Build the prefix and suffix lexicons of a word list and write them atomically"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, digest, len(words)))
+            for reverse in (False, True):
+                lexicon = Lexicon.build(words, reverse)
+                uint32s, raw = lexicon.sections()
+                f.write(SECTION.pack(len(lexicon.final), len(lexicon.targets), lexicon.ids is not None))
+                for a in uint32s:
+                    a.tofile(f)
+                size = 0
+                for a in raw:
+                    f.write(a)
+                    size += len(a)
+                f.write(bytes(-size % 4))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_lexicons(path):
+    """Map a lexicon file, returning (digest, word count, prefix lexicon, suffix lexicon).
+
+    The arrays are zero-copy views of the mapping (only the labels are
+    copied), so processes loading the same file share its pages. Raises
+    ValueError if it is not a valid lexicon file.
+    """
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is truncated")
+    magic, version, digest, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} lexicon file")
+    view = memoryview(data)
+    offset = HEADER.size
+    lexicons = []
+    for _ in range(2):
+        if len(data) < offset + SECTION.size:
+            raise ValueError(f"{path} is truncated")
+        nodes, edges, has_ids = SECTION.unpack_from(data, offset)
+        offset += SECTION.size
+        sizes = [nodes + 1, nodes, edges, edges] + ([count] if has_ids else [])
+        end = offset + 4 * sum(sizes) + edges + nodes
+        if len(data) < end:
+            raise ValueError(f"{path} is truncated")
+        uint32s = []
+        for size in sizes:
+            uint32s.append(view[offset:offset + 4 * size].cast('I'))
+            offset += 4 * size
+        labels = bytes(view[offset:offset + edges])
+        final = view[offset + edges:end]
+        offset = end + (-(edges + nodes) % 4)
+        first, counts, targets, before = uint32s[:4]
+        lexicons.append(Lexicon(first, counts, targets, before, labels, final, uint32s[4] if has_ids else None))
+    if len(data) != offset:
+        raise ValueError(f"{path} is truncated")
+    return digest, count, lexicons[0], lexicons[1]
+
+def main():
+    """Build the lexicon file used for prefix and suffix lookups"""
+    import fluxer
+    try:
+        prefixes, suffixes = fluxer.build_lexicons(force=True)
+    except OSError as e:
+        print(f"Error: could not write the lexicon file: {e}")
+        sys.exit(1)
+    print(f"Wrote {len(prefixes)} words to {lexicon_path(fluxer.corpus)}: "
+          f"{len(prefixes.final)} + {len(suffixes.final)} nodes, {prefixes.nbytes + suffixes.nbytes} bytes")
+
+if __name__ == "__main__":
+    main()
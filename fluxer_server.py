@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import fluxer
+import fluxer_solver
+
+# Solutions returned when a request does not ask for a number
+DEFAULT_PRINT = 100
+
+MAX_BODY_BYTES = 64 * 1024
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    504: 'Gateway Timeout',
+}
+
+class RequestError(Exception):
+    """A request that cannot be served, with the HTTP status to report"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def load_corpus():
+    """Load the corpus and build every index once, so queries start hot.
+
+    Once loaded, edits to the word lists on disk are picked up incrementally
+    (see fluxer.reload_if_changed), so the server never needs a restart.
+    """
+    if not fluxer.words:
+        fluxer.ensure_words_corpus()
+    else:
+        fluxer.reload_if_changed()
+    # The scripts build these lazily; a server wants them up front
+    fluxer.get_word_pos()
+    fluxer.get_lexicons()
+    fluxer.get_rule_index()
+
+def is_count(value: Any) -> bool:
+    """Whether a JSON value is a non-negative integer (true and false are not)"""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+def match_query(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Serve a fluxer query: ranked matches for a prefix and optional suffix"""
+    prefix = params.get('prefix')
+    if not isinstance(prefix, str) or not prefix:
+        raise RequestError(400, "'prefix' must be a non-empty string")
+    for key in ('suffix', 'pos', 'contains', 'starts', 'ends', 'pattern'):
+        if params.get(key) is not None and not isinstance(params[key], str):
+            raise RequestError(400, f"'{key}' must be a string")
+    for key in ('length', 'vowels', 'consonants', 'distinct'):
+        if params.get(key) is not None and not is_count(params[key]):
+            raise RequestError(400, f"'{key}' must be a non-negative integer")
+    for key in ('double_letters', 'no_repeats', 'alternating', 'alphabetical'):
+        if params.get(key) is not None and not isinstance(params[key], bool):
+            raise RequestError(400, f"'{key}' must be true or false")
+    suffix = params.get('suffix') or None
+    filters = {key: params[key] for key in ('length', 'vowels', 'consonants', 'pos') if params.get(key) is not None}
+    if 'pos' in filters:
+        filters['pos'] = filters['pos'].lower()
+    for key in ('double_letters', 'no_repeats', 'alternating', 'alphabetical'):
+        if params.get(key):
+            filters[key] = True
+    for key in ('contains', 'starts', 'ends', 'pattern'):
+        if params.get(key):
+            filters[key] = params[key].lower()
+    if params.get('distinct') is not None:
+        filters['distinct'] = params['distinct']
+    if params.get('letter_at'):
+        letter_at = params['letter_at']
+        if not isinstance(letter_at, list) or not all(
+                isinstance(pair, list) and len(pair) == 2 and is_count(pair[0]) and isinstance(pair[1], str) and len(pair[1]) == 1
+                for pair in letter_at):
+            raise RequestError(400, "'letter_at' must be a list of [position, letter] pairs")
+        filters['letter_at'] = sorted([position, letter.lower()] for position, letter in letter_at)
+    limit = params.get('limit')
+    if limit is not None and not is_count(limit):
+        raise RequestError(400, "'limit' must be a non-negative integer")
+    matches = fluxer.ranked_matches(prefix, suffix, filters)
+    return {'total': len(matches), 'matches': matches[:limit] if limit is not None else matches}
+
+def serve_matches(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick up word list edits, then serve a match query; runs in the match thread"""
+    load_corpus()
+    return match_query(params)
+
+def solve_puzzle(start: str, rules: Tuple[str, ...], max_solutions: Optional[int], top: Optional[int], max_print: int) -> Dict[str, Any]:
+    """Solve one puzzle without printing; runs in the executor"""
+    load_corpus()
+    solutions, total = fluxer_solver.solve_puzzle(start, list(rules), fluxer, max_solutions, top, max_print)
+    return {
+        'total': total,
+        'solutions': [{'path': solution, 'overlap': total_overlap} for solution, total_overlap in solutions],
+    }
+
+def solve_params(params: Dict[str, Any]) -> Tuple[str, Tuple[str, ...], Optional[int], Optional[int], int]:
+    """Validate a /solutions request into solve_puzzle arguments"""
+    start = params.get('start')
+    if not isinstance(start, str) or not start:
+        raise RequestError(400, "'start' must be a non-empty string")
+    rules = params.get('rules')
+    if isinstance(rules, str):
+        rules = rules.split(',')
+    if not isinstance(rules, list) or not rules:
+        raise RequestError(400, "'rules' must be a non-empty list (or comma-separated string) of rules")
+    rules = tuple(str(rule).strip() for rule in rules)
+    max_solutions = None if params.get('all') else params.get('max_solutions', 5)
+    top = params.get('top')
+    max_print = params.get('print', DEFAULT_PRINT)
+    for name, value in (('max_solutions', max_solutions), ('top', top), ('print', max_print)):
+        if value is not None and not is_count(value):
+            raise RequestError(400, f"'{name}' must be a non-negative integer")
+    if len(rules) != 3 and max_solutions is None and top is None:
+        raise RequestError(400, "'all' needs exactly 3 rules; ask for 'top' solutions of other chain lengths")
+    return start.lower(), rules, max_solutions, top, max_print
+
+class FluxerServer:
+    """Local HTTP/JSON query server that keeps the corpus and indexes hot.
+
+    Match queries (and the word list reloads before them) are answered in a
+    single thread, so the event loop never waits on them; solves run in a
+    process pool whose workers inherit (or load) the corpus once. A match
+    query that times out still finishes in its thread. Identical in-flight
+    queries are coalesced into one computation, at most max_concurrent solves
+    run at a time, and each request is abandoned with 504 after timeout seconds.
+    A solve still running when a request waiting on it times out is stopped:
+    a running call cannot be cancelled, so the pool is replaced, and the
+    other solves it was running start over on the new one.
+    """
+
+    def __init__(self, workers: int = 2, max_concurrent: int = 4, timeout: float = 30.0):
+        self.workers = workers
+        self.executor = self._new_executor()
+        # The loaded corpus is not thread-safe, so one thread applies word list
+        # reloads and answers match queries, off the event loop
+        self.match_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.timeout = timeout
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.closed = False
+
+    def _new_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=load_corpus)
+
+    def _recycle(self, executor: concurrent.futures.ProcessPoolExecutor):
+        """Replace a pool whose workers are stuck or broken, killing its processes"""
+        if self.closed or executor is not self.executor:
+            return
+        self.executor = self._new_executor()
+        # ProcessPoolExecutor has no public way to stop a running call
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _solve(self, args: Tuple) -> Dict[str, Any]:
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            while True:
+                executor = self.executor
+                try:
+                    return await loop.run_in_executor(executor, solve_puzzle, *args)
+                except asyncio.CancelledError:
+                    # Timed out: free the worker as well as the slot
+                    self._recycle(executor)
+                    raise
+                except concurrent.futures.BrokenExecutor:
+                    # Another solve's timeout replaced the pool: run again on the new one
+                    if executor is self.executor:
+                        self._recycle(executor)
+                        raise
+
+    def _finished(self, key: str, task: asyncio.Future):
+        self.in_flight.pop(key, None)
+        # Retrieve the outcome so a failure nobody waited for (after a timeout) is not reported as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    async def coalesced(self, key: str, start: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Await the in-flight task for key (started with start() if there is none), within the timeout"""
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(start())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        try:
+            # Shield the shared task so a caller's timeout cancels it only explicitly
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            task.cancel()
+        except asyncio.CancelledError:
+            # Another caller of the same query timed out and stopped it
+            if not task.cancelled():
+                raise
+        raise RequestError(504, f"Query did not finish within {self.timeout:g} seconds")
+
+    async def matches(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await self.coalesced(json.dumps(['matches', params], sort_keys=True),
+                                    lambda: loop.run_in_executor(self.match_executor, serve_matches, params))
+
+    async def solutions(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        args = solve_params(params)
+        return await self.coalesced(json.dumps(['solutions', args]), lambda: self._solve(args))
+
+    async def route(self, method: str, path: str, body: bytes) -> Dict[str, Any]:
+        if path == '/health':
+            return {'status': 'ok', 'words': len(fluxer.words), 'in_flight': len(self.in_flight)}
+        if path not in ('/matches', '/solutions'):
+            raise RequestError(404, f"Unknown endpoint {path}")
+        if method != 'POST':
+            raise RequestError(405, f"{path} expects POST")
+        try:
+            params = json.loads(body or b'{}')
+        except ValueError:
+            raise RequestError(400, "Request body must be JSON")
+        if not isinstance(params, dict):
+            raise RequestError(400, "Request body must be a JSON object")
+        if path == '/matches':
+            return await self.matches(params)
+        return await self.solutions(params)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        status, payload = 200, None
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            if len(request_line) < 2:
+                raise RequestError(400, "Malformed request line")
+            method, path = request_line[0].upper(), request_line[1].split('?', 1)[0]
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+                if line in ('\r\n', '\n', ''):
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0) or 0)
+            if length > MAX_BODY_BYTES:
+                raise RequestError(413, "Request body too large")
+            body = await reader.readexactly(length) if length else b''
+            payload = await self.route(method, path, body)
+        except RequestError as e:
+            status, payload = e.status, {'error': str(e)}
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        data = json.dumps(payload).encode()
+        writer.write(f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                     f"Content-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def close(self):
+        self.closed = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.match_executor.shutdown(wait=False, cancel_futures=True)
+
+async def serve(args):
+    load_corpus()
+    server = FluxerServer(args.workers, args.max_concurrent, args.timeout)
+    if args.unix:
+        listener = await asyncio.start_unix_server(server.handle, path=args.unix)
+        where = args.unix
+    else:
+        listener = await asyncio.start_server(server.handle, args.host, args.port)
+        where = f"http://{args.host}:{args.port}"
+    print(f"Serving {len(fluxer.words)} words on {where}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve fluxer matches and solver results over a local HTTP/JSON API",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Endpoints:
+  GET  /health
+  POST /matches    {"prefix": "play", "suffix": "time", "length": 6, "limit": 10}
+  POST /solutions  {"start": "perhaps", "rules": ["noun", "6-letters", "double"], "top": 5}
+        """
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--unix", type=str, default=None, help="Listen on a Unix socket at this path instead of TCP")
+    parser.add_argument("--workers", "-w", type=int, default=2, help="Solver worker processes (default: 2)")
+    parser.add_argument("--max-concurrent", type=int, default=4, help="Maximum solves running or queued for a worker at once (default: 4)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds (default: 30)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
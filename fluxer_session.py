@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+
+import cmd
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+# Filters that take a value, with the type of the value
+VALUE_FILTERS = {
+    'length': int,
+    'vowels': int,
+    'consonants': int,
+    'distinct': int,
+    'pos': str,
+    'contains': str,
+    'starts': str,
+    'ends': str,
+    'pattern': str,
+}
+
+# On/off filters, by the name used in commands
+FLAG_FILTERS = {
+    'double-letters': 'double_letters',
+    'double': 'double_letters',
+    'no-repeats': 'no_repeats',
+    'alternating': 'alternating',
+    'alphabetical': 'alphabetical',
+}
+
+# Cached lexicon lookups and result sets kept; the oldest are dropped first
+AFFIX_CACHE_SIZE = 64
+RESULT_CACHE_SIZE = 64
+
+Atoms = FrozenSet[Tuple[str, Any]]
+
+def filter_atoms(filters: Dict[str, Any]) -> Atoms:
+    """Split a filter dict into its single constraints, so filter sets compare as sets"""
+    atoms = set()
+    for key, value in filters.items():
+        if key == 'letter_at':
+            atoms.update(('letter_at', tuple(pair)) for pair in value)
+        else:
+            atoms.add((key, value))
+    return frozenset(atoms)
+
+def atoms_filters(atoms: Atoms) -> Dict[str, Any]:
+    """Rebuild a filter dict from its constraints"""
+    filters = {}
+    for key, value in atoms:
+        if key == 'letter_at':
+            filters.setdefault('letter_at', []).append(list(value))
+        else:
+            filters[key] = value
+    if 'letter_at' in filters:
+        filters['letter_at'].sort()
+    return filters
+
+def remember(cache: Dict, key: Any, value: Any, size: int):
+    """Store value in an insertion-ordered cache, dropping the oldest entry past size"""
+    cache.pop(key, None)
+    cache[key] = value
+    if len(cache) > size:
+        del cache[next(iter(cache))]
+
+class Session(cmd.Cmd):
+    """Interactive fluxer.py session that keeps the corpus loaded between queries.
+
+    Every result set is cached under its prefix, suffix and filters. Adding a
+    filter narrows the current set, since a filter can only remove words;
+    dropping one starts from the smallest cached set whose filters are a
+    subset of the new ones (at worst the unfiltered matches) and applies the
+    rest. The lexicon lookups for each prefix and suffix are cached separately,
+    so changing only one of them reuses the other. fluxer is the fluxer
+    module, as for the solver.
+    """
+
+    intro = ("fluxer session: 'find PREFIX [SUFFIX]', 'add FILTER [VALUE]', 'drop FILTER [VALUE]', "
+             "'clear', 'more' (or Enter), 'show', 'filters', 'quit'. 'help' lists every command.")
+    prompt = 'fluxer> '
+
+    def __init__(self, fluxer, prefix: Optional[str] = None, suffix: Optional[str] = None,
+                 filters: Optional[Dict[str, Any]] = None, page_size: int = 10):
+        super().__init__()
+        self.fluxer = fluxer
+        self.prefix = prefix.lower() if prefix else None
+        self.suffix = suffix.lower() if suffix else None
+        self.atoms = filter_atoms(filters or {})
+        self.page_size = page_size
+        self.affixes: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.results: Dict[Tuple[str, Optional[str], Atoms], List[Tuple[str, int]]] = {}
+        self.ranked: List[Tuple[str, int]] = []
+        self.shown = 0
+        color = fluxer.supports_color()
+        self.bold, self.cyan, self.yellow, self.magenta, self.reset = (
+            (fluxer.BOLD, fluxer.CYAN, fluxer.YELLOW, fluxer.MAGENTA, fluxer.RESET) if color else ('',) * 5)
+
+    def preloop(self):
+        self.fluxer.ensure_words_corpus()
+        # The intro goes before the results of a query given on the command line
+        print(self.intro)
+        self.intro = None
+        if self.prefix:
+            self.refresh()
+
+    # Query evaluation
+
+    def affix_overlaps(self, kind: str, key: str) -> Dict[str, int]:
+        """Cached lexicon lookup: words starting with a tail of key ('start') or ending with a head of it ('end')"""
+        overlaps = self.affixes.get((kind, key))
+        if overlaps is None:
+            prefixes, suffixes = self.fluxer.get_lexicons()
+            if kind == 'start':
+                overlaps = self.fluxer.affix_overlaps(prefixes, key)
+            else:
+                overlaps = self.fluxer.affix_overlaps(suffixes, key, reverse=True)
+            remember(self.affixes, (kind, key), overlaps, AFFIX_CACHE_SIZE)
+        return overlaps
+
+    def matches(self) -> List[Tuple[str, int]]:
+        """The unfiltered matches of the current prefix and suffix, ranked as fluxer.py ranks them"""
+        key = (self.prefix, self.suffix, frozenset())
+        ranked = self.results.get(key)
+        if ranked is None:
+            starts = self.affix_overlaps('start', self.prefix)
+            if self.suffix:
+                ends = self.affix_overlaps('end', self.suffix)
+                overlaps = {w: overlap + ends[w] for w, overlap in starts.items() if w in ends}
+            else:
+                overlaps = starts
+            ranked = sorted(overlaps.items(), key=lambda x: (-x[1], -len(x[0]), x[0]))
+            remember(self.results, key, ranked, RESULT_CACHE_SIZE)
+        return ranked
+
+    def evaluate(self) -> Tuple[List[Tuple[str, int]], int]:
+        """Return the current result set and the size of the set it was narrowed from"""
+        key = (self.prefix, self.suffix, self.atoms)
+        ranked = self.results.get(key)
+        if ranked is not None:
+            remember(self.results, key, ranked, RESULT_CACHE_SIZE)
+            return ranked, len(ranked)
+
+        # Narrow the smallest cached set whose filters are all still applied
+        parent, parent_atoms = self.matches(), frozenset()
+        for (prefix, suffix, atoms), cached in self.results.items():
+            if prefix == self.prefix and suffix == self.suffix and atoms <= self.atoms and len(cached) < len(parent):
+                parent, parent_atoms = cached, atoms
+        remaining = atoms_filters(self.atoms - parent_atoms)
+        passes_filters = self.fluxer.passes_filters
+        ranked = [(w, overlap) for w, overlap in parent if passes_filters(w, remaining)]
+        remember(self.results, key, ranked, RESULT_CACHE_SIZE)
+        return ranked, len(parent)
+
+    def refresh(self):
+        """Re-evaluate the query and show the first page of results"""
+        if not self.prefix:
+            print("No query yet: use 'find PREFIX [SUFFIX]'")
+            return
+        # Edits to the word lists made elsewhere invalidate every cached set
+        if self.fluxer.reload_if_changed():
+            self.affixes.clear()
+            self.results.clear()
+        started = time.perf_counter()
+        self.ranked, parent_size = self.evaluate()
+        elapsed = (time.perf_counter() - started) * 1000
+        narrowed = f" of {parent_size}" if parent_size != len(self.ranked) else ""
+        print(f"{self.magenta}{self.bold}{len(self.ranked)}{narrowed} matches for {self.describe()} ({elapsed:.1f} ms){self.reset}")
+        self.shown = 0
+        self.show_page()
+
+    def show_page(self, count: Optional[int] = None):
+        end = min(self.shown + (count or self.page_size), len(self.ranked))
+        for w, overlap in self.ranked[self.shown:end]:
+            print(f"{self.bold}{self.cyan}{w.upper()}{self.reset} {self.yellow}(overlap: {overlap}){self.reset}")
+        self.shown = end
+        if self.shown < len(self.ranked):
+            print(f"... {len(self.ranked) - self.shown} more ('more' or Enter)")
+
+    def describe(self) -> str:
+        query = self.prefix.upper() + (f" {self.suffix.upper()}" if self.suffix else "")
+        parts = []
+        for key, value in sorted(atoms_filters(self.atoms).items()):
+            if value is True:
+                parts.append(key.replace('_', '-'))
+            elif key == 'letter_at':
+                parts.extend(f"at {n}:{c}" for n, c in value)
+            else:
+                parts.append(f"{key} {value}")
+        return query + (f" [{', '.join(parts)}]" if parts else "")
+
+    # Filter arguments
+
+    def parse_filter(self, arg: str, need_value: bool = True) -> Optional[Tuple[str, Any]]:
+        """Parse 'FILTER [VALUE]' into a constraint, printing an error for a bad one.
+
+        Returns (key, None) for a value filter given without a value when
+        need_value is False (to drop every value of it).
+        """
+        name, _, value = arg.strip().lower().partition(' ')
+        name = name.replace('_', '-')
+        value = value.strip()
+        if name in FLAG_FILTERS:
+            return FLAG_FILTERS[name], True
+        if name not in VALUE_FILTERS and name != 'at':
+            print(f"Unknown filter '{name}' (expected one of: {', '.join(sorted([*VALUE_FILTERS, *FLAG_FILTERS, 'at']))})")
+            return None
+        if not value:
+            if need_value:
+                print(f"'{name}' needs a value")
+                return None
+            return ('letter_at' if name == 'at' else name), None
+        if name == 'at':
+            try:
+                return 'letter_at', tuple(self.fluxer.letter_position(value))
+            except Exception as e:
+                print(e)
+                return None
+        if VALUE_FILTERS[name] is int:
+            try:
+                return name, int(value)
+            except ValueError:
+                print(f"'{name}' needs a whole number, got '{value}'")
+                return None
+        return name, value
+
+    # Commands
+
+    def do_find(self, arg):
+        """find PREFIX [SUFFIX]: set the query words (filters are kept)"""
+        words = arg.split()
+        if not 1 <= len(words) <= 2:
+            print("Usage: find PREFIX [SUFFIX]")
+            return
+        self.prefix = words[0].lower()
+        self.suffix = words[1].lower() if len(words) > 1 else None
+        self.refresh()
+
+    def do_prefix(self, arg):
+        """prefix PREFIX: change the prefix, keeping the suffix and filters"""
+        if not arg.strip():
+            print("Usage: prefix PREFIX")
+            return
+        self.prefix = arg.strip().lower()
+        self.refresh()
+
+    def do_suffix(self, arg):
+        """suffix [SUFFIX]: change the suffix, or remove it when none is given"""
+        self.suffix = arg.strip().lower() or None
+        self.refresh()
+
+    def do_add(self, arg):
+        """add FILTER [VALUE]: add a filter, e.g. 'add length 6', 'add double', 'add at 3:e', 'add pattern ?a??e'"""
+        atom = self.parse_filter(arg)
+        if atom is None:
+            return
+        key, _ = atom
+        # A filter with a single value replaces its old value; positions add up
+        atoms = self.atoms if key == 'letter_at' else frozenset(a for a in self.atoms if a[0] != key)
+        self.atoms = atoms | {atom}
+        self.refresh()
+
+    def do_drop(self, arg):
+        """drop FILTER [VALUE]: remove a filter ('drop at' removes every position, 'drop at 3:e' just that one)"""
+        atom = self.parse_filter(arg, need_value=False)
+        if atom is None:
+            return
+        key, value = atom
+        if key == 'letter_at' and value is not None:
+            atoms = self.atoms - {atom}
+        else:
+            atoms = frozenset(a for a in self.atoms if a[0] != key)
+        if atoms == self.atoms:
+            print(f"No '{arg.strip()}' filter is set")
+            return
+        self.atoms = atoms
+        self.refresh()
+
+    def do_clear(self, arg):
+        """clear: remove every filter"""
+        self.atoms = frozenset()
+        self.refresh()
+
+    def do_filters(self, arg):
+        """filters: show the current query and filters"""
+        print(self.describe() if self.prefix else "No query yet")
+
+    def do_show(self, arg):
+        """show [N]: show the first N results again (default: one page)"""
+        try:
+            count = int(arg) if arg.strip() else None
+        except ValueError:
+            print("Usage: show [N]")
+            return
+        self.shown = 0
+        self.show_page(count)
+
+    def do_more(self, arg):
+        """more: show the next page of results (Enter on an empty line does the same)"""
+        if self.shown >= len(self.ranked):
+            print("No more matches")
+            return
+        self.show_page()
+
+    def emptyline(self):
+        if self.ranked and self.shown < len(self.ranked):
+            self.show_page()
+
+    def do_quit(self, arg):
+        """quit: leave the session"""
+        return True
+
+    do_exit = do_quit
+
+    def do_EOF(self, arg):
+        print()
+        return True
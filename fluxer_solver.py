@@ -1,9 +1,22 @@
 #!/usr/bin/env python3
 
+import time
+
+# Taken before the other imports, for --profile-startup
+IMPORT_STARTED = time.perf_counter()
+
 import argparse
+import heapq
+import itertools
+import json
 import sys
-from typing import List, Tuple, Optional, Dict, Any
-import importlib.util
+from collections import defaultdict
+from typing import List, Tuple, Optional, Dict, Any, Callable, Iterable, Iterator
+
+import fluxer
+import fluxer_cache
+import fluxer_stats
+import fluxer_store
 
 # ANSI color codes for colorful output
 class Colors:
@@ -21,13 +34,8 @@ class Colors:
     BRIGHT_YELLOW = '\033[93m'
     BRIGHT_BLUE = '\033[94m'
 
-# Import functions from fluxer.py
-def import_fluxer_functions():
-    """Import necessary functions from fluxer.py"""
-    spec = importlib.util.spec_from_file_location("fluxer", "fluxer.py")
-    fluxer = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(fluxer)
-    return fluxer
+# Bump when a change alters solver results, so cached results are not reused
+ENGINE_VERSION = 2
 
 # Rule definitions
 RULE_DEFINITIONS = {
@@ -71,6 +79,28 @@ def parse_vowel_consonant_rule(rule: str) -> Dict[str, Any]:
             pass
     return {}
 
+def parse_letter_rule(rule: str) -> Dict[str, Any]:
+    """Parse letter-content rules like 'contains-x', 'starts-st', 'ends-ing', 'e-at-3', '5-distinct' and '?a??e'"""
+    if '?' in rule:
+        return {'pattern': rule} if all(c == '?' or c.isalpha() for c in rule) else {}
+    name, _, letters = rule.partition('-')
+    if name in ('contains', 'starts', 'ends') and letters.isalpha():
+        return {name: letters}
+    parts = rule.split('-')
+    if len(parts) == 3 and parts[1] == 'at' and len(parts[0]) == 1 and parts[0].isalpha():
+        try:
+            position = int(parts[2])
+        except ValueError:
+            return {}
+        if position >= 1:
+            return {'letter_at': [[position, parts[0]]]}
+    if len(parts) == 2 and parts[1] == 'distinct':
+        try:
+            return {'distinct': int(parts[0])}
+        except ValueError:
+            pass
+    return {}
+
 def parse_rule(rule: str) -> Dict[str, Any]:
     """Parse a single rule string into a dictionary of filter parameters"""
     rule = rule.lower().strip()
@@ -89,6 +119,11 @@ def parse_rule(rule: str) -> Dict[str, Any]:
     if vc_rule:
         return vc_rule
     
+    # Check letter-content and position rules
+    letter_rule = parse_letter_rule(rule)
+    if letter_rule:
+        return letter_rule
+    
     # If no match, return empty dict
     return {}
 
@@ -128,19 +163,341 @@ def apply_filters(word: str, filters: Dict[str, Any], fluxer) -> bool:
     if filters.get('alphabetical', False) and not fluxer.is_alphabetical_order(word):
         return False
     
+    # Letter-content and position filters
+    if not fluxer.passes_letter_filters(word, filters):
+        return False
+    
     return True
 
-def find_solutions(starting_word: str, rules: List[str], fluxer, max_solutions: Optional[int] = 5) -> List[Tuple[List[str], int]]:
-    """Find multiple complete 3-word solution paths with total overlap calculation"""
-    # Parse all rules
-    rule_filters = [parse_rule(rule) for rule in rules]
+def build_head_index(entries: Iterable[Tuple[str, Any]]) -> Dict[str, List[Tuple[str, Any]]]:
+    """Index (word, data) entries by every run of each word's leading letters"""
+    head_index = defaultdict(list)
+    for word, data in entries:
+        word_lower = word.lower()
+        for i in range(1, len(word_lower) + 1):
+            head_index[word_lower[:i]].append((word, data))
+    return head_index
+
+def head_matches(word: str, head_index: Dict[str, List[Tuple[str, Any]]]) -> Dict[str, Tuple[int, Any]]:
+    """Look up indexed words that start with a tail of word.
+
+    Returns a mapping of indexed word -> (overlap with word, entry data).
+    Tails are tried longest first, so the first hit for a word is its prefix overlap.
+    """
+    word = word.lower()
+    matches = {}
+    examined = 0
+    for i in range(len(word)):
+        overlap = len(word) - i
+        entries = head_index.get(word[i:], ())
+        examined += len(entries)
+        for match, data in entries:
+            if match not in matches:
+                matches[match] = (overlap, data)
+    fluxer_stats.count('candidates', examined)
+    fluxer_stats.count('overlaps', len(matches))
+    return matches
+
+def find_closing_words(words_rule3: List[str], starting_word: str, fluxer) -> List[Tuple[str, int]]:
+    """Return the rule-3 words ending in a head of the starting word, with that closing overlap"""
+    closing_words = []
+    for word in words_rule3:
+        overlap_start = fluxer.suffix_overlap(word, starting_word)
+        if overlap_start > 0:
+            closing_words.append((word, overlap_start))
+    fluxer_stats.count('candidates', len(words_rule3))
+    fluxer_stats.count('overlaps', len(words_rule3))
+    return closing_words
+
+def build_closing_index(words_rule3: List[str], starting_word: str, fluxer) -> Dict[str, List[Tuple[str, int]]]:
+    """Index the rule-3 words that close the cycle by every run of their leading letters.
+
+    Only words ending in a head of the starting word are kept, each paired with
+    that closing overlap, so the check is done once per puzzle.
+    """
+    return build_head_index(find_closing_words(words_rule3, starting_word, fluxer))
+
+def build_tail_index(words: List[str]) -> Dict[str, List[str]]:
+    """Index words by every run of their trailing letters"""
+    tail_index = defaultdict(list)
+    for word in words:
+        word_lower = word.lower()
+        for i in range(len(word_lower)):
+            tail_index[word_lower[i:]].append(word)
+    return tail_index
+
+def build_join_index(words_rule2: List[str], closing_words: List[Tuple[str, int]]) -> Tuple[Dict[str, List[Tuple[str, Any]]], Dict[str, List[Tuple[str, int]]]]:
+    """Join rule-2 words against the closing words for the meet-in-the-middle engine.
+
+    Each closing word's heads are looked up in an index of rule-2 words keyed by
+    their trailing letters, which yields every (step 2, step 3) edge once per
+    puzzle. Returns a head index of the rule-2 words that can close the cycle,
+    and for each of them its closing words ranked by overlap with the step-2
+    word plus overlap with the starting word.
+    """
+    tail_index = build_tail_index(words_rule2)
+    completions = defaultdict(dict)
+    for word, overlap_start in closing_words:
+        word_lower = word.lower()
+        # Longest head first, so the first hit for a step-2 word is its overlap
+        for i in range(len(word_lower), 0, -1):
+            for step2_word in tail_index.get(word_lower[:i], ()):
+                if word not in completions[step2_word]:
+                    completions[step2_word][word] = i + overlap_start
     
-    if len(rule_filters) != 3:
-        print(f"Error: Expected 3 rules, got {len(rules)}")
-        return []
+    ranked_completions = {}
+    for step2_word, step3_overlaps in completions.items():
+        ranked_completions[step2_word] = sorted(step3_overlaps.items(), key=lambda x: (-x[1], -len(x[0]), x[0]))
+    rule2_index = build_head_index((word, None) for word in words_rule2 if word in ranked_completions)
+    return rule2_index, ranked_completions
+
+def prefilter_rules(rules: List[str], rule_filters: List[Dict[str, Any]], fluxer) -> List[List[str]]:
+    """Pre-filter the corpus for each rule (only by rule criteria, not overlap)"""
+    print(f"{Colors.CYAN}Pre-filtering words for each rule...{Colors.END}")
+    rule_words = rule_candidates(rule_filters, fluxer)
+    print_rule_counts(rules, rule_words)
+    return rule_words
+
+def print_rule_counts(rules: List[str], rule_words: List[List[str]]):
+    """Print the number of candidate words for each rule"""
+    for i, (rule, words) in enumerate(zip(rules, rule_words), 1):
+        print(f"{Colors.GREEN}Rule {i} ({rule}): {Colors.YELLOW}{len(words)}{Colors.GREEN} words{Colors.END}")
+
+def overlap_matches(target: str, candidates: List[str], fluxer) -> List[Tuple[str, int]]:
+    """Return candidates that start with a tail of target, ranked by overlap, length and spelling"""
+    matches = []
+    for word in candidates:
+        overlap = fluxer.prefix_overlap(word, target)
+        if overlap > 0:
+            matches.append((word, overlap))
+    fluxer_stats.count('candidates', len(candidates))
+    fluxer_stats.count('overlaps', len(candidates))
+    matches.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
+    return matches
+
+def _quiet(*args, **kwargs):
+    """Stand-in for print when output is disabled"""
+
+def format_path(solution: List[str]) -> str:
+    """Format a solution path for display, e.g. PERHAPS → HAPS → PSYCHO → CHOPPER"""
+    return ' → '.join(word.upper() for word in solution)
+
+def print_new_best(solution: List[str], total_overlap: int):
+    """Announce a solution that beats every solution found so far"""
+    print(f"\n{Colors.BOLD}{Colors.BRIGHT_GREEN}🎉 NEW BEST! 🎉{Colors.END}")
+    print(f"{Colors.BOLD}{Colors.BRIGHT_GREEN}{format_path(solution)} {Colors.YELLOW}(overlap: {total_overlap}){Colors.END}")
+
+ENGINES = ('search', 'join', 'graph')
+
+class BranchSearch:
+    """Per-puzzle state for expanding step-1 branches into complete solutions.
+
+    The 'search' engine scans the rule-2 list forward from each step-1 word.
+    The 'join' engine works from both ends of the cycle: it joins the step-1
+    words and the closing words through indexes of rule-2 words keyed by their
+    leading and trailing letters, so its work grows with the number of edges
+    and solutions rather than with |rule 1| x |rule 2| x |rule 3|. The
+    'graph' engine walks the precomputed overlap graph (see fluxer_graph),
+    restricting each adjacency list to the next rule's words with a node mask.
+    All engines produce the same solutions in the same order.
+    """
+
+    def __init__(self, starting_word: str, words_rule2: List[str], words_rule3: List[str], fluxer, engine: str = 'search'):
+        self.starting_word = starting_word
+        self.words_rule2 = words_rule2
+        self.fluxer = fluxer
+        self.engine = engine
+        if engine == 'join':
+            # Step-2 words that can reach a closing word, and their ranked completions
+            with fluxer_stats.stage('index: join'):
+                self.rule2_index, self.completions = build_join_index(words_rule2, find_closing_words(words_rule3, starting_word, fluxer))
+        elif engine == 'graph':
+            self.graph = fluxer.get_overlap_graph()
+            with fluxer_stats.stage('index: graph masks'):
+                self.words = fluxer.words
+                self.word_ids = fluxer.get_word_ids()
+                self.rule2_mask, self.rule2_buckets = self.node_mask(words_rule2)
+                # Closing words and their overlap with the starting word, by word ID
+                closing_words = find_closing_words(words_rule3, starting_word, fluxer)
+                self.closing_overlaps = {self.word_ids[word]: overlap_start for word, overlap_start in closing_words}
+                self.closing_mask, self.closing_buckets = self.node_mask(word for word, _ in closing_words)
+        else:
+            # Rule-3 words that close the cycle back to the starting word, keyed by leading letters
+            with fluxer_stats.stage('index: closing words'):
+                self.closing_index = build_closing_index(words_rule3, starting_word, fluxer)
+
+    def node_mask(self, words: Iterable[str]) -> Tuple[bytearray, Dict[str, List[int]]]:
+        """Return a word-ID mask of words and their IDs bucketed by first letter, ranked by length and spelling"""
+        mask = bytearray(len(self.words))
+        buckets = defaultdict(list)
+        for word in sorted(words, key=lambda w: (-len(w), w)):
+            word_id = self.word_ids[word]
+            mask[word_id] = 1
+            buckets[word[:1].lower()].append(word_id)
+        return mask, buckets
+
+    def iter_graph_branch(self, step1_word: str, step1_overlap: int) -> Iterator[Tuple[List[str], int]]:
+        """Yield the solutions through one step-1 word by walking the overlap graph"""
+        graph, words = self.graph, self.words
+        with fluxer_stats.stage('search: depth 2'):
+            step2_matches = graph.successors(self.word_ids[step1_word], self.rule2_mask, self.rule2_buckets, step1_word[-1:].lower())
+        fluxer_stats.count('overlaps', len(step2_matches))
+        
+        for step2_id, step2_overlap in step2_matches:
+            step2_word = words[step2_id]
+            with fluxer_stats.stage('search: depth 3'):
+                step3_matches = [(words[word_id], step1_overlap + step2_overlap + overlap + self.closing_overlaps[word_id])
+                                 for word_id, overlap in graph.successors(step2_id, self.closing_mask, self.closing_buckets, step2_word[-1:].lower())]
+                step3_matches.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
+            fluxer_stats.count('overlaps', len(step3_matches))
+            
+            for step3_word, total_overlap in step3_matches:
+                fluxer_stats.count('solutions')
+                yield [self.starting_word, step1_word, step2_word, step3_word], total_overlap
+
+    def iter_branch(self, step1_word: str, step1_overlap: int) -> Iterator[Tuple[List[str], int]]:
+        """Yield the solutions through one step-1 word, in search order"""
+        if self.engine == 'graph':
+            yield from self.iter_graph_branch(step1_word, step1_overlap)
+            return
+        # Step 2: Find step 2 words that overlap with the step 1 word
+        with fluxer_stats.stage('search: depth 2'):
+            if self.engine == 'join':
+                step2_matches = [(word, overlap) for word, (overlap, _) in head_matches(step1_word, self.rule2_index).items()]
+                step2_matches.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
+            else:
+                step2_matches = overlap_matches(step1_word, self.words_rule2, self.fluxer)
+        
+        # Step 3: For each step 2 word, find step 3 words that connect back to starting word
+        for step2_word, step2_overlap in step2_matches:
+            with fluxer_stats.stage('search: depth 3'):
+                if self.engine == 'join':
+                    step3_matches = [(word, step1_overlap + step2_overlap + overlap) for word, overlap in self.completions[step2_word]]
+                else:
+                    step3_matches = []
+                    for word, (overlap2, overlap_start) in head_matches(step2_word, self.closing_index).items():
+                        # Calculate total overlap for the complete cycle
+                        total_overlap = step1_overlap + step2_overlap + overlap2 + overlap_start
+                        step3_matches.append((word, total_overlap))
+                    
+                    step3_matches.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
+            
+            for step3_word, total_overlap in step3_matches:
+                fluxer_stats.count('solutions')
+                yield [self.starting_word, step1_word, step2_word, step3_word], total_overlap
+
+    def solve(self, step1_word: str, step1_overlap: int, limit: Optional[int] = None) -> List[Tuple[List[str], int]]:
+        """Return up to limit solutions through one step-1 word, in search order"""
+        return list(itertools.islice(self.iter_branch(step1_word, step1_overlap), limit))
+
+# Branch search state for pool worker processes, set once by _init_worker
+_worker_search = None
+
+def _init_worker(starting_word: str, words_rule2: List[str], words_rule3: List[str], engine: str):
+    """Pool initializer: receive the rule candidate lists once and build the worker's indexes"""
+    global _worker_search
+    _worker_search = BranchSearch(starting_word, words_rule2, words_rule3, fluxer, engine)
+
+def _solve_branch(task: Tuple[str, int, Optional[int]]) -> List[Tuple[List[str], int]]:
+    """Pool task: expand one step-1 branch"""
+    step1_word, step1_overlap, limit = task
+    return _worker_search.solve(step1_word, step1_overlap, limit)
+
+def rule_candidates(rule_filters: List[Dict[str, Any]], fluxer, candidate_cache: Optional[Dict[str, List[str]]] = None) -> List[List[str]]:
+    """Resolve each rule's filters to its candidate words through the rule index.
+
+    candidate_cache, when given, maps normalized filters to candidate lists and
+    is filled as rules are resolved, so puzzles sharing a rule share one list.
+    """
+    rule_index = fluxer.get_rule_index()
+    rule_words = []
+    for i, filters in enumerate(rule_filters, 1):
+        with fluxer_stats.stage(f'pre-filter: rule {i}'):
+            if candidate_cache is None:
+                rule_words.append(rule_index.words_for(filters))
+                continue
+            key = json.dumps(filters, sort_keys=True)
+            if key not in candidate_cache:
+                candidate_cache[key] = rule_index.words_for(filters)
+            rule_words.append(candidate_cache[key])
+    return rule_words
+
+def _iter_branches(starting_word: str, step1_matches: List[Tuple[str, int]], words_rule2: List[str], words_rule3: List[str],
+                   fluxer, engine: str, workers: int, limit: Optional[int]) -> Iterator[Tuple[List[str], int]]:
+    """Expand step-1 branches in order, in this process or across a process pool.
+
+    Pool workers return whole branches (capped at limit), so a single-process
+    run is the one that keeps memory flat. Closing the generator stops the
+    search and terminates the pool.
+    """
+    if workers <= 1:
+        search = BranchSearch(starting_word, words_rule2, words_rule3, fluxer, engine)
+        for step1_word, step1_overlap in step1_matches:
+            yield from search.iter_branch(step1_word, step1_overlap)
+        return
     
-    # Ensure words are loaded
+    # Imported here: single-process runs, the common case, skip its import cost
+    import multiprocessing
+    pool = multiprocessing.Pool(workers, initializer=_init_worker,
+                                initargs=(starting_word, words_rule2, words_rule3, engine))
+    try:
+        tasks = [(step1_word, step1_overlap, limit) for step1_word, step1_overlap in step1_matches]
+        for branch_solutions in pool.imap(_solve_branch, tasks, chunksize=max(1, len(tasks) // (workers * 8))):
+            yield from branch_solutions
+    finally:
+        pool.terminate()
+        pool.join()
+
+def iter_solutions(starting_word: str, rules: List[str], fluxer, engine: str = 'search', workers: int = 1,
+                   limit: Optional[int] = None, candidate_cache: Optional[Dict[str, List[str]]] = None,
+                   on_prefilter: Optional[Callable[[List[List[str]], List[Tuple[str, int]]], None]] = None) -> Iterator[Tuple[List[str], int]]:
+    """Yield complete 3-word solution paths as they are found, without printing.
+
+    Solutions come in the same order as find_solutions. Nothing is accumulated,
+    so the caller decides what to keep: stop early by breaking out of the loop
+    (or closing the generator), feed top_solutions for a bounded ranking, or
+    stream them to a writer. limit only caps the per-branch batches sent back
+    by pool workers. candidate_cache is passed to rule_candidates.
+    on_prefilter, when given, is called with each rule's candidate words and
+    the step-1 matches before any branch is expanded. Raises ValueError for
+    an unknown engine or a chain that is not 3 rules when called, before
+    anything is iterated.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}' (expected one of: {', '.join(ENGINES)})")
+    rule_filters = [parse_rule(rule) for rule in rules]
+    if len(rule_filters) != 3:
+        raise ValueError(f"Expected 3 rules, got {len(rules)}")
+    return _iter_solutions(starting_word, rule_filters, fluxer, engine, workers, limit, candidate_cache, on_prefilter)
+
+def _iter_solutions(starting_word: str, rule_filters: List[Dict[str, Any]], fluxer, engine: str, workers: int, limit: Optional[int],
+                    candidate_cache: Optional[Dict[str, List[str]]],
+                    on_prefilter: Optional[Callable[[List[List[str]], List[Tuple[str, int]]], None]]) -> Iterator[Tuple[List[str], int]]:
     fluxer.ensure_words_corpus()
+    words_rule1, words_rule2, words_rule3 = rule_candidates(rule_filters, fluxer, candidate_cache)
+    with fluxer_stats.stage('search: depth 1'):
+        step1_matches = overlap_matches(starting_word, words_rule1, fluxer)
+    if on_prefilter is not None:
+        on_prefilter([words_rule1, words_rule2, words_rule3], step1_matches)
+    yield from _iter_branches(starting_word, step1_matches, words_rule2, words_rule3, fluxer, engine, workers, limit)
+
+def search_solutions(starting_word: str, rules: List[str], fluxer, max_solutions: Optional[int] = 5, engine: str = 'search', workers: int = 1) -> Iterator[Tuple[List[str], int]]:
+    """Yield solutions as they are found, reporting progress and NEW BEST solutions.
+
+    This is the interactive front end to iter_solutions: it prints the search
+    header and pre-filter counts, stops after max_solutions, and keeps nothing
+    but the running count and best overlap. Raises ValueError as
+    iter_solutions does.
+    """
+    no_step1 = []
+
+    def report_prefilter(rule_words, step1_matches):
+        print_rule_counts(rules, rule_words)
+        if not step1_matches:
+            print(f"{Colors.RED}No words found matching rule '{Colors.YELLOW}{rules[0]}{Colors.RED}' with overlap to '{Colors.YELLOW}{starting_word}{Colors.RED}'{Colors.END}")
+            no_step1.append(True)
+
+    solutions = iter_solutions(starting_word, rules, fluxer, engine, workers, max_solutions, on_prefilter=report_prefilter)
     
     print(f"{Colors.BOLD}{Colors.CYAN}Starting word: {Colors.YELLOW}{starting_word.upper()}{Colors.END}")
     print(f"{Colors.BOLD}{Colors.CYAN}Rules: {Colors.GREEN}{', '.join(rules)}{Colors.END}")
@@ -148,102 +505,475 @@ def find_solutions(starting_word: str, rules: List[str], fluxer, max_solutions:
         print(f"{Colors.BOLD}{Colors.MAGENTA}Searching for ALL solutions...{Colors.END}")
     else:
         print(f"{Colors.BOLD}{Colors.MAGENTA}Searching for up to {Colors.YELLOW}{max_solutions}{Colors.MAGENTA} solutions...{Colors.END}")
-    
-    # Pre-filter words for each rule (only by rule criteria, not overlap)
     print(f"{Colors.CYAN}Pre-filtering words for each rule...{Colors.END}")
-    words_rule1 = [word for word in fluxer.words if apply_filters(word, rule_filters[0], fluxer)]
-    words_rule2 = [word for word in fluxer.words if apply_filters(word, rule_filters[1], fluxer)]
-    words_rule3 = [word for word in fluxer.words if apply_filters(word, rule_filters[2], fluxer)]
-    
-    print(f"{Colors.GREEN}Rule 1 ({rules[0]}): {Colors.YELLOW}{len(words_rule1)}{Colors.GREEN} words{Colors.END}")
-    print(f"{Colors.GREEN}Rule 2 ({rules[1]}): {Colors.YELLOW}{len(words_rule2)}{Colors.GREEN} words{Colors.END}")
-    print(f"{Colors.GREEN}Rule 3 ({rules[2]}): {Colors.YELLOW}{len(words_rule3)}{Colors.GREEN} words{Colors.END}")
     
-    solutions = []
+    solution_count = 0
     max_overlap = 0  # Track the maximum overlap found so far
+    try:
+        for solution, total_overlap in solutions:
+            solution_count += 1
+            
+            # Update max overlap if this solution has a higher overlap
+            if total_overlap > max_overlap:
+                max_overlap = total_overlap
+                # Print the new best solution immediately
+                print_new_best(solution, total_overlap)
+            print(f"\r{Colors.CYAN}{solution_count} solutions found {Colors.YELLOW}(max overlap: {max_overlap}){Colors.END}                 ", end="", flush=True)
+            yield solution, total_overlap
+
+            # Check if we've reached the limit
+            if max_solutions is not None and solution_count >= max_solutions:
+                print(f"\n{Colors.BOLD}{Colors.YELLOW}🎯 Reached limit of {max_solutions} solutions!{Colors.END}")
+                return
+    finally:
+        solutions.close()
     
-    # Step 1: Find words that match the first rule and overlap with starting word
-    step1_matches = []
-    for word in words_rule1:
-        overlap = fluxer.prefix_overlap(word, starting_word)
-        if overlap > 0:
-            step1_matches.append((word, overlap))
+    if no_step1:
+        return
+    print(f"\n{Colors.BOLD}{Colors.GREEN}✅ Search complete! Found {Colors.YELLOW}{solution_count}{Colors.GREEN} solutions.{Colors.END}")
+
+def find_solutions(starting_word: str, rules: List[str], fluxer, max_solutions: Optional[int] = 5, engine: str = 'search', workers: int = 1) -> List[Tuple[List[str], int]]:
+    """Find multiple complete 3-word solution paths with total overlap calculation.
+
+    engine selects how branches are expanded (see BranchSearch). With
+    workers > 1 the step-1 branches are sharded across a process pool; results
+    are merged back in step-1 order, so the solutions, the max_solutions cut-off
+    and the NEW BEST reports are the same as a single-process run.
+    """
+    return list(search_solutions(starting_word, rules, fluxer, max_solutions, engine, workers))
+
+def top_solutions(solutions: Iterable[Tuple[List[str], int]], top_k: int) -> Tuple[List[Tuple[List[str], int]], int]:
+    """Keep the top_k solutions of a stream in a bounded heap.
+
+    Returns the kept solutions ranked by total overlap (ties in stream order)
+    and the number of solutions consumed.
+    """
+    heap = []
+    count = 0
+    for count, (solution, total_overlap) in enumerate(solutions, 1):
+        entry = (total_overlap, -count, solution)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif top_k > 0 and entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    ranked = [(solution, total_overlap) for total_overlap, _, solution in sorted(heap, reverse=True)]
+    return ranked, count
+
+def solve_puzzle(starting_word: str, rules: List[str], fluxer, max_solutions: Optional[int] = 5, top: Optional[int] = None,
+                 max_print: Optional[int] = None, engine: str = 'search', candidate_cache: Optional[Dict[str, List[str]]] = None) -> Tuple[List[Tuple[List[str], int]], int]:
+    """Solve one puzzle without printing, for batch and server callers.
+
+    With top set this is find_top_solutions; otherwise up to max_solutions
+    solutions (None for all) are found and the best max_print of them kept.
+    Only 3-rule puzzles can be enumerated: other chain lengths are solved as
+    top max_solutions. Returns the kept solutions ranked by overlap and the
+    number found.
+    """
+    if top is None and len(rules) != 3:
+        if max_solutions is None:
+            raise ValueError(f"Listing all solutions needs exactly 3 rules, got {len(rules)}; ask for the top solutions instead")
+        top = max_solutions
+    if top is not None:
+        solutions = find_top_solutions(starting_word, rules, fluxer, top, verbose=False, candidate_cache=candidate_cache)
+        return solutions[:max_print], len(solutions)
+    stream = iter_solutions(starting_word, rules, fluxer, engine, limit=max_solutions, candidate_cache=candidate_cache)
+    stream = itertools.islice(stream, max_solutions)
+    if max_print is None:
+        solutions = list(stream)
+        solutions.sort(key=lambda x: x[1], reverse=True)
+        return solutions, len(solutions)
+    return top_solutions(stream, max_print)
+
+def solve_batch_spec(spec: Dict[str, Any], fluxer, engine: str, candidate_cache: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Solve one batch puzzle spec into a JSON-ready result"""
+    start = spec.get('start')
+    rules = spec.get('rules')
+    if isinstance(rules, str):
+        rules = [rule.strip() for rule in rules.split(',')]
+    if not isinstance(start, str) or not start:
+        raise ValueError("'start' must be a non-empty string")
+    if not isinstance(rules, list) or not rules or not all(isinstance(rule, str) for rule in rules):
+        raise ValueError("'rules' must be a non-empty list (or comma-separated string) of rules")
+    for name in ('solutions', 'top', 'print'):
+        value = spec.get(name)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+            raise ValueError(f"'{name}' must be a non-negative integer")
+    for name in ('all', 'count'):
+        if not isinstance(spec.get(name, False), bool):
+            raise ValueError(f"'{name}' must be true or false")
+    if spec.get('count'):
+        histogram = count_solutions(start, rules, fluxer, verbose=False, candidate_cache=candidate_cache)
+        return {
+            'start': start,
+            'rules': rules,
+            'total': sum(histogram.values()),
+            'histogram': [{'overlap': total_overlap, 'solutions': n} for total_overlap, n in histogram.items()],
+        }
+    max_solutions = None if spec.get('all') else spec.get('solutions', 5)
+    solutions, total = solve_puzzle(start, rules, fluxer, max_solutions, spec.get('top'), spec.get('print'),
+                                    engine, candidate_cache)
+    return {
+        'start': start,
+        'rules': rules,
+        'total': total,
+        'solutions': [{'path': solution, 'overlap': total_overlap} for solution, total_overlap in solutions],
+    }
+
+def run_batch(batch_file, out, fluxer, engine: str = 'search') -> Tuple[int, int]:
+    """Solve every puzzle spec in a JSONL stream, writing one JSONL result per puzzle.
+
+    Each spec has "start" and "rules" (a list or comma-separated string of 3
+    rules), and optionally "solutions" (default 5), "all", "top", "print" and
+    "count" (report only the number of solutions, by total overlap); an "id"
+    is echoed back. The corpus and rule index are built once, and
+    puzzles sharing a rule share its filtered candidate list. A spec that
+    fails produces an "error" result instead of stopping the batch.
+    Returns the number of puzzles solved and the number that failed.
+    """
+    fluxer.ensure_words_corpus()
+    candidate_cache = {}
+    solved = failed = 0
+    for line_number, line in enumerate(batch_file, 1):
+        if not line.strip():
+            continue
+        started = time.perf_counter()
+        spec = {}
+        try:
+            spec = json.loads(line)
+            if not isinstance(spec, dict):
+                raise ValueError("puzzle spec must be a JSON object")
+            result = solve_batch_spec(spec, fluxer, engine, candidate_cache)
+            solved += 1
+        except ValueError as e:
+            result = {'line': line_number, 'error': str(e)}
+            failed += 1
+        if 'id' in spec:
+            result = {'id': spec['id'], **result}
+        result['seconds'] = round(time.perf_counter() - started, 4)
+        out.write(json.dumps(result) + '\n')
+        out.flush()
+    return solved, failed
+
+def write_solutions(solutions: Iterable[Tuple[List[str], int]], out=None) -> int:
+    """Stream solutions to a file as tab-separated lines (words..., total overlap); returns the count"""
+    out = out or sys.stdout
+    count = 0
+    for solution, total_overlap in solutions:
+        out.write('\t'.join(solution + [str(total_overlap)]) + '\n')
+        count += 1
+    return count
+
+def chain_layer(layer: List[Tuple[int, str, int, int]], words: List[str], top_k: int) -> List[Tuple[int, str, int, int]]:
+    """Extend the chains ending in one layer by a word from the next rule.
+
+    A layer is a list of (total overlap, word, overlap with the previous word,
+    back-pointer) entries, one per chain kept, indexed in search order: the
+    order the search engine would find the chains in. The back-pointer is the
+    index of the chain's previous entry in the previous layer. For each word,
+    the top_k chains by total overlap (ties in search order) are kept.
+
+    Instead of testing word pairs, the previous layer's chains are indexed
+    under each of their word's tails that starts some next word, keeping only
+    the top_k per tail. Each next word then only merges the ranked lists
+    under its heads, longest first, so a chain is scored with its longest
+    overlap. The work per layer is linear in the total length of its words.
+    """
+    # Only tails that start some next word matter; checking that is only
+    # worth it when the previous layer is the larger one
+    heads = None
+    if len(layer) > len(words):
+        heads = set()
+        for word in words:
+            word_lower = word.lower()
+            for j in range(1, len(word_lower) + 1):
+                heads.add(word_lower[:j])
+
+    by_word = defaultdict(list)
+    for rank, (total, word, _, _) in enumerate(layer):
+        by_word[word].append((-total, rank))
+    tails = defaultdict(list)
+    for word, entries in by_word.items():
+        word_lower = word.lower()
+        for i in range(len(word_lower)):
+            if heads is None or word_lower[i:] in heads:
+                tails[word_lower[i:]].extend(entries)
+    for tail, entries in tails.items():
+        if len(entries) > top_k:
+            tails[tail] = heapq.nsmallest(top_k, entries)
+        else:
+            entries.sort()
+    fluxer_stats.count('candidates', sum(len(entries) for entries in tails.values()))
+
+    next_layer = []
+    for word in words:
+        word_lower = word.lower()
+        matched = [(j, tails[word_lower[:j]]) for j in range(len(word_lower), 0, -1) if word_lower[:j] in tails]
+        if len(matched) == 1:
+            j, entries = matched[0]
+            next_layer.extend((j - negative_total, word, j, rank) for negative_total, rank in entries)
+            continue
+        # Each list is ranked, so the merge yields the best chains first. A
+        # chain seen again under a shorter head is the same chain with an
+        # overlap that is not its longest.
+        seen = set()
+        ranked = heapq.merge(*[[(negative_total - j, rank, j) for negative_total, rank in entries] for j, entries in matched])
+        for negative_total, rank, j in ranked:
+            if rank in seen:
+                continue
+            seen.add(rank)
+            next_layer.append((-negative_total, word, j, rank))
+            if len(seen) == top_k:
+                break
+    fluxer_stats.count('overlaps', len(next_layer))
+
+    # Search order: the previous chain's order, then this step's overlap, length and spelling
+    next_layer.sort(key=lambda entry: (entry[3], -entry[2], -len(entry[1]), entry[1]))
+    return next_layer
+
+def best_chains(starting_word: str, rule_words: List[List[str]], closing_words: List[Tuple[str, int]], top_k: int) -> List[Tuple[List[str], int]]:
+    """Return the top_k cycles through one word per rule, by total overlap.
+
+    rule_words holds each rule's candidates in chain order; closing_words
+    holds the last rule's words that end in a head of the starting word, with
+    that closing overlap. Ties are broken in search order, so for three rules
+    this is the first top_k solutions of search_solutions ranked by overlap.
+    Each layer is computed once from the previous one (see chain_layer), so
+    the cost grows linearly with the number of rules.
+    """
+    if top_k <= 0 or not rule_words:
+        return []
+    closing_overlaps = dict(closing_words)
+    layers = [[(0, starting_word, 0, -1)]]
+    for depth, words in enumerate(rule_words, 1):
+        if depth == len(rule_words):
+            words = [word for word in words if word in closing_overlaps]
+        with fluxer_stats.stage(f'search: depth {depth}'):
+            layers.append(chain_layer(layers[-1], words, top_k))
+        if not layers[-1]:
+            return []
+
+    # The closing overlap belongs to the last step, so it takes part in that
+    # step's search order
+    finals = heapq.nsmallest(top_k, ((-(total + closing_overlaps[word]), back, -(overlap + closing_overlaps[word]), -len(word), word, i)
+                                     for i, (total, word, overlap, back) in enumerate(layers[-1])))
+    solutions = []
+    for negative_total, *_, i in finals:
+        path = []
+        for layer in reversed(layers[1:]):
+            _, word, _, i = layer[i]
+            path.append(word)
+        solutions.append(([starting_word] + path[::-1], -negative_total))
+    return solutions
+
+def find_top_solutions(starting_word: str, rules: List[str], fluxer, top_k: int, verbose: bool = True,
+                       candidate_cache: Optional[Dict[str, List[str]]] = None) -> List[Tuple[List[str], int]]:
+    """Find the top_k solutions by total overlap for a chain of any number of rules.
+
+    Solutions are computed layer by layer with best_chains rather than by
+    enumerating paths, and tied solutions are ranked in search order. Nothing
+    is printed when verbose is False; candidate_cache is passed to
+    rule_candidates.
+    """
+    log = print if verbose else _quiet
+    rule_filters = [parse_rule(rule) for rule in rules]
     
-    step1_matches.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
+    if not rule_filters:
+        log("Error: Expected at least 1 rule")
+        return []
     
-    if not step1_matches:
-        print(f"{Colors.RED}No words found matching rule '{Colors.YELLOW}{rules[0]}{Colors.RED}' with overlap to '{Colors.YELLOW}{starting_word}{Colors.RED}'{Colors.END}")
+    if top_k <= 0:
         return []
     
-    # Step 2: For each step 1 word, find step 2 words
-    for step1_word, step1_overlap in step1_matches:
-        step2_matches = []
-        for word in words_rule2:
-            overlap = fluxer.prefix_overlap(word, step1_word)
-            if overlap > 0:
-                step2_matches.append((word, overlap))
-        
-        step2_matches.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
-        
-        if not step2_matches:
-            continue
-        
-        # Step 3: For each step 2 word, find step 3 words that connect back to starting word
-        for step2_word, step2_overlap in step2_matches:
-            step3_matches = []
-            for word in words_rule3:
-                # Check overlap with step 2 word
-                overlap2 = fluxer.prefix_overlap(word, step2_word)
-                # Check overlap with starting word (for the cycle)
-                overlap_start = fluxer.suffix_overlap(word, starting_word)
-                if overlap2 > 0 and overlap_start > 0:
-                    # Calculate total overlap for the complete cycle
-                    total_overlap = step1_overlap + step2_overlap + overlap2 + overlap_start
-                    step3_matches.append((word, total_overlap))
-            
-            step3_matches.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
-            
-            # Add all valid solutions from this path
-            for step3_word, total_overlap in step3_matches:
-                solution = [starting_word, step1_word, step2_word, step3_word]
-                solutions.append((solution, total_overlap))
-                
-                # Update max overlap if this solution has a higher overlap
-                if total_overlap > max_overlap:
-                    max_overlap = total_overlap
-                    # Print the new best solution immediately
-                    print(f"\n{Colors.BOLD}{Colors.BRIGHT_GREEN}🎉 NEW BEST! 🎉{Colors.END}")
-                    print(f"{Colors.BOLD}{Colors.BRIGHT_GREEN}{solution[0].upper()} → {solution[1].upper()} → {solution[2].upper()} → {solution[3].upper()} {Colors.YELLOW}(overlap: {total_overlap}){Colors.END}")
-                print(f"\r{Colors.CYAN}{len(solutions)} solutions found {Colors.YELLOW}(max overlap: {max_overlap}){Colors.END}                 ", end="", flush=True)
-
-                # Check if we've reached the limit
-                if max_solutions is not None and len(solutions) >= max_solutions:
-                    print(f"\n{Colors.BOLD}{Colors.YELLOW}🎯 Reached limit of {max_solutions} solutions!{Colors.END}")
-                    return solutions
-    
-    print(f"\n{Colors.BOLD}{Colors.GREEN}✅ Search complete! Found {Colors.YELLOW}{len(solutions)}{Colors.GREEN} solutions.{Colors.END}")
+    fluxer.ensure_words_corpus()
+    
+    log(f"{Colors.BOLD}{Colors.CYAN}Starting word: {Colors.YELLOW}{starting_word.upper()}{Colors.END}")
+    log(f"{Colors.BOLD}{Colors.CYAN}Rules: {Colors.GREEN}{', '.join(rules)}{Colors.END}")
+    log(f"{Colors.BOLD}{Colors.MAGENTA}Searching for the top {Colors.YELLOW}{top_k}{Colors.MAGENTA} solutions...{Colors.END}")
+    
+    rule_words = prefilter_rules(rules, rule_filters, fluxer) if verbose else rule_candidates(rule_filters, fluxer, candidate_cache)
+    with fluxer_stats.stage('index: closing words'):
+        closing_words = find_closing_words(rule_words[-1], starting_word, fluxer)
+    
+    solutions = best_chains(starting_word, rule_words, closing_words, top_k)
+    fluxer_stats.count('solutions', len(solutions))
+    log(f"\n{Colors.BOLD}{Colors.GREEN}✅ Search complete! Found the top {Colors.YELLOW}{len(solutions)}{Colors.GREEN} solutions.{Colors.END}")
     return solutions
 
-def print_solutions(solutions: List[Tuple[List[str], int]], rules: List[str], max_print: Optional[int] = None):
-    """Print multiple solutions in a compact format, sorted by overlap"""
-    if not solutions:
+def border_lengths(word: str) -> List[int]:
+    """Return b where b[j] is the length of the longest proper border of word[:j].
+
+    A border is a head of a string that is also a tail of it (the KMP
+    failure function).
+    """
+    borders = [0] * (len(word) + 1)
+    k = 0
+    for i in range(1, len(word)):
+        while k and word[i] != word[k]:
+            k = borders[k]
+        if word[i] == word[k]:
+            k += 1
+        borders[i + 1] = k
+    return borders
+
+def count_layer(counts: Dict[str, Dict[int, int]], words: List[str]) -> Dict[str, Dict[int, int]]:
+    """Count the chains ending in each word of the next rule, by total overlap.
+
+    counts maps each word of the previous layer to a histogram {total overlap:
+    number of chains ending in it}. The histograms are summed under every
+    tail of their word that starts some next word, as in chain_layer, and
+    each next word adds up the sums under its heads shifted by the head's
+    length.
+
+    A previous word ending in two heads of a word must only be counted with
+    the longer one. The shorter head is then a border of the longer one, and
+    every word ending in a head also ends in that head's longest border. So
+    the words whose longest overlap is exactly j are those under head j minus
+    those under each longer head whose longest border is j. Subtracting each
+    head's sums from its longest border's therefore counts every pair once,
+    and the work stays linear in the total length of the words.
+    """
+    heads = None
+    if len(counts) > len(words):
+        heads = set()
+        for word in words:
+            word_lower = word.lower()
+            for j in range(1, len(word_lower) + 1):
+                heads.add(word_lower[:j])
+
+    tails = {}
+    for word, histogram in counts.items():
+        word_lower = word.lower()
+        for i in range(len(word_lower)):
+            tail = word_lower[i:]
+            if heads is not None and tail not in heads:
+                continue
+            summed = tails.get(tail)
+            if summed is None:
+                tails[tail] = dict(histogram)
+            else:
+                for total, n in histogram.items():
+                    summed[total] = summed.get(total, 0) + n
+    fluxer_stats.count('candidates', len(tails))
+
+    next_counts = {}
+    for word in words:
+        word_lower = word.lower()
+        histogram = defaultdict(int)
+        borders = None
+        for j in range(1, len(word_lower) + 1):
+            summed = tails.get(word_lower[:j])
+            if not summed:
+                continue
+            for total, n in summed.items():
+                histogram[total + j] += n
+            if borders is None:
+                borders = border_lengths(word_lower)
+            if borders[j]:
+                for total, n in summed.items():
+                    histogram[total + borders[j]] -= n
+        histogram = {total: n for total, n in histogram.items() if n}
+        if histogram:
+            next_counts[word] = histogram
+    fluxer_stats.count('overlaps', len(next_counts))
+    return next_counts
+
+def count_chains(starting_word: str, rule_words: List[List[str]], closing_words: List[Tuple[str, int]]) -> Dict[int, int]:
+    """Count the cycles through one word per rule, as a histogram {total overlap: cycles}.
+
+    Takes the same arguments as best_chains. Layers are aggregated with
+    count_layer, so only one histogram per word of a layer is held and the
+    time does not depend on the number of cycles.
+    """
+    if not rule_words:
+        return {}
+    closing_overlaps = dict(closing_words)
+    counts = {starting_word: {0: 1}}
+    for depth, words in enumerate(rule_words, 1):
+        if depth == len(rule_words):
+            words = [word for word in words if word in closing_overlaps]
+        with fluxer_stats.stage(f'count: depth {depth}'):
+            counts = count_layer(counts, words)
+        if not counts:
+            return {}
+    histogram = defaultdict(int)
+    for word, totals in counts.items():
+        for total, n in totals.items():
+            histogram[total + closing_overlaps[word]] += n
+    return dict(sorted(histogram.items(), reverse=True))
+
+def count_solutions(starting_word: str, rules: List[str], fluxer, verbose: bool = True,
+                    candidate_cache: Optional[Dict[str, List[str]]] = None) -> Dict[int, int]:
+    """Count the solutions of a chain of any number of rules, by total overlap.
+
+    Returns {total overlap: number of solutions}, highest overlap first, as
+    count_chains computes it without enumerating any solution. Nothing is
+    printed when verbose is False; candidate_cache is passed to
+    rule_candidates.
+    """
+    log = print if verbose else _quiet
+    rule_filters = [parse_rule(rule) for rule in rules]
+    if not rule_filters:
+        log("Error: Expected at least 1 rule")
+        return {}
+
+    fluxer.ensure_words_corpus()
+
+    log(f"{Colors.BOLD}{Colors.CYAN}Starting word: {Colors.YELLOW}{starting_word.upper()}{Colors.END}")
+    log(f"{Colors.BOLD}{Colors.CYAN}Rules: {Colors.GREEN}{', '.join(rules)}{Colors.END}")
+    log(f"{Colors.BOLD}{Colors.MAGENTA}Counting solutions...{Colors.END}")
+
+    rule_words = prefilter_rules(rules, rule_filters, fluxer) if verbose else rule_candidates(rule_filters, fluxer, candidate_cache)
+    with fluxer_stats.stage('index: closing words'):
+        closing_words = find_closing_words(rule_words[-1], starting_word, fluxer)
+    return count_chains(starting_word, rule_words, closing_words)
+
+def print_counts(histogram: Dict[int, int]):
+    """Print the number of solutions and their histogram by total overlap"""
+    total = sum(histogram.values())
+    if not total:
+        print(f"\n{Colors.BOLD}{Colors.RED}❌ No solutions found!{Colors.END}")
+        return
+
+    print(f"\n{Colors.BOLD}{Colors.BLUE}{'='*60}{Colors.END}")
+    print(f"{Colors.BOLD}{Colors.BRIGHT_GREEN}🎯 {Colors.YELLOW}{total}{Colors.BRIGHT_GREEN} SOLUTION{'S' if total != 1 else ''}! 🎯{Colors.END}")
+    print(f"{Colors.BOLD}{Colors.BLUE}{'='*60}{Colors.END}")
+
+    largest = max(histogram.values())
+    width = max([len(str(n)) for n in histogram.values()] + [len('Solutions')])
+    print(f"{Colors.BOLD}{Colors.CYAN}Overlap  {'Solutions':>{width}}{Colors.END}")
+    for total_overlap, n in sorted(histogram.items(), reverse=True):
+        bar = '█' * max(1, round(n / largest * 30))
+        print(f"{Colors.YELLOW}{total_overlap:7d}{Colors.END}  {n:>{width}}  {Colors.GREEN}{bar}{Colors.END}")
+
+def print_solutions(solutions: Iterable[Tuple[List[str], int]], rules: List[str], max_print: Optional[int] = None, total: Optional[int] = None):
+    """Print multiple solutions in a compact format, sorted by overlap.
+
+    total is the number of solutions found when solutions holds only the top
+    ones (e.g. from top_solutions); it defaults to len(solutions). solutions
+    may also be an iterator that is already ranked (e.g.
+    SolutionStore.ranked()), with total given.
+    """
+    if total is None:
+        total = len(solutions)
+    if not total:
         print(f"\n{Colors.BOLD}{Colors.RED}❌ No solutions found!{Colors.END}")
         return
     
     print(f"\n{Colors.BOLD}{Colors.BLUE}{'='*60}{Colors.END}")
-    if len(solutions) == 1:
+    if total == 1:
         print(f"{Colors.BOLD}{Colors.BRIGHT_GREEN}🎯 SOLUTION FOUND! 🎯{Colors.END}")
     else:
-        print(f"{Colors.BOLD}{Colors.BRIGHT_GREEN}🎯 FOUND {Colors.YELLOW}{len(solutions)}{Colors.BRIGHT_GREEN} SOLUTIONS! 🎯{Colors.END}")
-    if max_print is not None and len(solutions) > max_print:
+        print(f"{Colors.BOLD}{Colors.BRIGHT_GREEN}🎯 FOUND {Colors.YELLOW}{total}{Colors.BRIGHT_GREEN} SOLUTIONS! 🎯{Colors.END}")
+    if max_print is not None and total > max_print:
         print(f"{Colors.CYAN}Showing top {Colors.YELLOW}{max_print}{Colors.CYAN} solutions by overlap:{Colors.END}")
     print(f"{Colors.BOLD}{Colors.BLUE}{'='*60}{Colors.END}")
     
     # Sort solutions by total overlap (highest first)
-    solutions.sort(key=lambda x: x[1], reverse=True)
+    if isinstance(solutions, list):
+        solutions.sort(key=lambda x: x[1], reverse=True)
     
     # Limit the number of solutions to print
-    solutions_to_print = solutions[:max_print] if max_print is not None else solutions
+    solutions_to_print = itertools.islice(solutions, max_print)
     
     for i, (solution, total_overlap) in enumerate(solutions_to_print, 1):
         # Use different colors for different ranks
@@ -260,14 +990,158 @@ def print_solutions(solutions: List[Tuple[List[str], int]], rules: List[str], ma
             rank_color = Colors.CYAN
             medal = "  "
         
-        print(f"{Colors.BOLD}{rank_color}{medal} {i:2d}. {solution[0].upper()} → {solution[1].upper()} → {solution[2].upper()} → {solution[3].upper()} {Colors.YELLOW}(overlap: {total_overlap}){Colors.END}")
+        print(f"{Colors.BOLD}{rank_color}{medal} {i:2d}. {format_path(solution)} {Colors.YELLOW}(overlap: {total_overlap}){Colors.END}")
+    
+    if max_print is not None and total > max_print:
+        print(f"\n{Colors.CYAN}... and {Colors.YELLOW}{total - max_print}{Colors.CYAN} more solutions{Colors.END}")
+
+def main_batch(args):
+    """Run --batch mode and report throughput on stderr"""
+    started = time.perf_counter()
+    try:
+        batch_file = sys.stdin if args.batch == '-' else open(args.batch)
+        out = open(args.output, 'w') if args.output else sys.stdout
+    except OSError as e:
+        print(f"{Colors.BOLD}{Colors.RED}❌ Error: {Colors.YELLOW}{e}{Colors.END}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        solved, failed = run_batch(batch_file, out, fluxer, args.engine)
+    finally:
+        if batch_file is not sys.stdin:
+            batch_file.close()
+        if out is not sys.stdout:
+            out.close()
+    
+    elapsed = time.perf_counter() - started
+    rate = solved / elapsed if elapsed > 0 else 0.0
+    print(f"{Colors.BOLD}{Colors.GREEN}✅ Solved {Colors.YELLOW}{solved}{Colors.GREEN} puzzles in {Colors.YELLOW}{elapsed:.2f}s{Colors.GREEN} "
+          f"({Colors.YELLOW}{rate:.1f}{Colors.GREEN} puzzles/s){Colors.END}", file=sys.stderr)
+    if failed:
+        print(f"{Colors.BOLD}{Colors.RED}❌ {Colors.YELLOW}{failed}{Colors.RED} puzzle specs failed{Colors.END}", file=sys.stderr)
+        sys.exit(1)
+
+def main_count(args, rule_list: List[str]):
+    """Run --count mode: the number of solutions by total overlap, without listing them"""
+    cache = None if args.no_cache else fluxer_cache.QueryCache(args.cache_dir)
+    cached = None
+    if cache is not None:
+        with fluxer_stats.stage('cache lookup'):
+            cache_key = cache.key('solutions', ENGINE_VERSION, fluxer.corpus_digest(), args.starting_word.lower(),
+                                  [parse_rule(rule) for rule in rule_list], ['count'])
+            cached = cache.get(cache_key)
+    if cached is not None:
+        print(f"{Colors.BOLD}{Colors.CYAN}Using cached results for {Colors.YELLOW}{args.starting_word.upper()}{Colors.CYAN} ({', '.join(rule_list)}){Colors.END}")
+        histogram = {total_overlap: n for total_overlap, n in cached['histogram']}
+    else:
+        histogram = count_solutions(args.starting_word, rule_list, fluxer)
+        if cache is not None:
+            cache.put(cache_key, {'histogram': list(histogram.items())})
+    
+    print_counts(histogram)
+    if not histogram:
+        sys.exit(1)
+
+def main_solve(args):
+    """Solve the single puzzle given on the command line"""
+    # Parse rules
+    rule_list = [rule.strip() for rule in args.rules.split(',')]
     
-    if max_print is not None and len(solutions) > max_print:
-        print(f"\n{Colors.CYAN}... and {Colors.YELLOW}{len(solutions) - max_print}{Colors.CYAN} more solutions{Colors.END}")
+    if args.count:
+        main_count(args, rule_list)
+        return
+    
+    # Chains of other lengths are solved by dynamic programming, which finds
+    # the top solutions without enumerating them
+    top = args.top
+    if len(rule_list) != 3 and top is None:
+        if args.all or args.stream:
+            print(f"{Colors.BOLD}{Colors.RED}❌ Error: --all and --stream need exactly 3 rules, got {Colors.YELLOW}{len(rule_list)}{Colors.RED}{Colors.END}")
+            print(f"{Colors.CYAN}Use {Colors.GREEN}--top K{Colors.CYAN} to find the K best solutions of a longer or shorter chain{Colors.END}")
+            sys.exit(1)
+        top = args.solutions
+    
+    # Determine max solutions
+    if args.all:
+        max_solutions = None
+    else:
+        max_solutions = args.solutions
+    
+    # Determine max solutions to print
+    if args.print is not None:
+        max_print = args.print
+    else:
+        max_print = None  # Default: print all found solutions
+    
+    # Stream solutions straight to stdout without holding them
+    if args.stream:
+        solutions = iter_solutions(args.starting_word, rule_list, fluxer, args.engine, args.workers, max_solutions)
+        if write_solutions(itertools.islice(solutions, max_solutions)) == 0:
+            sys.exit(1)
+        return
+    
+    # Repeat puzzles are answered from the on-disk cache. Engines and worker
+    # counts give identical results, so they are not part of the key.
+    cache = None if args.no_cache else fluxer_cache.QueryCache(args.cache_dir)
+    if cache is not None:
+        if top is not None:
+            mode = ['top', top]
+        elif max_solutions is None:
+            mode = ['all', max_print]
+        else:
+            mode = ['first', max_solutions]
+        with fluxer_stats.stage('cache lookup'):
+            cache_key = cache.key('solutions', ENGINE_VERSION, fluxer.corpus_digest(), args.starting_word.lower(),
+                                  [parse_rule(rule) for rule in rule_list], mode)
+            cached = cache.get(cache_key)
+        if cached is not None:
+            print(f"{Colors.BOLD}{Colors.CYAN}Using cached results for {Colors.YELLOW}{args.starting_word.upper()}{Colors.CYAN} ({', '.join(rule_list)}){Colors.END}")
+            solutions = [(solution, total_overlap) for solution, total_overlap in cached['solutions']]
+            if solutions:
+                print_solutions(solutions, rule_list, max_print, cached['total'])
+                return
+            print(f"\n{Colors.BOLD}{Colors.RED}❌ No solutions found. Try different rules or starting word.{Colors.END}")
+            sys.exit(1)
+    
+    # Find solutions
+    total = None
+    if top is not None:
+        solutions = find_top_solutions(args.starting_word, rule_list, fluxer, top)
+    else:
+        solutions = search_solutions(args.starting_word, rule_list, fluxer, max_solutions, args.engine, args.workers)
+        if max_print is not None and cache is not None and max_solutions is not None:
+            # The cached first max_solutions are kept whole, so a retry with
+            # another --print value is sliced from them when printed
+            solutions = list(solutions)
+        elif max_print is not None:
+            # Only the printed solutions are ranked, in a bounded heap
+            solutions, total = top_solutions(solutions, max_print)
+        else:
+            # Every solution is printed: keep them packed as word IDs, spilling
+            # to disk past the memory limit, and rank them by merging
+            store = fluxer_store.SolutionStore(fluxer.words, fluxer.get_word_ids(), args.starting_word, len(rule_list),
+                                               args.memory_limit * 1024 * 1024)
+            with store:
+                store.extend(solutions)
+                # The JSON of a solution is a few times its packed record, so
+                # results that could not be cached are ranked straight to the screen
+                if store and (cache is None or store.spilled or store.nbytes * 4 > cache.max_bytes):
+                    with fluxer_stats.stage('rank: merge'):
+                        print_solutions(store.ranked(), rule_list, total=len(store))
+                    return
+                solutions = list(store.ranked())
+    
+    if cache is not None:
+        cache.put(cache_key, {'solutions': solutions, 'total': len(solutions) if total is None else total})
+    
+    if solutions:
+        print_solutions(solutions, rule_list, max_print, total)
+    else:
+        print(f"\n{Colors.BOLD}{Colors.RED}❌ No solutions found. Try different rules or starting word.{Colors.END}")
+        sys.exit(1)
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Solve fluxer puzzles by finding 3-word solution paths",
+        description="Solve fluxer puzzles by finding solution paths (3 words, or a chain of any length)",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -275,6 +1149,10 @@ Examples:
   python fluxer_solver.py START --rules verb,5-letters,no-repeats --solutions 3
   python fluxer_solver.py HELLO --rules adjective,alternating,alphabetical --all
   python fluxer_solver.py WORD --rules noun,verb,adjective --solutions 100 --print 5
+  python fluxer_solver.py PERHAPS --rules noun,6-letters,double-letters --top 5
+  python fluxer_solver.py PERHAPS --rules noun,verb,adjective,noun,6-letters --top 3
+  python fluxer_solver.py HELLO --rules adjective,alternating,alphabetical --count
+  python fluxer_solver.py --batch puzzles.jsonl --output results.jsonl
   python fluxer_solver.py TEST --rules 6-letters,double-letters,no-repeats --all --print 10
 
 Available rules:
@@ -283,57 +1161,70 @@ Available rules:
   - alternating/alt, alphabetical/alpha
   - N-letters (e.g., 6-letters, 5-letters)
   - N-vowels, N-consonants (e.g., 3-vowels, 4-consonants)
+  - contains-X, starts-X, ends-X (e.g., contains-z, starts-st, ends-ing)
+  - X-at-N: letter X at position N, from 1 (e.g., e-at-2)
+  - N-distinct: exactly N distinct letters (e.g., 4-distinct)
+  - wildcard patterns, '?' for any letter (e.g., ?a??e)
         """
     )
     
-    parser.add_argument("starting_word", type=str, help="Starting word for the puzzle")
-    parser.add_argument("--rules", "-r", type=str, required=True, 
-                       help="Comma-separated list of 3 rules (e.g., 'noun,6-letters,double-letters')")
+    parser.add_argument("starting_word", type=str, nargs="?", help="Starting word for the puzzle")
+    parser.add_argument("--rules", "-r", type=str,
+                       help="Comma-separated list of rules, one per step (e.g., 'noun,6-letters,double-letters'). "
+                            "With other than 3 rules, the top --solutions (or --top) solutions are found")
     parser.add_argument("--solutions", "-s", type=int, default=5,
                        help="Maximum number of solutions to find (default: 5, use --all for all solutions)")
     parser.add_argument("--all", "-a", action="store_true",
                        help="Find all possible solutions (overrides --solutions)")
+    parser.add_argument("--engine", "-e", choices=ENGINES, default='search',
+                       help="Solver engine: 'search' scans forward from the starting word, 'join' meets in the middle from both ends of the cycle, "
+                            "'graph' walks the precomputed overlap graph (default: search)")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                       help="Number of worker processes to shard step-1 branches across (default: 1)")
+    parser.add_argument("--top", "-t", type=int,
+                       help="Find the exact top K solutions by total overlap, without enumerating paths (overrides --solutions and --all)")
     parser.add_argument("--print", "-p", type=int,
                        help="Maximum number of solutions to print (default: print all found solutions)")
+    parser.add_argument("--count", "-c", action="store_true",
+                       help="Only count the solutions, with a histogram by total overlap, without enumerating them "
+                            "(works with any number of rules)")
+    parser.add_argument("--memory-limit", type=int, default=fluxer_store.DEFAULT_MEMORY_LIMIT // (1024 * 1024), metavar="MB",
+                       help="Memory for holding solutions that are all printed; beyond it they are spilled to temporary files "
+                            f"and merged back in overlap order (default: {fluxer_store.DEFAULT_MEMORY_LIMIT // (1024 * 1024)})")
+    parser.add_argument("--stream", action="store_true",
+                       help="Write solutions as tab-separated lines as soon as they are found, without ranking them")
+    parser.add_argument("--batch", type=str, metavar="FILE",
+                       help="Solve every puzzle in a JSONL file ('-' for stdin) and write JSONL results")
+    parser.add_argument("--output", "-o", type=str, metavar="FILE",
+                       help="Write --batch results to FILE instead of stdout")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                       help="Query cache directory (default: $FLUXER_CACHE_DIR or ~/.cache/fluxer)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Do not read or write the query cache")
+    parser.add_argument("--stats", nargs="?", const="table", choices=("table", "json"), default=None,
+                       help="Print per-stage timings and search counters to stderr, as a table (default) or JSON. "
+                            "With --workers, work done in worker processes is not included")
+    parser.add_argument("--profile-startup", action="store_true",
+                       help="Print where startup time went (imports, each load step, the solve) to stderr")
     
     args = parser.parse_args()
     
-    # Parse rules
-    rule_list = [rule.strip() for rule in args.rules.split(',')]
-    
-    if len(rule_list) != 3:
-        print(f"{Colors.BOLD}{Colors.RED}❌ Error: Expected exactly 3 rules, got {Colors.YELLOW}{len(rule_list)}{Colors.RED}{Colors.END}")
-        print(f"{Colors.CYAN}Rules should be comma-separated, e.g.: {Colors.GREEN}noun,6-letters,double-letters{Colors.END}")
-        sys.exit(1)
-    
-    # Determine max solutions
-    if args.all:
-        max_solutions = None
-    else:
-        max_solutions = args.solutions
-    
-    # Determine max solutions to print
-    if args.print is not None:
-        max_print = args.print
-    else:
-        max_print = None  # Default: print all found solutions
+    if args.batch is None and (args.starting_word is None or args.rules is None):
+        parser.error("a starting word and --rules are required (unless --batch is used)")
     
-    # Import fluxer functions
+    stats = fluxer_stats.enable() if args.stats or args.profile_startup else None
+    if stats is not None:
+        stats.add_time('import', time.perf_counter() - IMPORT_STARTED)
     try:
-        fluxer = import_fluxer_functions()
-    except Exception as e:
-        print(f"{Colors.BOLD}{Colors.RED}❌ Error importing fluxer.py: {Colors.YELLOW}{e}{Colors.END}")
-        print(f"{Colors.CYAN}Make sure fluxer.py is in the same directory as this script{Colors.END}")
-        sys.exit(1)
-    
-    # Find solutions
-    solutions = find_solutions(args.starting_word, rule_list, fluxer, max_solutions)
-    
-    if solutions:
-        print_solutions(solutions, rule_list, max_print)
-    else:
-        print(f"\n{Colors.BOLD}{Colors.RED}❌ No solutions found. Try different rules or starting word.{Colors.END}")
-        sys.exit(1)
+        if args.batch:
+            main_batch(args)
+        else:
+            main_solve(args)
+    finally:
+        if args.stats:
+            print(stats.format(args.stats), file=sys.stderr)
+        if args.profile_startup:
+            print(fluxer_stats.format_startup(stats, time.perf_counter() - IMPORT_STARTED), file=sys.stderr)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
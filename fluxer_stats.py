@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import contextlib
+import json
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Stats collector that instrumented code reports to; None when stats are off
+current = None
+
+# Report labels for the counters the matcher and solver maintain
+COUNTER_LABELS = {
+    'candidates': 'candidates examined',
+    'overlaps': 'overlaps computed',
+    'solutions': 'solutions emitted',
+}
+
+_NO_STAGE = contextlib.nullcontext()
+
+class Stats:
+    """Wall time per stage and event counters for a run.
+
+    Stages and counters are named, may repeat (their time, call count and
+    value accumulate) and are reported in the order they were first seen.
+    Hooks are called as hook(event, name, value) for every 'stage' end (value
+    is the elapsed seconds) and every 'count' (value is the increment), so a
+    profiler can be attached programmatically without changing the
+    instrumented code.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.hooks: List[Callable[[str, str, Any], None]] = []
+
+    def add_hook(self, hook: Callable[[str, str, Any], None]):
+        self.hooks.append(hook)
+
+    def add_time(self, name: str, seconds: float):
+        """Record seconds spent in a stage"""
+        timing = self.timings.setdefault(name, [0.0, 0])
+        timing[0] += seconds
+        timing[1] += 1
+        for hook in self.hooks:
+            hook('stage', name, seconds)
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one call of a stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+        for hook in self.hooks:
+            hook('count', name, n)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'stages': {name: {'seconds': seconds, 'calls': calls} for name, (seconds, calls) in self.timings.items()},
+            'counters': dict(self.counters),
+        }
+
+    def format_table(self) -> str:
+        width = max([len(name) for name in self.timings] + [len(label) for label in COUNTER_LABELS.values()] + [20])
+        lines = [f"{'Stage':<{width}}  {'Time (ms)':>12}  {'Calls':>8}"]
+        for name, (seconds, calls) in self.timings.items():
+            lines.append(f"{name:<{width}}  {seconds * 1000:12.2f}  {calls:8d}")
+        lines.append("")
+        lines.append(f"{'Counter':<{width}}  {'Value':>12}")
+        for name, value in self.counters.items():
+            lines.append(f"{COUNTER_LABELS.get(name, name):<{width}}  {value:12d}")
+        return '\n'.join(lines)
+
+    def format(self, fmt: str = 'table') -> str:
+        return json.dumps(self.as_dict(), indent=2) if fmt == 'json' else self.format_table()
+
+def enable(stats: Optional[Stats] = None) -> Stats:
+    """Start collecting into stats (a new Stats by default) and return it"""
+    global current
+    current = stats if stats is not None else Stats()
+    return current
+
+def disable() -> Optional[Stats]:
+    """Stop collecting and return the stats collected so far"""
+    global current
+    stats, current = current, None
+    return stats
+
+def stage(name: str):
+    """Context manager timing a stage when stats are on (a no-op otherwise)"""
+    return current.stage(name) if current is not None else _NO_STAGE
+
+def count(name: str, n: int = 1):
+    """Add n to a counter when stats are on"""
+    if current is not None:
+        current.count(name, n)
+
+def format_startup(stats: Stats, total: float) -> str:
+    """Report where a run's time went: imports, each load step, and the rest.
+
+    Stages named 'import' or starting with 'load:' are listed on their own;
+    everything else in total (seconds since the script started importing) is
+    reported as the query itself.
+    """
+    startup = [(name, seconds) for name, (seconds, _) in stats.timings.items()
+               if name == 'import' or name.startswith('load:')]
+    rows = startup + [('query', total - sum(seconds for _, seconds in startup)), ('total', total)]
+    width = max(len(name) for name, _ in rows)
+    lines = [f"{'Startup':<{width}}  {'Time (ms)':>12}  {'Share':>6}"]
+    for name, seconds in rows:
+        share = seconds / total * 100 if total > 0 else 0.0
+        lines.append(f"{name:<{width}}  {seconds * 1000:12.2f}  {share:5.1f}%")
+    return '\n'.join(lines)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+import heapq
+import tempfile
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Solution store: the solutions of one puzzle packed as uint32 records of the
+# total overlap followed by the word ID (position in the word list) of each
+# step; the starting word is the same for every solution and kept once. Words
+# that are only in a POS list get IDs past the end of the word list.
+#
+# Records are appended to one buffer per total overlap, so a buffer read in
+# descending overlap order is already ranked, with ties in the order the
+# solutions were added. When the buffers go over the memory limit they are
+# written out that way as a sorted run to a temporary file, and the final
+# ranking is a k-way merge of the runs and whatever is still in memory.
+
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+# Runs merged at once; more runs than this are merged in passes first
+MAX_FAN_IN = 64
+
+# Records read from a run file at a time while merging
+READ_BLOCK = 8192
+
+class SolutionStore:
+    """Solutions of one puzzle as packed word IDs, ranked by total overlap.
+
+    add() takes solutions in the order they are found; ranked() yields them
+    back by total overlap (highest first), ties in the order they were added,
+    which is how print_solutions ranks a list. At most memory_limit bytes of
+    records are held in memory; the rest is spilled to sorted runs in
+    temporary files (in tmp_dir, or the system default) that are removed by
+    close().
+    """
+
+    def __init__(self, words: Sequence[str], word_ids: Dict[str, int], starting_word: str, steps: int,
+                 memory_limit: int = DEFAULT_MEMORY_LIMIT, tmp_dir: Optional[str] = None):
+        self.words = words
+        self.word_ids = word_ids
+        self.starting_word = starting_word
+        self.steps = steps
+        self.stride = steps + 1
+        self.itemsize = array('I').itemsize
+        self.memory_limit = memory_limit
+        self.tmp_dir = tmp_dir
+        self.extra_ids: Dict[str, int] = {}
+        self.extra_words: List[str] = []
+        self.buffers: Dict[int, array] = {}
+        self.buffered = 0
+        self.runs = []
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the packed records of every solution added, in memory or on disk"""
+        return self.count * self.stride * self.itemsize
+
+    @property
+    def spilled(self) -> bool:
+        """Whether any solutions have been written to disk"""
+        return bool(self.runs)
+
+    def add(self, solution: List[str], total_overlap: int):
+        """Add a solution (the starting word followed by one word per step)"""
+        buffer = self.buffers.get(total_overlap)
+        if buffer is None:
+            buffer = self.buffers[total_overlap] = array('I')
+        buffer.append(total_overlap)
+        buffer.extend([self.word_id(word) for word in solution[1:]])
+        self.count += 1
+        self.buffered += self.stride * self.itemsize
+        if self.buffered >= self.memory_limit:
+            self.spill()
+
+    def word_id(self, word: str) -> int:
+        i = self.word_ids.get(word)
+        if i is None:
+            i = self.extra_ids.get(word)
+            if i is None:
+                i = self.extra_ids[word] = len(self.words) + len(self.extra_words)
+                self.extra_words.append(word)
+        return i
+
+    def word(self, i: int) -> str:
+        return self.words[i] if i < len(self.words) else self.extra_words[i - len(self.words)]
+
+    def extend(self, solutions: Iterator[Tuple[List[str], int]]):
+        for solution, total_overlap in solutions:
+            self.add(solution, total_overlap)
+
+    def spill(self):
+        """Write the buffered solutions to a new sorted run and empty the buffers"""
+        if not self.buffers:
+            return
+        run = tempfile.TemporaryFile(prefix='fluxer-', suffix='.run', dir=self.tmp_dir)
+        for total_overlap in sorted(self.buffers, reverse=True):
+            self.buffers[total_overlap].tofile(run)
+        self.runs.append(run)
+        self.buffers = {}
+        self.buffered = 0
+        if len(self.runs) > MAX_FAN_IN:
+            self._merge_runs()
+
+    def _merge_runs(self):
+        """Merge the oldest MAX_FAN_IN runs into one, keeping the number of open runs bounded"""
+        merging, self.runs = self.runs[:MAX_FAN_IN], self.runs[MAX_FAN_IN:]
+        merged = tempfile.TemporaryFile(prefix='fluxer-', suffix='.run', dir=self.tmp_dir)
+        out = array('I')
+        for record in heapq.merge(*[self._read_run(run) for run in merging], key=lambda record: -record[0]):
+            out.extend(record)
+            if len(out) >= READ_BLOCK * self.stride:
+                out.tofile(merged)
+                out = array('I')
+        out.tofile(merged)
+        for run in merging:
+            run.close()
+        # The merged runs hold the oldest solutions, so ties still come out first
+        self.runs.insert(0, merged)
+
+    def _read_run(self, run) -> Iterator[Tuple[int, ...]]:
+        """Yield the records of a run file in order, reading a block at a time"""
+        stride = self.stride
+        run.seek(0)
+        while True:
+            block = array('I')
+            try:
+                block.fromfile(run, READ_BLOCK * stride)
+            except EOFError:
+                pass
+            if not block:
+                return
+            for i in range(0, len(block), stride):
+                yield tuple(block[i:i + stride])
+
+    def _read_buffers(self) -> Iterator[Tuple[int, ...]]:
+        stride = self.stride
+        for total_overlap in sorted(self.buffers, reverse=True):
+            buffer = self.buffers[total_overlap]
+            for i in range(0, len(buffer), stride):
+                yield tuple(buffer[i:i + stride])
+
+    def ranked(self) -> Iterator[Tuple[List[str], int]]:
+        """Yield (path, total overlap) for every solution, by total overlap"""
+        sources = [self._read_run(run) for run in self.runs] + [self._read_buffers()]
+        records = heapq.merge(*sources, key=lambda record: -record[0]) if self.runs else sources[0]
+        word = self.word
+        for record in records:
+            yield [self.starting_word] + [word(i) for i in record[1:]], record[0]
+
+    def close(self):
+        """Remove the spilled runs and drop the buffers"""
+        for run in self.runs:
+            run.close()
+        self.runs = []
+        self.buffers = {}
+        self.buffered = 0
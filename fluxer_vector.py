@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+import os
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import fluxer_corpus
+from fluxer_index import LETTER_FILTERS, RuleIndex
+
+# NumPy is optional: without it (or with FLUXER_NO_NUMPY set) callers use the
+# pure-Python predicates and RuleIndex, which give identical results
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+VOWELS = b'aeiou'
+CONSONANTS = b'bcdfghjklmnpqrstvwxyz'
+
+def available() -> bool:
+    """Return whether the vectorized backend can be used"""
+    return np is not None and not os.environ.get('FLUXER_NO_NUMPY')
+
+def encode_words(words: Sequence[str]) -> Tuple[Any, Any, Any]:
+    """Encode lowercased words as a zero-padded uint8 letter matrix.
+
+    Returns (matrix, lengths, encoded): row i holds word i's bytes followed by
+    zeros. Words that are not ASCII are left as all-zero rows and marked False
+    in encoded, so callers can compute them another way.
+    """
+    lowered = [w.lower() for w in words]
+    width = max((len(w) for w in lowered), default=0)
+    encoded = np.array([w.isascii() for w in lowered], dtype=bool)
+    data = b''.join(w.encode('ascii').ljust(width, b'\0') if w.isascii() else bytes(width) for w in lowered)
+    matrix = np.frombuffer(data, dtype=np.uint8).reshape(len(lowered), width)
+    lengths = np.array([len(w) for w in lowered], dtype=np.int64)
+    return matrix, lengths, encoded
+
+def attribute_columns(words: Sequence[str], fallback: Callable[[str], Tuple[int, int, int, int]]) -> Dict[str, List[int]]:
+    """Compute the length, vowels, consonants and attributes columns for a word list.
+
+    Matches fluxer.word_attributes on every word; fallback (normally that
+    function) is used for words the letter matrix cannot encode.
+    """
+    if not words:
+        return {name: [] for name in ('length', 'vowels', 'consonants', 'attributes')}
+    matrix, lengths, encoded = encode_words(words)
+    width = matrix.shape[1]
+    filled = matrix != 0
+    is_vowel = np.isin(matrix, np.frombuffer(VOWELS, dtype=np.uint8))
+    is_consonant = np.isin(matrix, np.frombuffer(CONSONANTS, dtype=np.uint8))
+    # count_consonants counts every letter that is not a vowel (ASCII letters here)
+    is_alpha = (matrix >= ord('a')) & (matrix <= ord('z'))
+
+    vowels = is_vowel.sum(axis=1)
+    consonants = (is_alpha & ~is_vowel).sum(axis=1)
+
+    # Adjacent equal characters; padding never counts
+    double = ((matrix[:, 1:] == matrix[:, :-1]) & filled[:, 1:]).any(axis=1)
+    # Any character twice shows up as an adjacent pair once each row is sorted
+    ordered = np.sort(matrix, axis=1)
+    repeated = ((ordered[:, 1:] == ordered[:, :-1]) & (ordered[:, 1:] != 0)).any(axis=1)
+    # Characters never decrease before the padding starts
+    alphabetical = ((matrix[:, 1:] >= matrix[:, :-1]) | ~filled[:, 1:]).all(axis=1)
+    # Each vowel or consonant sits where the first letter's type says it should
+    vowel_start = is_vowel[:, 0] if width else np.zeros(len(words), dtype=bool)
+    even = np.arange(width) % 2 == 0
+    should_be_vowel = np.where(vowel_start[:, None], even[None, :], ~even[None, :])
+    misplaced = (is_vowel | is_consonant) & (should_be_vowel != is_vowel)
+    alternating = ~misplaced.any(axis=1) | (lengths <= 1)
+
+    attributes = (double * fluxer_corpus.ATTR_DOUBLE | repeated * fluxer_corpus.ATTR_REPEATED
+                  | alternating * fluxer_corpus.ATTR_ALTERNATING | alphabetical * fluxer_corpus.ATTR_ALPHABETICAL)
+    columns = {
+        'length': np.minimum(lengths, 255).tolist(),
+        'vowels': np.minimum(vowels, 255).tolist(),
+        'consonants': np.minimum(consonants, 255).tolist(),
+        'attributes': attributes.tolist(),
+    }
+    for i in np.flatnonzero(~encoded).tolist():
+        for name, value in zip(('length', 'vowels', 'consonants', 'attributes'), fallback(words[i].lower())):
+            columns[name][i] = value
+    return columns
+
+def mask_to_bitset(mask) -> int:
+    """Pack a boolean mask over word IDs into a bitset (bit i set for word i)"""
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+def bitset_to_mask(bits: int, size: int):
+    """Unpack a bitset into a boolean mask over size word IDs"""
+    data = np.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(data, count=size, bitorder='little').astype(bool)
+
+class VectorIndex(RuleIndex):
+    """RuleIndex backed by NumPy attribute columns.
+
+    Filters are evaluated as boolean masks over the columns instead of from
+    bitsets built up front, so there is no per-word build step. Bitsets are
+    packed from the masks on demand for callers that want them. Letter
+    filters are resolved through the LetterIndex postings and unpacked into
+    a mask.
+    """
+
+    def __init__(self, words: Sequence[str], columns: Dict[str, Sequence[int]]):
+        self.words = words
+        self.size = len(words)
+        self.all = (1 << self.size) - 1
+        self.columns = {name: np.frombuffer(columns[name], dtype=np.uint8) if isinstance(columns[name], memoryview)
+                        else np.asarray(columns[name], dtype=np.uint8)
+                        for name in fluxer_corpus.COLUMNS}
+        self.bitsets = {}
+        self.letters = None
+
+    def insert(self, i: int, pos: int, length: int, vowels: int, consonants: int, attributes: int):
+        if self.letters is not None:
+            self.letters.insert(i, self.words[i])
+        values = {'pos': pos, 'length': length, 'vowels': vowels, 'consonants': consonants, 'attributes': attributes}
+        for name, value in values.items():
+            self.columns[name] = np.insert(self.columns[name], i, value)
+        self.size += 1
+        self.all = (1 << self.size) - 1
+        self.bitsets.clear()
+
+    def delete(self, i: int):
+        if self.letters is not None:
+            self.letters.delete(i)
+        for name in fluxer_corpus.COLUMNS:
+            self.columns[name] = np.delete(self.columns[name], i)
+        self.size -= 1
+        self.all = (1 << self.size) - 1
+        self.bitsets.clear()
+
+    def set_pos(self, i: int, pos: int):
+        # Columns mapped from the compiled corpus are read-only
+        if not self.columns['pos'].flags.writeable:
+            self.columns['pos'] = self.columns['pos'].copy()
+        self.columns['pos'][i] = pos
+        self.bitsets = {key: bits for key, bits in self.bitsets.items() if key[0] != 'pos'}
+
+    def mask(self, key: str, value: Any):
+        """Return the boolean mask of words matching a single rule key and value"""
+        columns = self.columns
+        if key in ('length', 'vowels', 'consonants'):
+            if not isinstance(value, int) or not 0 <= value <= 255:
+                return np.zeros(self.size, dtype=bool)
+            return columns[key] == value
+        if key == 'pos':
+            flag = fluxer_corpus.POS_FLAGS.get(value, 0)
+            return (columns['pos'] & flag) != 0
+        attribute = {
+            'double_letters': fluxer_corpus.ATTR_DOUBLE,
+            'repeats': fluxer_corpus.ATTR_REPEATED,
+            'no_repeats': fluxer_corpus.ATTR_REPEATED,
+            'alternating': fluxer_corpus.ATTR_ALTERNATING,
+            'alphabetical': fluxer_corpus.ATTR_ALPHABETICAL,
+        }.get(key)
+        if attribute is None or value is not True:
+            return np.zeros(self.size, dtype=bool)
+        has_attribute = (columns['attributes'] & attribute) != 0
+        return ~has_attribute if key == 'no_repeats' else has_attribute
+
+    def filter_mask(self, filters: Dict[str, Any]):
+        """Resolve a filter dict to the boolean mask of words passing every filter"""
+        mask = np.ones(self.size, dtype=bool)
+        for key in ('length', 'vowels', 'consonants', 'pos'):
+            if key in filters:
+                mask &= self.mask(key, filters[key])
+        for key in ('double_letters', 'no_repeats', 'alternating', 'alphabetical'):
+            if filters.get(key, False):
+                mask &= self.mask(key, True)
+        if any(key in filters for key in LETTER_FILTERS):
+            mask &= bitset_to_mask(self.letter_index().filter_bits(filters), self.size)
+        return mask
+
+    def bitset(self, key: str, value: Any) -> int:
+        if (key, value) not in self.bitsets:
+            self.bitsets[key, value] = mask_to_bitset(self.mask(key, value))
+        return self.bitsets[key, value]
+
+    def filter_bits(self, filters: Dict[str, Any]) -> int:
+        return mask_to_bitset(self.filter_mask(filters))
+
+    def words_for(self, filters: Dict[str, Any]) -> List[str]:
+        words = self.words
+        return [words[i] for i in np.flatnonzero(self.filter_mask(filters)).tolist()]
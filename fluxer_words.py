@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+
+import fluxer
+
+def parse_pos(value):
+    """Parse a comma-separated POS list ('none' or '' for no parts of speech)"""
+    if value.strip().lower() in ('', 'none'):
+        return []
+    return fluxer.normalize_pos(value.split(','))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Edit the curated word lists (popular.txt and the POS lists) in place",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python fluxer_words.py add-word blorp --pos noun
+  python fluxer_words.py remove-word perhaps
+  python fluxer_words.py set-pos hello verb,adjective
+  python fluxer_words.py set-pos hello none
+
+Running fluxer_server.py processes pick up the edits without a restart.
+        """
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add-word", help="Add words to the word list")
+    add.add_argument("words", nargs="+", help="Words to add")
+    add.add_argument("--pos", "-p", type=str, default="none",
+                     help="Comma-separated parts of speech for the new words (default: none)")
+    remove = commands.add_parser("remove-word", help="Remove words from the word list and the POS lists")
+    remove.add_argument("words", nargs="+", help="Words to remove")
+    set_pos = commands.add_parser("set-pos", help="Replace the parts of speech of a word")
+    set_pos.add_argument("word", help="Word to tag")
+    set_pos.add_argument("pos", help="Comma-separated parts of speech (noun, verb, adjective, adverb), or 'none'")
+    args = parser.parse_args()
+
+    try:
+        pos = parse_pos(args.pos) if args.command in ("add-word", "set-pos") else []
+    except ValueError as e:
+        parser.error(str(e))
+
+    fluxer.ensure_words_corpus()
+    changed = []
+    unchanged = []
+    if args.command == "add-word":
+        for word in args.words:
+            (changed if fluxer.add_word(word, pos) else unchanged).append(word)
+        verb, reason = "Added", "already in the word list"
+    elif args.command == "remove-word":
+        for word in args.words:
+            (changed if fluxer.remove_word(word) else unchanged).append(word)
+        verb, reason = "Removed", "not in the word list"
+    else:
+        (changed if fluxer.set_pos(args.word, pos) else unchanged).append(args.word)
+        verb, reason = f"Set parts of speech ({', '.join(pos) or 'none'}) for", "not in the word list"
+
+    if changed:
+        try:
+            fluxer.save_text_corpus()
+        except OSError as e:
+            print(f"Error: could not write the word lists: {e}")
+            sys.exit(1)
+        print(f"{verb} {', '.join(changed)}")
+    for word in unchanged:
+        print(f"Skipped {word}: {reason}")
+    if unchanged and not changed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
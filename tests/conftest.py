@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root, and fluxer finds its word lists
+# relative to the working directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
@@ -0,0 +1,34 @@
+import random
+
+import fluxer_graph
+import fluxer_lexicon
+import pytest
+
+BASE_WORDS = sorted({
+    'able', 'cable', 'cabin', 'dime', 'dimer', 'lemon', 'lemons', 'melon', 'mel', 'merit',
+    'once', 'one', 'ones', 'stone', 'stones', 'tone', 'toner', 'zone', 'zones',
+})
+OTHER_WORDS = ['ab', 'bled', 'cabins', 'melt', 'nest', 'onerous', 'ton', 'xylem', 'zo', 'zoned']
+
+def rows(graph, count):
+    return [tuple(map(list, graph.row(i))) for i in range(count)]
+
+@pytest.mark.parametrize('seed', range(5))
+def test_edited_graph_matches_rebuilt_graph(seed):
+    rng = random.Random(seed)
+    words = list(BASE_WORDS)
+    graph = fluxer_graph.EditedGraph(fluxer_graph.OverlapGraph(*fluxer_graph.build_rows(words)), words,
+                                     lambda: (fluxer_lexicon.Lexicon.build(words), fluxer_lexicon.Lexicon.build(words, reverse=True)))
+    # The graph records each edit before the (sorted) word list changes
+    for _ in range(30):
+        word = rng.choice(BASE_WORDS + OTHER_WORDS)
+        if word in words:
+            graph.remove(word)
+            words.remove(word)
+        else:
+            graph.add(word)
+            words.append(word)
+            words.sort()
+        fresh = fluxer_graph.OverlapGraph(*fluxer_graph.build_rows(words))
+        assert graph.count == len(words)
+        assert rows(graph, len(words)) == rows(fresh, len(words))
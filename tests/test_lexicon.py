@@ -0,0 +1,50 @@
+import random
+
+import fluxer_lexicon
+import pytest
+
+BASE_WORDS = sorted({
+    'able', 'abler', 'cable', 'cab', 'cabin', 'dime', 'dimer', 'lemon', 'lemons', 'melon', 'mel',
+    'once', 'one', 'ones', 'stone', 'stones', 'tone', 'toner', 'zone', 'zones',
+})
+OTHER_WORDS = ['ab', 'abl', 'cabins', 'meld', 'on', 'onerous', 'ton', 'xylem', 'zo', 'zoned']
+
+def keys(words, reverse):
+    return [w[::-1] if reverse else w for w in words]
+
+def assert_matches_fresh(prefixes, suffixes, edited):
+    """Compare the edited lexicons with ones built from the edited word list"""
+    for reverse, lexicon in [(False, prefixes), (True, suffixes)]:
+        fresh = fluxer_lexicon.Lexicon.build(edited, reverse=reverse)
+        assert len(lexicon) == len(fresh)
+        assert list(lexicon) == list(fresh)
+        for key in keys(BASE_WORDS + OTHER_WORDS, reverse):
+            assert lexicon.get(key) == fresh.get(key)
+            if key in fresh:
+                assert lexicon.index(key) == fresh.index(key)
+            else:
+                with pytest.raises(ValueError):
+                    lexicon.index(key)
+        affixes = {key[:n] for key in keys(BASE_WORDS + OTHER_WORDS, reverse) for n in range(4)}
+        for affix in affixes:
+            assert sorted(lexicon.prefix_ids(affix)) == sorted(fresh.prefix_ids(affix))
+
+@pytest.mark.parametrize('seed', range(5))
+def test_edited_lexicon_matches_fresh_lexicon(seed):
+    rng = random.Random(seed)
+    base = fluxer_lexicon.Lexicon.build(BASE_WORDS)
+    delta = fluxer_lexicon.LexiconDelta(base)
+    prefixes = fluxer_lexicon.EditedLexicon(base, delta)
+    suffixes = fluxer_lexicon.EditedLexicon(fluxer_lexicon.Lexicon.build(BASE_WORDS, reverse=True), delta, reverse=True)
+    edited = list(BASE_WORDS)
+    # Adds and removes of base and new words, including re-adding removed ones
+    for _ in range(30):
+        word = rng.choice(BASE_WORDS + OTHER_WORDS)
+        if word in edited:
+            delta.remove(word)
+            edited.remove(word)
+        else:
+            delta.add(word)
+            edited.append(word)
+            edited.sort()
+        assert_matches_fresh(prefixes, suffixes, edited)
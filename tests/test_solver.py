@@ -0,0 +1,34 @@
+from collections import Counter
+
+import fluxer
+import fluxer_solver
+import pytest
+
+# Small puzzles whose solutions can all be enumerated quickly
+PUZZLES = [
+    ('hello', ['adjective', 'alternating', 'alphabetical']),
+    ('hello', ['noun', 'alphabetical', 'verb']),
+]
+
+@pytest.fixture(scope='module', params=PUZZLES, ids=lambda puzzle: ','.join(puzzle[1]))
+def puzzle(request):
+    """A puzzle with its enumerated solutions, in search order"""
+    starting_word, rules = request.param
+    solutions = list(fluxer_solver.iter_solutions(starting_word, rules, fluxer))
+    assert solutions
+    return starting_word, rules, solutions
+
+@pytest.mark.parametrize('top_k', [1, 10, 100000])
+def test_find_top_solutions_matches_sorted_enumeration(puzzle, top_k):
+    starting_word, rules, solutions = puzzle
+    expected = sorted(solutions, key=lambda s: -s[1])[:top_k]
+    # Ties are ranked in search order, as a stable sort of the enumeration ranks them
+    assert fluxer_solver.find_top_solutions(starting_word, rules, fluxer, top_k, verbose=False) == expected
+
+def test_count_solutions_matches_enumerated_histogram(puzzle):
+    starting_word, rules, solutions = puzzle
+    histogram = Counter(total for _, total in solutions)
+    counts = fluxer_solver.count_solutions(starting_word, rules, fluxer, verbose=False)
+    assert counts == dict(histogram)
+    # Highest overlap first
+    assert list(counts) == sorted(histogram, reverse=True)
@@ -0,0 +1,34 @@
+import fluxer
+import fluxer_solver
+import fluxer_store
+import pytest
+
+@pytest.fixture(scope='module')
+def solutions():
+    solutions = list(fluxer_solver.iter_solutions('hello', ['adjective', 'alternating', 'alphabetical'], fluxer))
+    assert len({total for _, total in solutions}) > 1
+    return solutions
+
+def make_store(solutions, memory_limit, tmp_path):
+    return fluxer_store.SolutionStore(fluxer.words, fluxer.get_word_ids(), 'hello', 3, memory_limit, str(tmp_path))
+
+def test_ranked_in_memory(solutions, tmp_path):
+    with make_store(solutions, fluxer_store.DEFAULT_MEMORY_LIMIT, tmp_path) as store:
+        store.extend(solutions)
+        assert not store.spilled
+        assert list(store.ranked()) == sorted(solutions, key=lambda s: -s[1])
+
+# 16 records per run (so the runs go over MAX_FAN_IN and are merged in passes) and 256
+@pytest.mark.parametrize('memory_limit', [256, 4096])
+def test_ranked_after_spilling(solutions, memory_limit, tmp_path):
+    with make_store(solutions, memory_limit, tmp_path) as store:
+        store.extend(solutions)
+        assert store.spilled
+        assert len(store) == len(solutions)
+        assert list(store.ranked()) == sorted(solutions, key=lambda s: -s[1])
+
+def test_words_missing_from_the_list(tmp_path):
+    solutions = [(['hello', 'lochs', 'hsxyz', 'yzzz'], 5), (['hello', 'lochs', 'hsabc', 'bcd'], 7)]
+    with make_store(solutions, 16, tmp_path) as store:
+        store.extend(solutions)
+        assert list(store.ranked()) == sorted(solutions, key=lambda s: -s[1])
@@ -0,0 +1,100 @@
+// Lexicon bundle loader: reads lexicon.bin, built from the same word lists as
+// the Python scripts by create_web_bundle.py (see that script for the layout)
+
+const LEXICON_MAGIC = 'FLXW';
+const LEXICON_VERSION = 1;
+const LEXICON_HEADER_SIZE = 52;
+
+// Same bits as fluxer_corpus.POS_FLAGS and fluxer_corpus.ATTR_*
+const POS_FLAGS = { noun: 1, verb: 2, adjective: 4, adverb: 8 };
+const ATTR_DOUBLE = 1;
+const ATTR_REPEATED = 2;
+const ATTR_ALTERNATING = 4;
+const ATTR_ALPHABETICAL = 8;
+
+// Fetch and decode the bundle
+async function loadLexicon(url = 'lexicon.bin') {
+    const response = await fetch(url);
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    return decodeLexicon(await response.arrayBuffer());
+}
+
+// Decode a bundle into the word list, its per-word columns and the suffix order
+function decodeLexicon(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== LEXICON_MAGIC || view.getUint16(4, true) !== LEXICON_VERSION) {
+        throw new Error(`lexicon.bin is not a version ${LEXICON_VERSION} lexicon bundle; rebuild it with create_web_bundle.py`);
+    }
+    const posPresent = view.getUint16(6, true);
+    const count = view.getUint32(40, true);
+    const tableLength = view.getUint32(44, true);
+    const idWidth = view.getUint16(48, true);
+
+    // Front-coded word table: shared prefix length, rest of the word, newline
+    let offset = LEXICON_HEADER_SIZE;
+    const table = new TextDecoder().decode(new Uint8Array(buffer, offset, tableLength));
+    const words = new Array(count);
+    let previous = '';
+    let pos = 0;
+    for (let i = 0; i < count; i++) {
+        const shared = table.charCodeAt(pos);
+        const end = table.indexOf('\n', pos + 1);
+        previous = words[i] = previous.slice(0, shared) + table.slice(pos + 1, end);
+        pos = end + 1;
+    }
+    offset += tableLength;
+
+    const columns = {};
+    for (const name of ['pos', 'vowels', 'consonants', 'attributes']) {
+        columns[name] = new Uint8Array(buffer, offset, count);
+        offset += count;
+    }
+    offset += (4 - offset % 4) % 4;
+    const suffixOrder = idWidth === 2 ? new Uint16Array(buffer, offset, count) : new Uint32Array(buffer, offset, count);
+
+    return { words, posPresent, ...columns, suffixOrder };
+}
+
+// First index in [0, count) where key(index) >= target
+function lowerBound(count, key, target) {
+    let low = 0;
+    let high = count;
+    while (low < high) {
+        const mid = (low + high) >>> 1;
+        if (key(mid) < target) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    return low;
+}
+
+// IDs of the words starting with start (the word table is in spelling order)
+function wordsStartingWith(lexicon, start) {
+    const { words } = lexicon;
+    const ids = [];
+    for (let i = lowerBound(words.length, n => words[n], start); i < words.length && words[i].startsWith(start); i++) {
+        ids.push(i);
+    }
+    return ids;
+}
+
+// IDs of the words ending with end, found through the suffix order
+function wordsEndingWith(lexicon, end) {
+    const { words, suffixOrder } = lexicon;
+    const reversed = s => Array.from(s).reverse().join('');
+    const target = reversed(end);
+    const ids = [];
+    for (let i = lowerBound(words.length, n => reversed(words[suffixOrder[n]]), target); i < words.length; i++) {
+        const id = suffixOrder[i];
+        if (!words[id].endsWith(end)) {
+            break;
+        }
+        ids.push(id);
+    }
+    return ids;
+}
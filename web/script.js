@@ -1,9 +1,5 @@
 // Global variables
-let words = [];
-let nouns = [];
-let verbs = [];
-let adjectives = [];
-let adverbs = [];
+let lexicon = null;
 
 // DOM elements
 const prefixInput = document.getElementById('prefix');
@@ -34,53 +30,14 @@ async function init() {
     setupEventListeners();
 }
 
-// Load words from popular.txt and POS-specific lists
+// Load the lexicon bundle (word list, POS flags, attribute columns and affix index)
 async function loadWords() {
     try {
-        // Load main word list
-        const response = await fetch('popular.txt');
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-        const text = await response.text();
-        words = text.split('\n').map(word => word.trim()).filter(word => word.length > 0);
-        console.log(`Loaded ${words.length} words`);
-        
-        // Load POS-specific lists
-        const [nounsResponse, verbsResponse, adjectivesResponse, adverbsResponse] = await Promise.all([
-            fetch('nouns.txt'),
-            fetch('verbs.txt'),
-            fetch('adjectives.txt'),
-            fetch('adverbs.txt')
-        ]);
-        
-        if (nounsResponse.ok) {
-            const nounsText = await nounsResponse.text();
-            nouns = nounsText.split('\n').map(word => word.trim()).filter(word => word.length > 0);
-            console.log(`Loaded ${nouns.length} nouns`);
-        }
-        
-        if (verbsResponse.ok) {
-            const verbsText = await verbsResponse.text();
-            verbs = verbsText.split('\n').map(word => word.trim()).filter(word => word.length > 0);
-            console.log(`Loaded ${verbs.length} verbs`);
-        }
-        
-        if (adjectivesResponse.ok) {
-            const adjectivesText = await adjectivesResponse.text();
-            adjectives = adjectivesText.split('\n').map(word => word.trim()).filter(word => word.length > 0);
-            console.log(`Loaded ${adjectives.length} adjectives`);
-        }
-        
-        if (adverbsResponse.ok) {
-            const adverbsText = await adverbsResponse.text();
-            adverbs = adverbsText.split('\n').map(word => word.trim()).filter(word => word.length > 0);
-            console.log(`Loaded ${adverbs.length} adverbs`);
-        }
-        
+        lexicon = await loadLexicon();
+        console.log(`Loaded ${lexicon.words.length} words`);
     } catch (error) {
         console.error('Error loading words:', error);
-        alert('Error loading word lists. Please make sure all word list files are available.');
+        alert('Error loading the word list. Please make sure lexicon.bin is available (build it with create_web_bundle.py).');
     }
 }
 
@@ -304,96 +261,81 @@ async function performSearch() {
     }, 100);
 }
 
-// Find matches based on prefix and suffix
+// Find the IDs of the words that overlap the prefix (or, given a suffix, the
+// suffix, since the prefix may then overlap by nothing) using the affix index
 function findMatches(prefix, suffix, length) {
     const results = new Set();
-    const prefixSuffixes = [];
-    
-    // Generate all suffixes of prefix
-    for (let i = 0; i <= prefix.length; i++) {
-        prefixSuffixes.push(prefix.substring(i));
-    }
     
-    for (const word of words) {
-        const wordLower = word.toLowerCase();
-        
-        // Check length filter
-        if (length !== null && wordLower.length !== length) {
-            continue;
+    if (suffix) {
+        // Words ending with any head of the suffix
+        for (let i = 1; i <= suffix.length; i++) {
+            for (const id of wordsEndingWith(lexicon, suffix.substring(0, i))) {
+                results.add(id);
+            }
         }
-        
-        // Check all suffixes of prefix
-        for (const pre of prefixSuffixes) {
-            if (wordLower.startsWith(pre)) {
-                if (suffix) {
-                    // Check all prefixes of suffix
-                    for (let i = 1; i <= suffix.length; i++) {
-                        if (wordLower.endsWith(suffix.substring(0, i))) {
-                            results.add(word);
-                            break;
-                        }
-                    }
-                    break; // Only need the longest prefix match
-                } else {
-                    results.add(word);
-                    break;
-                }
+    } else {
+        // Words starting with any tail of the prefix
+        for (let i = 0; i < prefix.length; i++) {
+            for (const id of wordsStartingWith(lexicon, prefix.substring(i))) {
+                results.add(id);
             }
         }
     }
     
-    return Array.from(results);
+    const ids = Array.from(results);
+    return length !== null ? ids.filter(id => lexicon.words[id].length === length) : ids;
 }
 
-// Filter matches by additional criteria
+// Filter matches by additional criteria, read from the precomputed columns
 function filterMatches(matches, prefix, suffix) {
     const filtered = [];
+    const vowels = getVowelsFilter();
+    const consonants = getConsonantsFilter();
+    const pos = getPosFilter();
     
-    for (const word of matches) {
-        const wordLower = word.toLowerCase();
+    for (const id of matches) {
+        const word = lexicon.words[id];
+        const attributes = lexicon.attributes[id];
         
         // Vowel count filter
-        const vowels = getVowelsFilter();
-        if (vowels !== null && countVowels(wordLower) !== vowels) {
+        if (vowels !== null && lexicon.vowels[id] !== vowels) {
             continue;
         }
         
         // Consonant count filter
-        const consonants = getConsonantsFilter();
-        if (consonants !== null && countConsonants(wordLower) !== consonants) {
+        if (consonants !== null && lexicon.consonants[id] !== consonants) {
             continue;
         }
         
         // Part of speech filter
-        const pos = getPosFilter();
-        if (pos && !isWordInPosCategory(wordLower, pos)) {
+        if (pos && !isWordInPosCategory(id, pos)) {
             continue;
         }
         
         // Double letters filter
-        if (doubleLettersCheckbox.checked && !hasDoubleLetters(wordLower)) {
+        if (doubleLettersCheckbox.checked && !(attributes & ATTR_DOUBLE)) {
             continue;
         }
         
         // No repeats filter
-        if (noRepeatsCheckbox.checked && hasRepeatedLetters(wordLower)) {
+        if (noRepeatsCheckbox.checked && (attributes & ATTR_REPEATED)) {
             continue;
         }
         
         // Alternating pattern filter
-        if (alternatingCheckbox.checked && !isAlternatingPattern(wordLower)) {
+        if (alternatingCheckbox.checked && !(attributes & ATTR_ALTERNATING)) {
             continue;
         }
         
         // Alphabetical order filter
-        if (alphabeticalCheckbox.checked && !isAlphabeticalOrder(wordLower)) {
+        if (alphabeticalCheckbox.checked && !(attributes & ATTR_ALPHABETICAL)) {
             continue;
         }
         
         // Calculate overlap
-        let overlap = prefixOverlap(wordLower, prefix);
+        let overlap = prefixOverlap(word, prefix);
         if (suffix) {
-            overlap += suffixOverlap(wordLower, suffix);
+            overlap += suffixOverlap(word, suffix);
         }
         
         // Only include words with actual overlap
@@ -497,69 +439,6 @@ function getLimitFilter() {
 
 // Utility functions (ported from fluxer.py)
 
-function countVowels(word) {
-    return (word.match(/[aeiou]/g) || []).length;
-}
-
-function countConsonants(word) {
-    return (word.match(/[bcdfghjklmnpqrstvwxyz]/g) || []).length;
-}
-
-function hasDoubleLetters(word) {
-    for (let i = 0; i < word.length - 1; i++) {
-        if (word[i] === word[i + 1]) {
-            return true;
-        }
-    }
-    return false;
-}
-
-function hasRepeatedLetters(word) {
-    const seen = new Set();
-    for (const letter of word) {
-        if (seen.has(letter)) {
-            return true;
-        }
-        seen.add(letter);
-    }
-    return false;
-}
-
-function isAlternatingPattern(word) {
-    const vowels = 'aeiou';
-    const consonants = 'bcdfghjklmnpqrstvwxyz';
-    
-    if (word.length <= 1) {
-        return true;
-    }
-    
-    const isVowelStart = vowels.includes(word[0]);
-    
-    for (let i = 0; i < word.length; i++) {
-        const isVowel = vowels.includes(word[i]);
-        const isConsonant = consonants.includes(word[i]);
-        
-        if (!isVowel && !isConsonant) {
-            continue;
-        }
-        
-        const shouldBeVowel = isVowelStart ? (i % 2 === 0) : (i % 2 === 1);
-        
-        if (shouldBeVowel && !isVowel) {
-            return false;
-        }
-        if (!shouldBeVowel && !isConsonant) {
-            return false;
-        }
-    }
-    
-    return true;
-}
-
-function isAlphabeticalOrder(word) {
-    return word === word.split('').sort().join('');
-}
-
 function prefixOverlap(word, prefix) {
     let maxOverlap = 0;
     for (let i = 0; i < prefix.length; i++) {
@@ -585,22 +464,9 @@ function suffixOverlap(word, suffix) {
     return maxOverlap;
 }
 
-// Check if a word is in a specific POS category using pre-tagged lists
-function isWordInPosCategory(word, pos) {
-    const wordLower = word.toLowerCase();
-    
-    switch (pos) {
-        case 'noun':
-            return nouns.includes(wordLower);
-        case 'verb':
-            return verbs.includes(wordLower);
-        case 'adjective':
-            return adjectives.includes(wordLower);
-        case 'adverb':
-            return adverbs.includes(wordLower);
-        default:
-            return false;
-    }
+// Check if a word is in a specific POS category using its POS flags
+function isWordInPosCategory(id, pos) {
+    return Boolean(POS_FLAGS[pos] && (lexicon.pos[id] & POS_FLAGS[pos]));
 }
 
 // Initialize the application when the page loads
@@ -1,9 +1,5 @@
 // Global variables
-let words = [];
-let nouns = [];
-let verbs = [];
-let adjectives = [];
-let adverbs = [];
+let lexicon = null;
 
 // DOM elements
 const startingWordInput = document.getElementById('starting-word');
@@ -25,53 +21,14 @@ async function init() {
     setupEventListeners();
 }
 
-// Load words from files
+// Load the lexicon bundle (word list, POS flags, attribute columns and affix index)
 async function loadWords() {
     try {
-        // Load main word list
-        const response = await fetch('popular.txt');
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-        const text = await response.text();
-        words = text.split('\n').map(word => word.trim()).filter(word => word.length > 0);
-        console.log(`Loaded ${words.length} words`);
-        
-        // Load POS-specific lists
-        const [nounsResponse, verbsResponse, adjectivesResponse, adverbsResponse] = await Promise.all([
-            fetch('nouns.txt'),
-            fetch('verbs.txt'),
-            fetch('adjectives.txt'),
-            fetch('adverbs.txt')
-        ]);
-        
-        if (nounsResponse.ok) {
-            const nounsText = await nounsResponse.text();
-            nouns = nounsText.split('\n').map(word => word.trim()).filter(word => word.length > 0);
-            console.log(`Loaded ${nouns.length} nouns`);
-        }
-        
-        if (verbsResponse.ok) {
-            const verbsText = await verbsResponse.text();
-            verbs = verbsText.split('\n').map(word => word.trim()).filter(word => word.length > 0);
-            console.log(`Loaded ${verbs.length} verbs`);
-        }
-        
-        if (adjectivesResponse.ok) {
-            const adjectivesText = await adjectivesResponse.text();
-            adjectives = adjectivesText.split('\n').map(word => word.trim()).filter(word => word.length > 0);
-            console.log(`Loaded ${adjectives.length} adjectives`);
-        }
-        
-        if (adverbsResponse.ok) {
-            const adverbsText = await adverbsResponse.text();
-            adverbs = adverbsText.split('\n').map(word => word.trim()).filter(word => word.length > 0);
-            console.log(`Loaded ${adverbs.length} adverbs`);
-        }
-        
+        lexicon = await loadLexicon();
+        console.log(`Loaded ${lexicon.words.length} words`);
     } catch (error) {
         console.error('Error loading words:', error);
-        alert('Error loading word lists. Please make sure all word list files are available.');
+        alert('Error loading the word list. Please make sure lexicon.bin is available (build it with create_web_bundle.py).');
     }
 }
 
@@ -391,53 +348,64 @@ function ruleToString(rule) {
     return parts.length > 0 ? parts.join(', ') : 'any';
 }
 
-// Apply all filters to a word and return True if it passes all filters
-function applyFilters(word, filters) {
-    const wordLower = word.toLowerCase();
+// Apply all filters to a word ID, reading the precomputed columns, and return true if it passes all filters
+function applyFilters(id, filters) {
+    const attributes = lexicon.attributes[id];
     
     // Length filter
-    if (filters.length !== undefined && wordLower.length !== filters.length) {
+    if (filters.length !== undefined && lexicon.words[id].length !== filters.length) {
         return false;
     }
     
     // Vowel count filter
-    if (filters.vowels !== undefined && countVowels(wordLower) !== filters.vowels) {
+    if (filters.vowels !== undefined && lexicon.vowels[id] !== filters.vowels) {
         return false;
     }
     
     // Consonant count filter
-    if (filters.consonants !== undefined && countConsonants(wordLower) !== filters.consonants) {
+    if (filters.consonants !== undefined && lexicon.consonants[id] !== filters.consonants) {
         return false;
     }
     
     // Part of speech filter
-    if (filters.pos && !isWordInPosCategory(wordLower, filters.pos)) {
+    if (filters.pos && !isWordInPosCategory(id, filters.pos)) {
         return false;
     }
     
     // Double letters filter
-    if (filters.double_letters && !hasDoubleLetters(wordLower)) {
+    if (filters.double_letters && !(attributes & ATTR_DOUBLE)) {
         return false;
     }
     
     // No repeats filter
-    if (filters.no_repeats && hasRepeatedLetters(wordLower)) {
+    if (filters.no_repeats && (attributes & ATTR_REPEATED)) {
         return false;
     }
     
     // Alternating pattern filter
-    if (filters.alternating && !isAlternatingPattern(wordLower)) {
+    if (filters.alternating && !(attributes & ATTR_ALTERNATING)) {
         return false;
     }
     
     // Alphabetical order filter
-    if (filters.alphabetical && !isAlphabeticalOrder(wordLower)) {
+    if (filters.alphabetical && !(attributes & ATTR_ALPHABETICAL)) {
         return false;
     }
     
     return true;
 }
 
+// Words passing a rule's filters
+function ruleWords(filters) {
+    const matches = [];
+    for (let id = 0; id < lexicon.words.length; id++) {
+        if (applyFilters(id, filters)) {
+            matches.push(lexicon.words[id]);
+        }
+    }
+    return matches;
+}
+
 // Find solutions
 function findSolutions(startingWord, rules, maxSolutions) {
     if (rules.length !== 3) {
@@ -450,9 +418,9 @@ function findSolutions(startingWord, rules, maxSolutions) {
     
     // Pre-filter words for each rule
     console.log('Pre-filtering words for each rule...');
-    const wordsRule1 = words.filter(word => applyFilters(word, rules[0]));
-    const wordsRule2 = words.filter(word => applyFilters(word, rules[1]));
-    const wordsRule3 = words.filter(word => applyFilters(word, rules[2]));
+    const wordsRule1 = ruleWords(rules[0]);
+    const wordsRule2 = ruleWords(rules[1]);
+    const wordsRule3 = ruleWords(rules[2]);
     
     console.log(`Rule 1 (${ruleToString(rules[0])}): ${wordsRule1.length} words`);
     console.log(`Rule 2 (${ruleToString(rules[1])}): ${wordsRule2.length} words`);
@@ -609,69 +577,6 @@ function hideLoading() {
 
 // Utility functions (same as script.js)
 
-function countVowels(word) {
-    return (word.match(/[aeiou]/g) || []).length;
-}
-
-function countConsonants(word) {
-    return (word.match(/[bcdfghjklmnpqrstvwxyz]/g) || []).length;
-}
-
-function hasDoubleLetters(word) {
-    for (let i = 0; i < word.length - 1; i++) {
-        if (word[i] === word[i + 1]) {
-            return true;
-        }
-    }
-    return false;
-}
-
-function hasRepeatedLetters(word) {
-    const seen = new Set();
-    for (const letter of word) {
-        if (seen.has(letter)) {
-            return true;
-        }
-        seen.add(letter);
-    }
-    return false;
-}
-
-function isAlternatingPattern(word) {
-    const vowels = 'aeiou';
-    const consonants = 'bcdfghjklmnpqrstvwxyz';
-    
-    if (word.length <= 1) {
-        return true;
-    }
-    
-    const isVowelStart = vowels.includes(word[0]);
-    
-    for (let i = 0; i < word.length; i++) {
-        const isVowel = vowels.includes(word[i]);
-        const isConsonant = consonants.includes(word[i]);
-        
-        if (!isVowel && !isConsonant) {
-            continue;
-        }
-        
-        const shouldBeVowel = isVowelStart ? (i % 2 === 0) : (i % 2 === 1);
-        
-        if (shouldBeVowel && !isVowel) {
-            return false;
-        }
-        if (!shouldBeVowel && !isConsonant) {
-            return false;
-        }
-    }
-    
-    return true;
-}
-
-function isAlphabeticalOrder(word) {
-    return word === word.split('').sort().join('');
-}
-
 function prefixOverlap(word, prefix) {
     let maxOverlap = 0;
     for (let i = 0; i < prefix.length; i++) {
@@ -697,21 +602,8 @@ function suffixOverlap(word, suffix) {
     return maxOverlap;
 }
 
-function isWordInPosCategory(word, pos) {
-    const wordLower = word.toLowerCase();
-    
-    switch (pos) {
-        case 'noun':
-            return nouns.includes(wordLower);
-        case 'verb':
-            return verbs.includes(wordLower);
-        case 'adjective':
-            return adjectives.includes(wordLower);
-        case 'adverb':
-            return adverbs.includes(wordLower);
-        default:
-            return false;
-    }
+function isWordInPosCategory(id, pos) {
+    return Boolean(POS_FLAGS[pos] && (lexicon.pos[id] & POS_FLAGS[pos]));
 }
 
 // Initialize the application when the page loads